@@ -0,0 +1,149 @@
+"""
+Broadcaster for the Quotex Signal Bot
+Concurrent signal fan-out over the running application's bot
+Author: Ankit Singh
+
+A broadcast queues one message per subscriber and a bounded set of workers
+sends them through the application's Bot, so every send shares its
+keep-alive connection pool. Broadcast time then grows with subscribers /
+concurrency rather than with subscribers, which keeps large audiences
+inside a signal's one-minute validity window. Each broadcast returns a
+report with its completion time and delivery latency percentiles.
+
+With a rate_limiter.KeyedRateLimiter, sends are paced to Telegram's global
+and per-chat limits. A RetryAfter (HTTP 429 flood-wait) pauses the limiter
+and puts the message back on the queue instead of failing the chat.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from telegram.error import RetryAfter
+
+from rate_limiter import KeyedRateLimiter
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter.retry_after as seconds (an int or a timedelta, depending on the library version)"""
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+
+
+@dataclass
+class BroadcastReport:
+    """Outcome of one broadcast"""
+    recipients: int
+    delivered: List[int] = field(default_factory=list)  # Chat ids, in delivery order
+    failed: Dict[int, Exception] = field(default_factory=dict)
+    latencies: List[float] = field(default_factory=list)  # Seconds from broadcast start to each delivery
+    completion_seconds: float = 0.0
+    retries: int = 0  # Sends requeued after a flood-wait
+
+    def latency_percentile(self, q: float) -> float:
+        return float(np.percentile(self.latencies, q)) if self.latencies else 0.0
+
+    @property
+    def p50(self) -> float:
+        return self.latency_percentile(50)
+
+    @property
+    def p99(self) -> float:
+        return self.latency_percentile(99)
+
+    def summary(self) -> Dict:
+        return {
+            'recipients': self.recipients,
+            'delivered': len(self.delivered),
+            'failed': len(self.failed),
+            'retries': self.retries,
+            'completion_seconds': self.completion_seconds,
+            'p50_latency_seconds': self.p50,
+            'p99_latency_seconds': self.p99
+        }
+
+
+class Broadcaster:
+    """Sends one message to many chats with bounded concurrency"""
+
+    def __init__(self, bot, concurrency: int = 32, rate_limiter: Optional[KeyedRateLimiter] = None,
+                 max_retries: int = 5, clock: Callable[[], float] = time.perf_counter):
+        """
+        bot: the running application's telegram.Bot (anything with an async
+        send_message(chat_id=..., text=..., **kwargs))
+        concurrency: maximum sends in flight; keep it within the bot's
+        connection pool size
+        rate_limiter: paces sends per chat id and overall
+        max_retries: flood-waits a message may hit before it counts as failed
+        """
+        self.bot = bot
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.clock = clock
+        self.last_report = None
+        self.stats = Counter()
+
+    async def broadcast(self, chat_ids: Iterable[int], text: str, **kwargs) -> BroadcastReport:
+        """Send text to every chat (extra kwargs go to send_message); failures are reported, not raised"""
+        queue = asyncio.Queue()
+        for chat_id in dict.fromkeys(chat_ids):
+            queue.put_nowait((chat_id, 0))  # (chat id, flood-waits so far)
+        report = BroadcastReport(recipients=queue.qsize())
+        started = self.clock()
+
+        workers = [
+            asyncio.create_task(self._worker(queue, report, started, text, kwargs))
+            for _ in range(min(self.concurrency, report.recipients))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        report.completion_seconds = self.clock() - started
+
+        self.last_report = report
+        self.stats['broadcasts'] += 1
+        self.stats['delivered'] += len(report.delivered)
+        self.stats['failed'] += len(report.failed)
+        self.stats['retries'] += report.retries
+        self.stats['max_completion_seconds'] = max(self.stats['max_completion_seconds'], report.completion_seconds)
+        return report
+
+    async def _worker(self, queue: asyncio.Queue, report: BroadcastReport, started: float, text: str, kwargs: Dict):
+        while not queue.empty():
+            chat_id, retries = queue.get_nowait()
+            if self.rate_limiter is not None:
+                self.stats['throttled_seconds'] += await self.rate_limiter.acquire(chat_id)
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                report.delivered.append(chat_id)
+                report.latencies.append(self.clock() - started)
+            except RetryAfter as e:
+                if retries >= self.max_retries:
+                    report.failed[chat_id] = e
+                    continue
+                # Requeue behind the flood-wait rather than dropping the chat
+                seconds = retry_after_seconds(e)
+                report.retries += 1
+                self.stats['flood_wait_seconds'] += seconds
+                if self.rate_limiter is not None:
+                    self.rate_limiter.pause(chat_id, seconds)
+                else:
+                    await asyncio.sleep(seconds)
+                queue.put_nowait((chat_id, retries + 1))
+            except Exception as e:
+                report.failed[chat_id] = e
+
+    def get_stats(self) -> Dict:
+        """Totals across broadcasts plus the latest broadcast's report"""
+        return {
+            **self.stats,
+            'concurrency': self.concurrency,
+            'last_broadcast': self.last_report.summary() if self.last_report else None
+        }
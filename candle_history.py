@@ -0,0 +1,139 @@
+"""
+Candle History for the Technical Analysis Engine
+Memory-mapped columnar on-disk OHLCV storage, one file per symbol and field
+Author: Ankit Singh
+
+Layout:
+    <root>/<symbol>/timestamp.i8   int64 nanoseconds since epoch (the index)
+    <root>/<symbol>/open.f8 ... volume.f8   float64 columns
+    <root>/<symbol>/meta.json      bar count and first/last timestamp
+
+Files are raw little-endian arrays, so appending is a plain file append and
+reading is np.memmap: slices are zero-copy and only touched pages are read.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from candle_store import FIELDS
+
+TIMESTAMP_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<f8')
+
+
+class CandleHistory:
+    """Append-only memory-mapped candle history for many symbols"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.maps = {}  # symbol -> (bar count, {field: np.memmap})
+        os.makedirs(root, exist_ok=True)
+
+    def symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'))
+
+    def column_path(self, symbol: str, field: str) -> str:
+        suffix = 'i8' if field == 'timestamp' else 'f8'
+        return os.path.join(self.symbol_dir(symbol), f'{field}.{suffix}')
+
+    def symbols(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, 'meta.json'))
+        )
+
+    def bar_count(self, symbol: str) -> int:
+        # Columns are written before timestamps, so the timestamp file never
+        # claims a bar whose values are missing after an interrupted append
+        path = self.column_path(symbol, 'timestamp')
+        return os.path.getsize(path) // TIMESTAMP_DTYPE.itemsize if os.path.exists(path) else 0
+
+    def last_timestamp(self, symbol: str) -> Optional[np.datetime64]:
+        columns = self.open(symbol)
+        if not len(columns['timestamp']):
+            return None
+        return columns['timestamp'][-1]
+
+    def append(self, symbol: str, data) -> int:
+        """
+        Append a chronological candle history (DataFrame indexed by
+        timestamp, or mapping with 'timestamp' and OHLCV arrays). Bars not
+        newer than the stored history are skipped. Returns bars written.
+        """
+        if hasattr(data, 'index') and 'timestamp' not in data:
+            timestamps = data.index.to_numpy()
+        else:
+            timestamps = data['timestamp']
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]').astype(TIMESTAMP_DTYPE)
+
+        count = self.bar_count(symbol)
+        keep = np.ones(len(timestamps), dtype=bool)
+        if count:
+            keep = timestamps > self.open(symbol)['timestamp'][-1].astype(TIMESTAMP_DTYPE)
+        if not keep.any():
+            return 0
+
+        os.makedirs(self.symbol_dir(symbol), exist_ok=True)
+        for field in FIELDS:
+            path = self.column_path(symbol, field)
+            # Drop any tail left over from an interrupted append before extending
+            with open(path, 'ab') as handle:
+                handle.truncate(count * VALUE_DTYPE.itemsize)
+                np.asarray(data[field], dtype=VALUE_DTYPE)[keep].tofile(handle)
+        with open(self.column_path(symbol, 'timestamp'), 'ab') as handle:
+            handle.truncate(count * TIMESTAMP_DTYPE.itemsize)
+            timestamps[keep].tofile(handle)
+
+        self.maps.pop(symbol, None)
+        self._write_meta(symbol)
+        return int(keep.sum())
+
+    def _write_meta(self, symbol: str):
+        columns = self.open(symbol)
+        meta = {
+            'bars': len(columns['timestamp']),
+            'first': str(columns['timestamp'][0]),
+            'last': str(columns['timestamp'][-1]),
+            'fields': list(FIELDS)
+        }
+        with open(os.path.join(self.symbol_dir(symbol), 'meta.json'), 'w') as handle:
+            json.dump(meta, handle)
+
+    def open(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of every column (timestamps as datetime64[ns])"""
+        count = self.bar_count(symbol)
+        cached = self.maps.get(symbol)
+        if cached and cached[0] == count:
+            return cached[1]
+
+        if count == 0:
+            columns = {field: np.empty(0, dtype=VALUE_DTYPE) for field in FIELDS}
+            columns['timestamp'] = np.empty(0, dtype='datetime64[ns]')
+            return columns
+
+        columns = {
+            field: np.memmap(self.column_path(symbol, field), dtype=VALUE_DTYPE, mode='r', shape=(count,))
+            for field in FIELDS
+        }
+        columns['timestamp'] = np.memmap(
+            self.column_path(symbol, 'timestamp'), dtype=TIMESTAMP_DTYPE, mode='r', shape=(count,)
+        ).view('datetime64[ns]')
+        self.maps[symbol] = (count, columns)
+        return columns
+
+    def slice(self, symbol: str, start=None, end=None, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Zero-copy views of bars with start <= timestamp < end (either bound
+        optional), keeping only the latest `limit` bars if given. Bounds are
+        found by binary search on the memory-mapped timestamp column.
+        """
+        columns = self.open(symbol)
+        timestamps = columns['timestamp']
+        begin = 0 if start is None else int(np.searchsorted(timestamps, np.datetime64(start, 'ns'), 'left'))
+        stop = len(timestamps) if end is None else int(np.searchsorted(timestamps, np.datetime64(end, 'ns'), 'left'))
+        if limit is not None:
+            begin = max(begin, stop - limit)
+        return {field: values[begin:stop] for field, values in columns.items()}
@@ -0,0 +1,141 @@
+"""
+Candle Store for the Technical Analysis Engine
+Fixed-capacity per-symbol OHLCV ring buffers with zero-copy views
+Author: Ankit Singh
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def to_datetime64(timestamp) -> np.datetime64:
+    """datetime / pd.Timestamp / np.datetime64 -> np.datetime64[ns]"""
+    return np.datetime64(timestamp, 'ns')
+
+
+class CandleRingBuffer:
+    """
+    Structure-of-arrays OHLCV ring buffer for one symbol.
+
+    Every bar is written twice, at slot i and slot i + capacity, so the
+    latest `size` bars are always one contiguous slice and readers get
+    plain NumPy views in chronological order without copying. Nothing is
+    reallocated after construction.
+    """
+
+    def __init__(self, capacity: int = 2048, dtype=np.float64):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype='datetime64[ns]')
+        self.columns = {field: np.zeros(2 * capacity, dtype=dtype) for field in FIELDS}
+        self.start = 0  # Slot of the oldest bar
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def last_timestamp(self) -> Optional[np.datetime64]:
+        return self.timestamps[self.start + self.size - 1] if self.size else None
+
+    def append(self, candle: Dict) -> bool:
+        """
+        Add one candle (timestamp/open/high/low/close/volume). A candle with
+        the latest timestamp replaces that bar (still-forming candle); older
+        candles are ignored. Returns True if the buffer changed.
+        """
+        timestamp = to_datetime64(candle['timestamp'])
+        last = self.last_timestamp
+
+        if last is not None and timestamp < last:
+            return False
+        if last is not None and timestamp == last:
+            slot = (self.start + self.size - 1) % self.capacity
+        elif self.size < self.capacity:
+            slot = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+
+        self.timestamps[slot] = self.timestamps[slot + self.capacity] = timestamp
+        for field in FIELDS:
+            column = self.columns[field]
+            column[slot] = column[slot + self.capacity] = candle[field]
+        return True
+
+    def extend(self, timestamps, columns: Dict[str, np.ndarray]) -> int:
+        """Bulk-append a chronological history; bars not newer than the last one are skipped"""
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        keep = timestamps > self.last_timestamp if self.size else np.ones(len(timestamps), dtype=bool)
+        timestamps = timestamps[keep]
+        count = len(timestamps)
+        if count == 0:
+            return 0
+
+        source = slice(max(0, count - self.capacity), count)
+        written = min(count, self.capacity)
+        if count >= self.capacity:
+            self.start, self.size = 0, 0
+
+        slots = (self.start + self.size + np.arange(written)) % self.capacity
+        for target, values in [(self.timestamps, timestamps)] + [
+            (self.columns[field], np.asarray(columns[field])[keep]) for field in FIELDS
+        ]:
+            target[slots] = target[slots + self.capacity] = values[source]
+
+        total = self.size + written
+        self.size = min(total, self.capacity)
+        self.start = (self.start + total - self.size) % self.capacity
+        return count
+
+    def clear(self):
+        """Drop every bar (capacity is kept)"""
+        self.start, self.size = 0, 0
+
+    def view(self, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the latest `limit` bars (all bars by default)"""
+        end = self.start + self.size
+        begin = end - (self.size if limit is None else min(limit, self.size))
+        arrays = {field: self.columns[field][begin:end] for field in FIELDS}
+        arrays['timestamp'] = self.timestamps[begin:end]
+        return arrays
+
+
+class CandleStore:
+    """Per-symbol CandleRingBuffers with a shared capacity"""
+
+    def __init__(self, capacity: int = 2048, dtype=np.float64):
+        self.capacity = capacity
+        self.dtype = dtype
+        self.buffers = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.buffers and len(self.buffers[symbol]) > 0
+
+    def symbols(self) -> List[str]:
+        return [symbol for symbol in self.buffers if symbol in self]
+
+    def buffer(self, symbol: str) -> CandleRingBuffer:
+        if symbol not in self.buffers:
+            self.buffers[symbol] = CandleRingBuffer(self.capacity, self.dtype)
+        return self.buffers[symbol]
+
+    def append(self, symbol: str, candle: Dict) -> bool:
+        return self.buffer(symbol).append(candle)
+
+    def extend(self, symbol: str, data) -> int:
+        """Load a candle history (DataFrame indexed by timestamp, or mapping with 'timestamp')"""
+        if hasattr(data, 'index') and 'timestamp' not in data:
+            timestamps = data.index.to_numpy()
+        else:
+            timestamps = data['timestamp']
+        return self.buffer(symbol).extend(timestamps, {field: np.asarray(data[field]) for field in FIELDS})
+
+    def view(self, symbol: str, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        return self.buffer(symbol).view(limit)
+
+    def bar_count(self, symbol: str) -> int:
+        return len(self.buffers[symbol]) if symbol in self.buffers else 0
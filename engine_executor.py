@@ -0,0 +1,214 @@
+"""
+Engine Executor for the Quotex Signal Bot
+Awaitable, time-limited engine calls off the event loop
+Author: Ankit Singh
+
+Indicator work is CPU-bound, so an async handler that calls the engine
+directly stalls update processing for every other user until it returns.
+EngineExecutor runs those calls on a dedicated pool instead: a thread pool
+sharing the bot's engine (and its candle store and caches), or a process
+pool of worker engines that receive the pair's candles with each call and
+compute in parallel with the bot. Every call is awaited with a timeout, so
+a slow analysis costs its caller a "try again" rather than the bot.
+
+Signal requests are single-flight: while a pair's analysis for a candle is
+running, further requests for the same pair and candle (e.g. everyone
+tapping the pair a broadcast just announced) await that one computation.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from multiprocessing import get_context
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+import parallel_scan
+from technical_analysis import Signal, TechnicalAnalysisEngine
+
+MODES = ('thread', 'process')
+
+
+def _analyze(pair: str, data, last_bar_only: bool) -> Optional[Signal]:
+    """Process mode: evaluate one pair's candles on the worker's engine"""
+    return parallel_scan.worker_engine().analyze_pair_data(pair, data, last_bar_only)
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight computation"""
+
+    def __init__(self):
+        self.in_flight = {}  # key -> asyncio.Task
+        self.stats = Counter()
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable]):
+        """
+        Await compute() unless a call with the same key is already running,
+        in which case await its result (or exception) instead. Cancelling
+        one caller does not cancel the shared computation.
+        """
+        self.stats['calls'] += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            self.stats['executions'] += 1
+            task = asyncio.ensure_future(compute())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved even if every caller gave up
+
+    def get_stats(self) -> Dict:
+        """Counters plus the share of calls served by another call's computation"""
+        calls, executions = self.stats['calls'], self.stats['executions']
+        return {
+            **self.stats,
+            'in_flight': len(self.in_flight),
+            'coalescing_ratio': self.stats['coalesced'] / calls if calls else 0.0,
+            'calls_per_execution': calls / executions if executions else 0.0
+        }
+
+
+class EngineExecutor:
+    """Runs TechnicalAnalysisEngine work on a dedicated thread or process pool"""
+
+    def __init__(self, engine: TechnicalAnalysisEngine, mode: str = 'thread',
+                 workers: int = 2, timeout: Optional[float] = 10.0):
+        """
+        mode: 'thread' shares `engine` with the pool threads; 'process' runs
+        analyses on spawned worker engines (run() then needs picklable,
+        module-level callables)
+        timeout: default seconds each call may take (None waits forever)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown executor mode {mode!r}, expected one of {MODES}")
+        self.engine = engine
+        self.mode = mode
+        self.workers = workers
+        self.timeout = timeout
+        if mode == 'process':
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context('spawn'),
+                initializer=parallel_scan._init_worker,
+                initargs=(engine.backend, engine.dtype)
+            )
+            # Candles are loaded in this process, but off the event loop
+            self.loader = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='engine-loader')
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='engine')
+            self.loader = self.pool
+        self.in_flight = 0
+        self.single_flight = SingleFlight()
+        self.stats = Counter()
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None):
+        """
+        Await func(*args) on the pool. Raises asyncio.TimeoutError after
+        `timeout` seconds (default: the executor's); a call that already
+        started keeps its worker busy until it finishes, its result is
+        dropped.
+        """
+        return await self._execute(self.pool, func, args, timeout)
+
+    async def _execute(self, pool, func: Callable, args, timeout: Optional[float]):
+        loop = asyncio.get_running_loop()
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        self.stats['calls'] += 1
+        self.in_flight += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(pool, func, *args), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            elapsed = time.perf_counter() - started
+            self.stats['total_seconds'] += elapsed
+            self.stats['max_seconds'] = max(self.stats['max_seconds'], elapsed)
+
+    async def generate_signal(self, pair: str, last_bar_only: bool = False,
+                              timeout: Optional[float] = None) -> Optional[Signal]:
+        """
+        TechnicalAnalysisEngine.generate_comprehensive_signal, off the event
+        loop. Concurrent requests for the same pair and candle share one
+        analysis; each caller gets its own copy of the Signal.
+        """
+        # Candles are loaded (and results cached) in this process; process
+        # workers only compute
+        data, last_candle = await self._execute(self.loader, self.engine.get_pair_data, (pair,), timeout)
+        if data is None:
+            return None
+
+        key = self.engine.signal_cache_key(pair, data, last_candle, last_bar_only)
+        signal = await self.single_flight.do(
+            key, lambda: self._analyze_data(pair, data, last_candle, key, last_bar_only, timeout)
+        )
+        return replace(signal) if signal else None
+
+    async def _analyze_data(self, pair: str, data, last_candle, key, last_bar_only: bool,
+                            timeout: Optional[float]) -> Optional[Signal]:
+        if self.mode == 'thread':
+            return await self.run(self.engine.signal_from_data, pair, data, last_candle, last_bar_only, timeout=timeout)
+
+        found, signal = self.engine.indicators_cache.lookup(key)
+        if not found:
+            # Store views pickle as just their elements; the worker has no
+            # higher-timeframe candles, so their note is added here
+            signal = await self.run(_analyze, pair, data, last_bar_only, timeout=timeout)
+            if signal:
+                self.engine.add_timeframe_note(signal)
+            self.engine.indicators_cache.put(key, signal)
+        return signal
+
+    async def scan_universe(self, pairs: Optional[List[str]] = None, min_confidence: str = 'MEDIUM',
+                            timeout: Optional[float] = None) -> List[Signal]:
+        """TechnicalAnalysisEngine.scan_universe, off the event loop"""
+        if self.mode == 'thread':
+            return await self.run(self.engine.scan_universe, pairs, min_confidence, timeout=timeout)
+
+        pairs = list(pairs or self.engine.trading_pairs)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(self.generate_signal(pair) for pair in pairs)),
+            self.timeout if timeout is None else timeout
+        )
+        threshold = TechnicalAnalysisEngine.CONFIDENCE_LEVELS[min_confidence]
+        signals = [signal for signal in results
+                   if signal and TechnicalAnalysisEngine.CONFIDENCE_LEVELS[signal.confidence] >= threshold]
+        signals.sort(key=lambda signal: signal.score, reverse=True)
+        return signals
+
+    def get_stats(self) -> Dict:
+        """Call/timeout/error counters, mean call time and signal coalescing"""
+        calls = self.stats['calls']
+        return {
+            **self.stats,
+            'mode': self.mode,
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'mean_seconds': self.stats['total_seconds'] / calls if calls else 0.0,
+            'single_flight': self.single_flight.get_stats()
+        }
+
+    def close(self):
+        # Queued calls are dropped; running ones finish
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.loader is not self.pool:
+            self.loader.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
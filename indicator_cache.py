@@ -0,0 +1,114 @@
+"""
+Indicator Cache for the Technical Analysis Engine
+Bounded LRU cache of per-candle signal decisions
+Author: Ankit Singh
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class IndicatorCache:
+    """
+    LRU cache with size and TTL eviction.
+
+    Keys are (symbol, timeframe, last_candle_time, kind, version) tuples,
+    where version identifies the data within a still-forming candle (e.g.
+    its OHLCV). Storing an entry for a newer candle drops every older entry
+    of the same symbol/timeframe, and storing a new version of a candle
+    drops the entries of its earlier versions, so new market data
+    invalidates the cache by itself.
+    Safe to share between executor threads; values are computed outside
+    the lock.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (stored_at, value)
+        self.latest_candle = {}  # (symbol, timeframe) -> last candle time
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self.lock = threading.RLock()
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        found, value = self.lookup(key)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def lookup(self, key: Tuple) -> Tuple[bool, Any]:
+        """Return (found, value); None is a valid cached value"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.clock() - stored_at <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return True, value
+                del self.entries[key]
+                self.stats['expirations'] += 1
+
+            self.stats['misses'] += 1
+            return False, None
+
+    def put(self, key: Tuple, value: Any):
+        """Store a value, invalidating older candles and evicting LRU entries"""
+        symbol, timeframe, candle_time = key[:3]
+        with self.lock:
+            latest = self.latest_candle.get((symbol, timeframe))
+            if latest is not None and candle_time < latest:
+                return  # Stale result computed from superseded data
+            if latest is None or candle_time > latest:
+                self.latest_candle[(symbol, timeframe)] = candle_time
+                self.invalidate(symbol, timeframe, before=candle_time)
+            else:
+                # Same candle rewritten (forming bar): earlier versions are stale
+                superseded = [
+                    other for other in self.entries
+                    if other[:3] == key[:3] and other[4:] != key[4:]
+                ]
+                for other in superseded:
+                    del self.entries[other]
+                self.stats['invalidations'] += len(superseded)
+
+            self.entries[key] = (self.clock(), value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, symbol: Hashable, timeframe: str = None, before: Any = None) -> int:
+        """Drop entries for a symbol (optionally one timeframe / older candles only)"""
+        with self.lock:
+            stale = [
+                key for key in self.entries
+                if key[0] == symbol
+                and (timeframe is None or key[1] == timeframe)
+                and (before is None or key[2] < before)
+            ]
+            for key in stale:
+                del self.entries[key]
+            self.stats['invalidations'] += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.latest_candle.clear()
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters plus current size and hit rate"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'size': len(self.entries),
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+        }
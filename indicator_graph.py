@@ -0,0 +1,157 @@
+"""
+Indicator Dependency Graph for the Technical Analysis Engine
+Computes shared primitives once per pair and bar and serves every consumer
+Author: Ankit Singh
+
+Nodes are tuples: the first element names the builder, the rest are its
+arguments (other node keys, periods). For example ('sma', CLOSE, 10),
+('sma', CLOSE, 20), ('sma', CLOSE, 50) and ('sma', CLOSE, 100) all read the
+single ('cumsum', CLOSE) node, and support/resistance reads rolling-extrema
+nodes instead of rescanning highs/lows. Every node is computed at most once
+per graph.
+
+Like TechnicalAnalysisEngine, a graph computes with the 'numpy' backend
+(numpy_indicators, SMAs from one prefix sum) or the 'pandas' backend
+(pandas rolling windows and ta's RSI).
+"""
+
+from collections import Counter
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+import numpy_indicators
+
+try:
+    import ta
+except ImportError:  # Only the 'pandas' backend needs ta
+    ta = None
+
+OPEN = ('column', 'open')
+HIGH = ('column', 'high')
+LOW = ('column', 'low')
+CLOSE = ('column', 'close')
+VOLUME = ('column', 'volume')
+
+
+class IndicatorGraph:
+    """Memoized indicator DAG over one pair's candle history"""
+
+    def __init__(self, data, dtype=np.float64, backend: str = 'numpy'):
+        """
+        data: DataFrame or mapping of OHLCV field -> 1-D array
+        backend: 'numpy' or 'pandas', as for TechnicalAnalysisEngine
+        """
+        self.data = data
+        self.dtype = dtype
+        self.backend = backend
+        self.nodes = {}
+        self.evaluations = Counter()
+
+    def get(self, key: Tuple):
+        """Value of a node, building it (and its dependencies) on first use"""
+        if key not in self.nodes:
+            builder = getattr(self, f'build_{key[0]}')
+            self.nodes[key] = builder(*key[1:])
+            self.evaluations[key] += 1
+        return self.nodes[key]
+
+    def evaluate(self, indicators: Dict[str, Tuple]) -> Dict:
+        """Evaluate a strategy's declared indicators, e.g. {'sma_10': ('sma', CLOSE, 10)}"""
+        return {name: self.get(key) for name, key in indicators.items()}
+
+    # Primitives
+
+    def build_column(self, field: str) -> np.ndarray:
+        values = self.data[field]
+        return numpy_indicators.as_array(getattr(values, 'values', values), self.dtype)
+
+    def build_cumsum(self, source: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """Prefix sums of a series plus prefix counts of its NaNs (both start at 0)"""
+        values = self.get(source)
+        missing = np.isnan(values)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values), dtype=np.float64)))
+        counts = np.concatenate(([0], np.cumsum(missing)))
+        return sums, counts
+
+    def build_diff(self, source: Tuple) -> np.ndarray:
+        values = self.get(source)
+        diff = np.full(values.shape, np.nan, dtype=self.dtype)
+        diff[1:] = np.diff(values)
+        return diff
+
+    def build_rolling_max(self, source: Tuple, window: int) -> np.ndarray:
+        """
+        Trailing max over `window` bars, ignoring NaN (partial windows at the
+        start). pandas keeps a monotonic deque, so this is linear whatever
+        the window.
+        """
+        return pd.Series(self.get(source)).rolling(window, min_periods=1).max().to_numpy(dtype=self.dtype)
+
+    def build_rolling_min(self, source: Tuple, window: int) -> np.ndarray:
+        return pd.Series(self.get(source)).rolling(window, min_periods=1).min().to_numpy(dtype=self.dtype)
+
+    # Indicators
+
+    def build_sma(self, source: Tuple, period: int) -> np.ndarray:
+        if self.backend == 'pandas':
+            return pd.Series(self.get(source)).rolling(window=period).mean().to_numpy()
+        sums, counts = self.get(('cumsum', source))
+        out = np.full(len(sums) - 1, np.nan, dtype=self.dtype)
+        if 0 < period < len(sums):
+            window_sums = sums[period:] - sums[:-period]
+            complete = (counts[period:] - counts[:-period]) == 0
+            out[period - 1:] = np.where(complete, window_sums / period, np.nan)
+        return out
+
+    def build_wma(self, source: Tuple, period: int) -> np.ndarray:
+        return numpy_indicators.wma(self.get(source), period, self.dtype)
+
+    def build_rsi(self, period: int) -> np.ndarray:
+        if self.backend == 'pandas':
+            return ta.momentum.RSIIndicator(pd.Series(self.get(CLOSE)), window=period).rsi().to_numpy()
+        diff = np.nan_to_num(self.get(('diff', CLOSE)), nan=0.0)
+        ema_up = numpy_indicators.ema(np.where(diff > 0, diff, 0.0), 1 / period, period, self.dtype)
+        ema_down = numpy_indicators.ema(np.where(diff < 0, -diff, 0.0), 1 / period, period, self.dtype)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+
+    def build_de_max(self) -> np.ndarray:
+        diff = self.get(('diff', HIGH))
+        de_max = np.full(diff.shape, np.nan, dtype=self.dtype)
+        de_max[1:] = np.fmax(diff[1:], 0.0)
+        return de_max
+
+    def build_de_min(self) -> np.ndarray:
+        diff = self.get(('diff', LOW))
+        de_min = np.full(diff.shape, np.nan, dtype=self.dtype)
+        de_min[1:] = np.fmax(-diff[1:], 0.0)
+        return de_min
+
+    def build_demarker(self, period: int) -> np.ndarray:
+        sma_de_max = self.get(('sma', ('de_max',), period))
+        sma_de_min = self.get(('sma', ('de_min',), period))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return sma_de_max / (sma_de_max + sma_de_min)
+
+    def build_volume_osc(self, short_period: int, long_period: int) -> np.ndarray:
+        short_ma = self.get(('sma', VOLUME, short_period))
+        long_ma = self.get(('sma', VOLUME, long_period))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return ((short_ma - long_ma) / long_ma) * 100
+
+    def build_support_resistance(self, window: int) -> Dict:
+        """Same levels as TechnicalAnalysisEngine.detect_support_resistance"""
+        span = 2 * window + 1
+        highs = self.get(HIGH)
+        lows = self.get(LOW)
+        inner = slice(window, max(window, len(highs) - window))
+
+        # A trailing max ending at i + window is the centered max around i
+        centered_max = self.get(('rolling_max', HIGH, span))[span - 1:]
+        centered_min = self.get(('rolling_min', LOW, span))[span - 1:]
+        resistance = highs[inner][highs[inner] == centered_max[:len(highs[inner])]].tolist()
+        support = lows[inner][lows[inner] == centered_min[:len(lows[inner])]].tolist()
+
+        return {'resistance': resistance[-3:], 'support': support[-3:]}
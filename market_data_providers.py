@@ -0,0 +1,395 @@
+"""
+Market Data Providers for the Technical Analysis Engine
+Async candle sources behind one interface, with a pooled HTTP client
+Author: Ankit Singh
+
+Every provider implements `fetch_candles(symbol, timeframe, limit, since)`
+and gets a concurrent `fetch_many()` for free. HTTPMarketDataProvider keeps
+one keep-alive connection pool per upstream and honors
+BotConfig.API_SETTINGS: the requests-per-minute limit, the per-request
+timeout, retry attempts and exponential backoff. CachingMarketDataProvider
+wraps any provider so repeated calls only fetch candles newer than those
+already stored, or nothing at all within a TTL. StubProviderServer serves
+SyntheticMarket candles over local HTTP so the whole path can be exercised
+without a real feed.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from candle_store import FIELDS, CandleStore
+from config import BotConfig
+from market_simulator import SyntheticMarket
+from rate_limiter import TokenBucket
+
+try:
+    import httpx
+except ImportError:  # Installed with python-telegram-bot; only the HTTP provider needs it
+    httpx = None
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def candles_to_payload(symbol: str, timeframe: str, data: Dict[str, np.ndarray]) -> Dict:
+    """Columnar JSON body: bar open times in epoch milliseconds plus OHLCV lists"""
+    timestamps = np.asarray(data['timestamp'], dtype='datetime64[ms]').astype(np.int64)
+    payload = {'symbol': symbol, 'timeframe': timeframe, 'timestamp': timestamps.tolist()}
+    payload.update({field: np.asarray(data[field]).tolist() for field in FIELDS})
+    return payload
+
+
+def payload_to_frame(payload: Dict) -> pd.DataFrame:
+    """Inverse of candles_to_payload, in get_market_data's DataFrame layout"""
+    index = pd.DatetimeIndex(pd.to_datetime(payload['timestamp'], unit='ms'), name='timestamp')
+    return pd.DataFrame({field: np.asarray(payload[field], dtype=np.float64) for field in FIELDS}, index=index)
+
+
+class MarketDataProvider:
+    """Async candle source; subclasses implement fetch_candles"""
+
+    async def fetch_candles(self, symbol: str, timeframe: str = '1m', limit: int = 500,
+                            since: Optional[datetime] = None) -> pd.DataFrame:
+        """Latest `limit` closed-or-forming bars, only those opening after `since` if given"""
+        raise NotImplementedError
+
+    async def fetch_many(self, symbols: List[str], timeframe: str = '1m', limit: int = 500,
+                         since: Optional[Dict[str, datetime]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch every symbol concurrently. A symbol that still fails after
+        retries maps to an empty DataFrame, like get_market_data.
+        """
+        since = since or {}
+        results = await asyncio.gather(
+            *(self.fetch_candles(symbol, timeframe, limit, since.get(symbol)) for symbol in symbols),
+            return_exceptions=True
+        )
+        frames = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching data for {symbol}: {result}")
+                result = pd.DataFrame()
+            frames[symbol] = result
+        return frames
+
+    async def aclose(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class SimulatedMarketDataProvider(MarketDataProvider):
+    """In-process SyntheticMarket candles (the demo feed), no network"""
+
+    def __init__(self, market: Optional[SyntheticMarket] = None, end: Optional[datetime] = None):
+        self.market = market or SyntheticMarket()
+        self.end = end  # Fixed last bar for replays; default is the current minute
+
+    async def fetch_candles(self, symbol: str, timeframe: str = '1m', limit: int = 500,
+                            since: Optional[datetime] = None) -> pd.DataFrame:
+        data = self.market.generate_frame(symbol, limit, self.end)
+        return data if since is None else data[data.index > pd.Timestamp(since)]
+
+
+class HTTPMarketDataProvider(MarketDataProvider):
+    """
+    Candles from a REST endpoint: GET {base_url}/candles?symbol=&timeframe=&limit=[&since=]
+    returning the columnar payload of candles_to_payload.
+    """
+
+    def __init__(self, base_url: str, settings: Optional[Dict] = None, max_connections: int = 32,
+                 headers: Optional[Dict[str, str]] = None):
+        if httpx is None:
+            raise ImportError("HTTPMarketDataProvider requires the httpx package")
+
+        settings = {**BotConfig.API_SETTINGS, **(settings or {})}
+        self.base_url = base_url.rstrip('/')
+        self.timeout = settings['timeout']
+        self.retry_attempts = settings['retry_attempts']
+        self.backoff_factor = settings['backoff_factor']
+        self.rate_limiter = TokenBucket.per_minute(settings['rate_limit'])
+        self.max_connections = max_connections
+        self.headers = headers or {}
+        self.client = None  # Created on first use, inside the running event loop
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'rate_limited_seconds': 0.0,
+                      'bytes_received': 0, 'bars_received': 0}
+
+    def _get_client(self) -> 'httpx.AsyncClient':
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+        return self.client
+
+    def backoff_delay(self, attempt: int, response=None) -> float:
+        """Seconds before retry number `attempt` (0-based); a 429's Retry-After wins"""
+        if response is not None and 'Retry-After' in response.headers:
+            try:
+                return float(response.headers['Retry-After'])
+            except ValueError:
+                pass
+        return self.backoff_factor * (2 ** attempt)
+
+    async def fetch_candles(self, symbol: str, timeframe: str = '1m', limit: int = 500,
+                            since: Optional[datetime] = None) -> pd.DataFrame:
+        params = {'symbol': symbol, 'timeframe': timeframe, 'limit': limit}
+        if since is not None:
+            params['since'] = int(pd.Timestamp(since).value // 1_000_000)
+        response = await self.request('/candles', params)
+        data = payload_to_frame(response.json())
+        self.stats['bytes_received'] += len(response.content)
+        self.stats['bars_received'] += len(data)
+        return data
+
+    async def request(self, path: str, params: Dict) -> 'httpx.Response':
+        """GET with rate limiting, retrying transport errors, 429 and 5xx with backoff"""
+        client = self._get_client()
+        for attempt in range(self.retry_attempts + 1):
+            self.stats['rate_limited_seconds'] += await self.rate_limiter.acquire()
+            self.stats['requests'] += 1
+            response = None
+            try:
+                response = await client.get(path, params=params)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                error = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code} for {path}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+
+            if attempt == self.retry_attempts:
+                break
+            self.stats['retries'] += 1
+            await asyncio.sleep(self.backoff_delay(attempt, response))
+
+        self.stats['failures'] += 1
+        raise error
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+class CachingMarketDataProvider(MarketDataProvider):
+    """
+    Incremental fetching and a TTL response cache in front of any provider.
+
+    Candles live in one CandleStore per timeframe (pass the engine's
+    pairs_data for '1m' to share it). Within `ttl` seconds of the last
+    fetch a symbol is served straight from the store; after that only bars
+    from the last stored one onwards are requested (the last bar may still
+    have been forming) and merged in. A full `limit` fetch happens only
+    while a symbol's stored history is shorter than requested. When more
+    than `limit` bars are missing (a restart from disk, an outage), the
+    incremental response no longer reaches back to the stored bars; the
+    store is then resynced to that response rather than merged across the
+    gap.
+    """
+
+    # Raw size of one candle (timestamp + OHLCV) when the provider does not report bytes
+    DEFAULT_BAR_BYTES = 6 * 8
+
+    def __init__(self, provider: MarketDataProvider, ttl: float = 5.0, store: Optional[CandleStore] = None,
+                 capacity: int = 2048, clock=time.monotonic):
+        self.provider = provider
+        self.ttl = ttl
+        self.capacity = store.capacity if store is not None else capacity
+        self.stores = {'1m': store} if store is not None else {}
+        self.clock = clock
+        self.fetched_at = {}  # (symbol, timeframe) -> clock() of the last upstream fetch
+        self.stats = {'requests': 0, 'full_requests': 0, 'incremental_requests': 0, 'requests_saved': 0,
+                      'resyncs': 0, 'bars_fetched': 0, 'bars_saved': 0, 'bytes_saved': 0}
+
+    def store(self, timeframe: str) -> CandleStore:
+        if timeframe not in self.stores:
+            self.stores[timeframe] = CandleStore(self.capacity)
+        return self.stores[timeframe]
+
+    def bytes_per_bar(self) -> float:
+        """Average response bytes per candle seen from the provider so far"""
+        stats = getattr(self.provider, 'stats', {})
+        if stats.get('bars_received'):
+            return stats['bytes_received'] / stats['bars_received']
+        return self.DEFAULT_BAR_BYTES
+
+    async def fetch_candles(self, symbol: str, timeframe: str = '1m', limit: int = 500,
+                            since: Optional[datetime] = None) -> pd.DataFrame:
+        store = self.store(timeframe)
+        buffer = store.buffer(symbol)
+        limit = min(limit, self.capacity)
+        fetched_at = self.fetched_at.get((symbol, timeframe))
+
+        if len(buffer) >= limit and fetched_at is not None and self.clock() - fetched_at <= self.ttl:
+            self.stats['requests_saved'] += 1
+            self.stats['bars_saved'] += limit
+            self.stats['bytes_saved'] += int(limit * self.bytes_per_bar())
+        elif len(buffer) >= limit:
+            last = pd.Timestamp(buffer.last_timestamp)
+            # since is exclusive, so step back 1ms to re-read the possibly forming last bar
+            data = await self.provider.fetch_candles(symbol, timeframe, limit, last - pd.Timedelta(milliseconds=1))
+            self._record_fetch(symbol, timeframe, data, incremental=True, limit=limit)
+            if len(data) and data.index[0] == last:
+                buffer.append({'timestamp': last, **data.iloc[0].to_dict()})
+            elif len(data) >= limit:
+                # Only the latest `limit` bars came back: there is a gap behind them
+                buffer.clear()
+                self.stats['resyncs'] += 1
+            store.extend(symbol, data)
+        else:
+            data = await self.provider.fetch_candles(symbol, timeframe, limit)
+            self._record_fetch(symbol, timeframe, data, incremental=False, limit=limit)
+            store.extend(symbol, data)
+
+        view = store.view(symbol, limit)
+        data = pd.DataFrame(
+            {field: view[field].copy() for field in FIELDS},
+            index=pd.DatetimeIndex(view['timestamp'].copy(), name='timestamp')
+        )
+        return data if since is None else data[data.index > pd.Timestamp(since)]
+
+    def _record_fetch(self, symbol: str, timeframe: str, data: pd.DataFrame, incremental: bool, limit: int):
+        self.fetched_at[(symbol, timeframe)] = self.clock()
+        self.stats['requests'] += 1
+        self.stats['bars_fetched'] += len(data)
+        if incremental:
+            self.stats['incremental_requests'] += 1
+            saved = max(0, limit - len(data))
+            self.stats['bars_saved'] += saved
+            self.stats['bytes_saved'] += int(saved * self.bytes_per_bar())
+        else:
+            self.stats['full_requests'] += 1
+
+    def get_stats(self) -> Dict:
+        """Upstream request counters plus requests/bars/bytes saved versus refetching `limit` bars"""
+        calls = self.stats['requests'] + self.stats['requests_saved']
+        return {
+            **self.stats,
+            'symbols': sum(len(store.symbols()) for store in self.stores.values()),
+            'requests_saved_rate': self.stats['requests_saved'] / calls if calls else 0.0
+        }
+
+    async def aclose(self):
+        await self.provider.aclose()
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 128  # Accept a whole universe of connections at once
+
+
+class StubProviderServer:
+    """
+    Local HTTP/1.1 keep-alive server speaking HTTPMarketDataProvider's
+    protocol, backed by SyntheticMarket. `latency` delays every response
+    to stand in for a network round trip; `fail_next` makes the next N
+    requests answer 503. Runs in a background thread:
+
+        with StubProviderServer(latency=0.05) as server:
+            provider = HTTPMarketDataProvider(server.url)
+    """
+
+    def __init__(self, market: Optional[SyntheticMarket] = None, latency: float = 0.0,
+                 end: Optional[datetime] = None, host: str = '127.0.0.1', port: int = 0):
+        self.market = market or SyntheticMarket()
+        self.latency = latency
+        self.end = end
+        self.fail_next = 0
+        self.stats = {'requests': 0, 'connections': 0, 'bytes_sent': 0}
+        self.lock = threading.Lock()
+        self.server = StubHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def candles(self, symbol: str, timeframe: str, limit: int, since_ms: Optional[int]) -> Dict:
+        data = self.market.generate([symbol], limit, self.end)
+        columns = {field: data[field][0] for field in FIELDS}
+        columns['timestamp'] = data['timestamp']
+        if since_ms is not None:
+            keep = columns['timestamp'].astype('datetime64[ms]').astype(np.int64) > since_ms
+            columns = {field: values[keep] for field, values in columns.items()}
+        return candles_to_payload(symbol, timeframe, columns)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep connections open between requests
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.stats['connections'] += 1
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.stats['requests'] += 1
+                    failing = stub.fail_next > 0
+                    stub.fail_next -= failing
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if failing:
+                    status, body = 503, {'error': 'unavailable'}
+                elif url.path != '/candles' or 'symbol' not in query:
+                    status, body = 404, {'error': 'not found'}
+                else:
+                    since = int(query['since']) if 'since' in query else None
+                    status = 200
+                    body = stub.candles(query['symbol'], query.get('timeframe', '1m'),
+                                        int(query.get('limit', 500)), since)
+
+                encoded = json.dumps(body).encode('utf-8')
+                with stub.lock:
+                    stub.stats['bytes_sent'] += len(encoded)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StubProviderServer':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,127 @@
+"""
+Synthetic Market Feed for the Technical Analysis Engine
+Deterministic OHLCV histories and live tick streams for load and replay testing
+Author: Ankit Singh
+
+Each symbol draws from its own numpy.random.Generator seeded from a stable
+CRC32 of the symbol name (not hash(), which changes with PYTHONHASHSEED), so
+a symbol's history is identical in every process and does not depend on
+which other symbols are generated with it. The global NumPy RNG is never
+touched.
+"""
+
+import asyncio
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def stable_seed(symbol: str, base_seed: int = 0) -> np.random.SeedSequence:
+    """Process-independent seed sequence for a symbol"""
+    return np.random.SeedSequence([base_seed, zlib.crc32(symbol.encode('utf-8'))])
+
+
+class SyntheticMarket:
+    """Vectorized random-walk OHLCV generator with per-symbol stable seeds"""
+
+    def __init__(self, seed: int = 0, volatility: float = 0.002, freq: str = '1min'):
+        """volatility: standard deviation of per-bar log returns"""
+        self.seed = seed
+        self.volatility = volatility
+        self.freq = freq
+
+    def symbol_rng(self, symbol: str, stream: int = 0) -> np.random.Generator:
+        """Generator for one symbol; stream 0 is history, higher streams are tick feeds"""
+        return np.random.default_rng(stable_seed(symbol, self.seed).spawn(stream + 1)[stream])
+
+    def generate(self, symbols: List[str], bars: int, end: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """
+        OHLCV histories for many symbols at once: each field is a
+        (symbols x bars) float64 array, plus a shared 'timestamp' array of
+        bar open times ending at `end` (default: the current minute).
+        """
+        count = len(symbols)
+        base_price = np.empty((count, 1))
+        drift = np.empty((count, 1))
+        noise = np.empty((3, count, bars))
+        volume_draws = np.empty((count, bars))
+
+        # Only the draws are per symbol; everything else is one matrix pass
+        for row, symbol in enumerate(symbols):
+            rng = self.symbol_rng(symbol)
+            base_price[row] = rng.uniform(1.0, 2000.0)
+            drift[row] = rng.uniform(-0.1, 0.1) * self.volatility
+            noise[:, row, :] = rng.standard_normal((3, bars))
+            volume_draws[row] = rng.random(bars)
+
+        closes = base_price * np.exp(np.cumsum(drift + self.volatility * noise[0], axis=1))
+        opens = np.concatenate((base_price, closes[:, :-1]), axis=1)
+        highs = np.maximum(opens, closes) * (1 + np.abs(noise[1]) * self.volatility / 2)
+        lows = np.minimum(opens, closes) * (1 - np.abs(noise[2]) * self.volatility / 2)
+        volumes = 1000 + 9000 * volume_draws
+
+        end = pd.Timestamp(end if end is not None else datetime.now()).floor(self.freq)
+        return {
+            'timestamp': pd.date_range(end=end, periods=bars, freq=self.freq).to_numpy(),
+            'open': opens,
+            'high': highs,
+            'low': lows,
+            'close': closes,
+            'volume': volumes
+        }
+
+    def generate_frame(self, symbol: str, bars: int, end: Optional[datetime] = None) -> pd.DataFrame:
+        """One symbol's history in get_market_data's DataFrame layout"""
+        arrays = self.generate([symbol], bars, end)
+        return pd.DataFrame(
+            {field: arrays[field][0] for field in ('open', 'high', 'low', 'close', 'volume')},
+            index=pd.DatetimeIndex(arrays['timestamp'], name='timestamp')
+        )
+
+    def tick_batches(self, symbols: List[str], start_prices: Optional[np.ndarray] = None,
+                     tick_interval: float = 1.0, start: Optional[datetime] = None) -> Iterator[Dict]:
+        """
+        Endless simulated ticks: each batch holds one tick per symbol with a
+        shared timestamp advanced by tick_interval seconds of market time.
+        """
+        rngs = [self.symbol_rng(symbol, stream=1) for symbol in symbols]
+        if start_prices is None:
+            start_prices = self.generate(symbols, 1)['close'][:, -1]
+        prices = np.array(start_prices, dtype=float)
+        timestamp = pd.Timestamp(start if start is not None else datetime.now())
+        step = pd.Timedelta(seconds=tick_interval)
+        # Scale per-bar volatility to the tick interval (random-walk sqrt rule)
+        tick_volatility = self.volatility * np.sqrt(tick_interval / pd.Timedelta(self.freq).total_seconds())
+
+        while True:
+            returns = np.array([rng.standard_normal() for rng in rngs])
+            volume_draws = np.array([rng.random() for rng in rngs])
+            prices = prices * np.exp(tick_volatility * returns)
+            timestamp += step
+            yield {
+                'timestamp': timestamp,
+                'symbols': symbols,
+                'price': prices.copy(),
+                'volume': 10 + 90 * volume_draws
+            }
+
+    def ticks(self, symbols: List[str], speed: float = 1.0, tick_interval: float = 1.0,
+              **kwargs) -> Iterator[Dict]:
+        """
+        Tick stream paced in wall-clock time: speed=1 replays in real time,
+        speed=10 ten times faster, speed=0 as fast as possible.
+        """
+        for batch in self.tick_batches(symbols, tick_interval=tick_interval, **kwargs):
+            yield batch
+            if speed > 0:
+                time.sleep(tick_interval / speed)
+
+    async def aticks(self, symbols: List[str], speed: float = 1.0, tick_interval: float = 1.0, **kwargs):
+        """asyncio version of ticks() for the bot's event loop"""
+        for batch in self.tick_batches(symbols, tick_interval=tick_interval, **kwargs):
+            yield batch
+            await asyncio.sleep(tick_interval / speed if speed > 0 else 0)
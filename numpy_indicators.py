@@ -0,0 +1,151 @@
+"""
+NumPy Indicator Backend for the Technical Analysis Engine
+Pure-NumPy SMA, WMA, EMA, RSI, MACD, DeMarker and Volume Oscillator
+Author: Ankit Singh
+
+Every function works on contiguous float arrays along the last axis, so a
+1-D price history and a 2-D (symbols x bars) matrix go through the same
+code. Results match the pandas/ta implementations, including NaN warm-up.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+EMA_BLOCK = 64  # Bars per blocked EMA step; decay^64 stays well above underflow
+
+
+def as_array(values, dtype=np.float64) -> np.ndarray:
+    """Contiguous float array view of prices/volumes (no copy when possible)"""
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def window_sums(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Sum of every `period`-bar window along the last axis (float64), as
+    differences of one running sum; windows containing NaN are NaN
+    """
+    missing = np.isnan(values)
+    has_gaps = missing.any()
+    totals = np.cumsum(np.where(missing, 0.0, values) if has_gaps else values, axis=-1, dtype=np.float64)
+
+    sums = totals[..., period - 1:].copy()
+    sums[..., 1:] -= totals[..., :-period]
+    if has_gaps:
+        gaps = np.cumsum(missing, axis=-1)
+        window_gaps = gaps[..., period - 1:].copy()
+        window_gaps[..., 1:] -= gaps[..., :-period]
+        sums[window_gaps > 0] = np.nan
+    return sums
+
+
+def sma(values, period: int, dtype=np.float64) -> np.ndarray:
+    """Simple Moving Average in O(bars) for any period; windows containing NaN are NaN"""
+    values = as_array(values, dtype)
+    out = np.full(values.shape, np.nan, dtype=dtype)
+    if 0 < period <= values.shape[-1]:
+        out[..., period - 1:] = window_sums(values, period) / period
+    return out
+
+
+def wma(values, period: int, dtype=np.float64) -> np.ndarray:
+    """Weighted Moving Average with linear weights (newest bar heaviest)"""
+    values = as_array(values, dtype)
+    out = np.full(values.shape, np.nan, dtype=dtype)
+    bars = values.shape[-1]
+    if 0 < period <= bars:
+        weights = np.arange(1, period + 1, dtype=dtype)
+        # np.convolve flips the kernel, so pass the weights reversed; a
+        # prefix-sum form would lose precision to sum(i * x) over long series
+        kernel = (weights / weights.sum())[::-1]
+        for series, row in zip(values.reshape(-1, bars), out.reshape(-1, bars)):
+            row[period - 1:] = np.convolve(series, kernel, mode='valid')
+    return out
+
+
+def ema(values, alpha: float, min_periods: int = 0, dtype=np.float64) -> np.ndarray:
+    """
+    Exponential moving average matching pandas ewm(alpha=..., adjust=False).
+
+    The recursion is evaluated EMA_BLOCK bars at a time: inside a block it is
+    a lower-triangular matrix product, and only the last value of each block
+    is carried into the next one.
+    """
+    values = as_array(values, dtype)
+    out = np.empty(values.shape, dtype=dtype)
+    bars = values.shape[-1]
+    if bars == 0:
+        return out
+
+    decay = 1.0 - alpha
+    steps = np.arange(EMA_BLOCK)
+    lags = steps[:, None] - steps[None, :]
+    kernel = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0).astype(dtype)
+    carry_weights = (decay ** (steps + 1)).astype(dtype)
+
+    out[..., 0] = values[..., 0]
+    carry = values[..., 0]
+    for start in range(1, bars, EMA_BLOCK):
+        block = values[..., start:start + EMA_BLOCK]
+        width = block.shape[-1]
+        smoothed = block @ kernel[:width, :width].T + carry[..., None] * carry_weights[:width]
+        out[..., start:start + width] = smoothed
+        carry = smoothed[..., -1]
+
+    if min_periods > 1:
+        out[..., :min_periods - 1] = np.nan
+    return out
+
+
+def rsi(close, period: int = 14, dtype=np.float64) -> np.ndarray:
+    """Wilder RSI matching ta.momentum.RSIIndicator"""
+    close = as_array(close, dtype)
+    diff = np.zeros(close.shape, dtype=dtype)
+    diff[..., 1:] = np.diff(close, axis=-1)
+
+    ema_up = ema(np.where(diff > 0, diff, 0.0), 1 / period, period, dtype)
+    ema_down = ema(np.where(diff < 0, -diff, 0.0), 1 / period, period, dtype)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down))).astype(dtype)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9, dtype=np.float64) -> Dict[str, np.ndarray]:
+    """MACD line, signal and histogram matching ta.trend.MACD"""
+    close = as_array(close, dtype)
+    macd_line = ema(close, 2 / (fast + 1), fast, dtype) - ema(close, 2 / (slow + 1), slow, dtype)
+
+    # The signal EMA starts at the first defined MACD value
+    signal_line = np.full(close.shape, np.nan, dtype=dtype)
+    if close.shape[-1] >= slow:
+        signal_line[..., slow - 1:] = ema(macd_line[..., slow - 1:], 2 / (signal + 1), signal, dtype)
+
+    return {
+        'macd': macd_line,
+        'signal': signal_line,
+        'histogram': macd_line - signal_line
+    }
+
+
+def demarker(high, low, period: int = 14, dtype=np.float64) -> np.ndarray:
+    """DeMarker indicator; the first bar has no DeMax/DeMin"""
+    high = as_array(high, dtype)
+    low = as_array(low, dtype)
+
+    de_max = np.full(high.shape, np.nan, dtype=dtype)
+    de_min = np.full(low.shape, np.nan, dtype=dtype)
+    de_max[..., 1:] = np.fmax(np.diff(high, axis=-1), 0.0)
+    de_min[..., 1:] = np.fmax(-np.diff(low, axis=-1), 0.0)
+
+    sma_de_max = sma(de_max, period, dtype)
+    sma_de_min = sma(de_min, period, dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sma_de_max / (sma_de_max + sma_de_min)
+
+
+def volume_oscillator(volume, short_period: int = 5, long_period: int = 10, dtype=np.float64) -> np.ndarray:
+    """Volume Oscillator: short vs long volume average, in percent"""
+    short_ma = sma(volume, short_period, dtype)
+    long_ma = sma(volume, long_period, dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((short_ma - long_ma) / long_ma) * 100
@@ -0,0 +1,181 @@
+"""
+Parallel Universe Scan for the Technical Analysis Engine
+Process-pool evaluation of the trading universe over shared-memory candles
+Author: Ankit Singh
+
+The parent copies every pair's latest candles into one
+multiprocessing.shared_memory block laid out as (fields x pairs x bars)
+float64, right-aligned and NaN-padded for pairs with shorter histories.
+Workers attach to the block by name and wrap their rows in NumPy views, so
+a scan task pickles only row numbers and a few timestamps, and results come
+back as compact tuples instead of Signal objects or indicator frames.
+Worker engines have no higher-timeframe candles, so the parent adds the
+"5m/15m/1h trend agrees" note (see attach_resampler) while collecting.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from candle_store import FIELDS
+from technical_analysis import Signal, TechnicalAnalysisEngine
+
+# Per-worker state, set up by _init_worker
+_worker_engine = None
+_worker_blocks = {}  # shared memory name -> SharedMemory
+
+
+def _init_worker(backend: str, dtype):
+    global _worker_engine
+    _worker_engine = TechnicalAnalysisEngine(backend=backend, dtype=dtype)
+
+
+def worker_engine() -> TechnicalAnalysisEngine:
+    """The calling worker process's engine"""
+    return _worker_engine
+
+
+def _scan_rows(name: str, shape: Tuple[int, int, int], rows: List[int], pairs: List[str],
+               lengths: List[int], last_candles: List[int], last_bar_only: bool) -> List[Optional[Tuple]]:
+    """
+    Evaluate a partition of the block's rows in a worker. Returns one entry
+    per row: None, or (direction, confidence, valid_until, analysis,
+    entry_time, score).
+    """
+    if name not in _worker_blocks:
+        for block in _worker_blocks.values():
+            block.close()  # The parent replaced the block; drop stale mappings
+        _worker_blocks.clear()
+        # Workers share the parent's resource tracker, so attaching does not
+        # tie the block's lifetime to this process
+        _worker_blocks[name] = SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=_worker_blocks[name].buf)
+
+    loaded = {}
+    for row, pair, length, last_candle in zip(rows, pairs, lengths, last_candles):
+        data = {field: values[index, row, shape[2] - length:] for index, field in enumerate(FIELDS)}
+        loaded[pair] = (data, np.datetime64(last_candle, 'ns'))
+
+    results = _worker_engine.evaluate_loaded(loaded, last_bar_only)
+    compact = []
+    for pair in pairs:
+        signal = results[pair][0]
+        compact.append(None if signal is None else (
+            signal.direction, signal.confidence, signal.valid_until,
+            signal.analysis, signal.entry_time, signal.score
+        ))
+    return compact
+
+
+class ParallelScanner:
+    """
+    Universe scans spread over a process pool. scan() returns the same
+    pair -> (signal or None, last candle time) mapping as
+    TechnicalAnalysisEngine.evaluate_universe, so it can stand in for it.
+    Run one scan at a time: the next scan overwrites the shared block.
+    """
+
+    def __init__(self, engine: TechnicalAnalysisEngine, workers: Optional[int] = None, bars: int = 500):
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.bars = bars
+        self.block = None
+        self.shape = None
+        # Spawned workers do not inherit the parent's threads or event loop
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(engine.backend, engine.dtype)
+        )
+
+    def publish(self, pairs: List[str]) -> Tuple[List[str], List[int], List[int]]:
+        """
+        Copy each pair's latest candles into the shared block (reallocated
+        only when the universe grows). Returns the pairs with enough
+        candles, their bar counts and last candle times (ns since epoch).
+        """
+        loaded = []
+        for pair in pairs:
+            data, last_candle = self.engine.get_pair_data(pair)
+            if data is not None:
+                loaded.append((pair, data, last_candle))
+
+        shape = (len(FIELDS), max(len(loaded), 1), self.bars)
+        if self.shape is None or self.shape[1] < shape[1]:
+            self.close_block()
+            self.block = SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+            self.shape = shape
+        values = np.ndarray(self.shape, dtype=np.float64, buffer=self.block.buf)
+
+        lengths, last_candles = [], []
+        for row, (pair, data, last_candle) in enumerate(loaded):
+            length = min(len(data['close']), self.bars)
+            values[:, row, :self.bars - length] = np.nan
+            for index, field in enumerate(FIELDS):
+                values[index, row, self.bars - length:] = np.asarray(data[field], dtype=np.float64)[-length:]
+            lengths.append(length)
+            last_candles.append(int(pd.Timestamp(last_candle).value))
+        return [pair for pair, _, _ in loaded], lengths, last_candles
+
+    def submit(self, pairs: Optional[List[str]] = None, last_bar_only: bool = False):
+        """Publish candles and start one task per partition; returns (pairs, last candles, futures)"""
+        pairs, lengths, last_candles = self.publish(list(pairs or self.engine.trading_pairs))
+        partitions = np.array_split(np.arange(len(pairs)), min(self.workers, len(pairs)) or 1)
+
+        futures = []
+        for rows in partitions:
+            rows = rows.tolist()
+            if rows:
+                futures.append((rows, self.pool.submit(
+                    _scan_rows, self.block.name, self.shape, rows, [pairs[row] for row in rows],
+                    [lengths[row] for row in rows], [last_candles[row] for row in rows], last_bar_only
+                )))
+        return pairs, last_candles, futures
+
+    def collect(self, pairs: List[str], last_candles: List[int],
+                partitions: List[Tuple[List[int], List]]) -> Dict[str, Tuple[Optional[Signal], object]]:
+        results = {}
+        for rows, compact in partitions:
+            for row, values in zip(rows, compact):
+                signal = None
+                if values is not None:
+                    direction, confidence, valid_until, analysis, entry_time, score = values
+                    signal = Signal(pairs[row], direction, confidence, valid_until, analysis, entry_time, score=score)
+                    self.engine.add_timeframe_note(signal)
+                results[pairs[row]] = (signal, pd.Timestamp(last_candles[row]))
+        return {pair: results[pair] for pair in pairs}
+
+    def scan(self, pairs: Optional[List[str]] = None, last_bar_only: bool = False) -> Dict[str, Tuple[Optional[Signal], object]]:
+        """Evaluate the universe across the pool (blocks until every partition is done)"""
+        pairs, last_candles, futures = self.submit(pairs, last_bar_only)
+        return self.collect(pairs, last_candles, [(rows, future.result()) for rows, future in futures])
+
+    async def ascan(self, pairs: Optional[List[str]] = None, last_bar_only: bool = False):
+        """scan() for the event loop: awaits the workers instead of blocking on them"""
+        pairs, last_candles, futures = self.submit(pairs, last_bar_only)
+        compact = await asyncio.gather(*(asyncio.wrap_future(future) for _, future in futures))
+        return self.collect(pairs, last_candles, [(rows, result) for (rows, _), result in zip(futures, compact)])
+
+    def close_block(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+            self.shape = None
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.close_block()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -13,7 +13,6 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import sqlite3
 import threading
-import time
 from dataclasses import asdict
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -27,9 +26,15 @@ load_dotenv()
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
-from telegram.error import TelegramError
+from telegram.error import NetworkError, RetryAfter, TelegramError
 
 from technical_analysis import TechnicalAnalysisEngine, Signal
+from broadcaster import Broadcaster
+from engine_executor import EngineExecutor
+from parallel_scan import ParallelScanner
+from rate_limiter import KeyedRateLimiter
+from signal_board import SignalBoard
+from signal_scheduler import SignalScheduler
 
 # Configure logging
 logging.basicConfig(
@@ -57,6 +62,19 @@ class QuotexSignalBotFinal:
         
         # Initialize components
         self.engine = TechnicalAnalysisEngine()
+        
+        # SCAN_WORKERS > 0 spreads universe scans over that many processes
+        scan_workers = int(os.getenv('SCAN_WORKERS', '0'))
+        self.scanner = ParallelScanner(self.engine, workers=scan_workers) if scan_workers > 0 else None
+        self.signal_board = SignalBoard(self.engine, scanner=self.scanner)  # Refreshed in the background, see on_startup
+        
+        # On-demand analyses run off the event loop (ENGINE_EXECUTOR: thread or process)
+        self.engine_executor = EngineExecutor(
+            self.engine,
+            mode=os.getenv('ENGINE_EXECUTOR', 'thread'),
+            workers=int(os.getenv('ENGINE_WORKERS', '2')),
+            timeout=float(os.getenv('ENGINE_TIMEOUT', '10'))
+        )
         self.active_users = set()
         self.user_settings = {}
         self.signal_history = []
@@ -75,9 +93,24 @@ class QuotexSignalBotFinal:
         # Initialize database
         self.init_database()
         
-        # Signal generation control
-        self.signal_active = False
-        self.signal_thread = None
+        # Signal generation control: one broadcast round per candle close while anyone is subscribed
+        self.signal_scheduler = SignalScheduler(
+            self.broadcast_best_signal,
+            candle_seconds=self.signal_board.candle_seconds,
+            settle_delay=self.signal_board.settle_delay + 1,
+            should_run=lambda: bool(self.active_users)
+        )
+        self.last_broadcast = None
+        
+        # Fan-out over the running application's bot, set up in on_startup
+        self.broadcast_concurrency = int(os.getenv('BROADCAST_CONCURRENCY', '32'))
+        self.broadcaster = None
+        
+        # Telegram flood limits: messages/second overall and per chat
+        self.send_limiter = KeyedRateLimiter(
+            rate=float(os.getenv('BROADCAST_RATE', '30')),
+            key_rate=float(os.getenv('CHAT_RATE', '1'))
+        )
         
         # Setup matplotlib
         self.setup_matplotlib()
@@ -250,10 +283,8 @@ class QuotexSignalBotFinal:
         
         self.active_users.add(user_id)
         
-        if not self.signal_active:
-            self.signal_active = True
-            self.signal_thread = threading.Thread(target=self.signal_generator_loop, daemon=True)
-            self.signal_thread.start()
+        if not self.signal_scheduler.running:
+            self.signal_scheduler.start()
             logger.info("🚀 Signal generation started")
         
         start_message = f"""
@@ -261,7 +292,7 @@ class QuotexSignalBotFinal:
 
 **✅ Status:** Live signal generation started
 **👤 User:** {username}
-**📊 Frequency:** Every 45-60 seconds
+**📊 Frequency:** Every candle close (1 minute)
 **🎯 Quality:** Only HIGH/MEDIUM confidence signals
 **📈 Strategy:** 10-second expiry optimized
 
@@ -293,8 +324,8 @@ Good luck trading! 📈💰
         
         self.active_users.discard(user_id)
         
-        if not self.active_users:
-            self.signal_active = False
+        if not self.active_users and self.signal_scheduler.running:
+            await self.signal_scheduler.stop()
             logger.info("⏹️ Signal generation stopped (no active users)")
         
         stop_message = f"""
@@ -329,28 +360,30 @@ See you next time! 👋
         """Generate random pair signal"""
         username = update.effective_user.username or update.effective_user.first_name
         
-        await update.message.reply_text("🔄 **Generating random signal...**\n\nAnalyzing market conditions...", parse_mode='Markdown')
+        await update.message.reply_text("🔄 **Generating random signal...**\n\nScanning all pairs for the best setup...", parse_mode='Markdown')
         
-        # Try multiple pairs for better chance of signal
-        for attempt in range(5):
-            pair = self.engine.get_random_pair()
-            signal = self.engine.generate_comprehensive_signal(pair)
+        # Best-ranked setup across all pairs, straight from the signal board
+        # (scanned on demand while the board is being built or has expired)
+        if await self.signal_board.wait_ready(timeout=5) and self.signal_board.is_serving():
+            signal = self.signal_board.best('MEDIUM')
+        else:
+            signals = await self.scan_universe()
+            signal = signals[0] if signals else None
+        if signal:
+            message = self.format_professional_signal(signal)
+            await update.message.reply_text(message, parse_mode='Markdown')
             
-            if signal and signal.confidence in ['HIGH', 'MEDIUM']:
-                message = self.format_professional_signal(signal)
-                await update.message.reply_text(message, parse_mode='Markdown')
-                
-                # Store signal
-                self.store_signal(signal, update.effective_user.id)
-                logger.info(f"Random signal generated for {username}: {pair} {signal.direction}")
-                return
+            # Store signal
+            self.store_signal(signal, update.effective_user.id)
+            logger.info(f"Best signal sent to {username}: {signal.pair} {signal.direction}")
+            return
         
         # No signal found
         no_signal_message = f"""
 ❌ **कोई Quality Signal नहीं मिला**
 
 **🔍 Analysis Result:**
-• 5 different pairs analyzed
+• All {len(self.engine.trading_pairs)} pairs analyzed
 • Current market conditions not optimal
 • Waiting for better entry opportunities
 
@@ -420,8 +453,10 @@ Select your preferred trading pair:
             parse_mode='Markdown'
         )
         
-        # Generate signal
-        signal = self.engine.generate_comprehensive_signal(pair)
+        # Latest evaluation from the signal board, analyzed on demand if missing or expired
+        await self.signal_board.wait_ready(timeout=5)
+        entry = self.signal_board.get(pair)
+        signal = entry.signal if entry else await self.analyze_pair(pair)
         
         if signal and signal.confidence in ['HIGH', 'MEDIUM']:
             message = self.format_professional_signal(signal)
@@ -456,6 +491,59 @@ Patience leads to better trading opportunities!
             
             await query.edit_message_text(no_signal_message, parse_mode='Markdown')
     
+    async def analyze_pair(self, pair: str) -> Optional[Signal]:
+        """One pair's signal from the engine executor; None on timeout or error"""
+        try:
+            return await self.engine_executor.generate_signal(pair)
+        except asyncio.TimeoutError:
+            logger.warning(f"Analysis of {pair} timed out")
+        except Exception as e:
+            logger.error(f"Error analyzing {pair}: {e}")
+        return None
+    
+    async def scan_universe(self) -> List[Signal]:
+        """Ranked MEDIUM+ signals from the engine executor; empty on timeout or error"""
+        try:
+            return await self.engine_executor.scan_universe(min_confidence='MEDIUM')
+        except asyncio.TimeoutError:
+            logger.warning("Universe scan timed out")
+        except Exception as e:
+            logger.error(f"Error scanning pairs: {e}")
+        return []
+    
+    async def best_pairs_today(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show the current best-ranked setups from the signal board"""
+        if await self.signal_board.wait_ready(timeout=30) and self.signal_board.is_serving():
+            signals = self.signal_board.top(5)
+            board_age = self.signal_board.age()
+        else:
+            # Expired board (refreshes failing): scan on demand instead
+            signals = (await self.scan_universe())[:5]
+            board_age = 0.0
+        
+        if signals:
+            lines = []
+            for rank, signal in enumerate(signals, start=1):
+                direction = "🟢 UP" if signal.direction == "UP" else "🔴 DOWN"
+                lines.append(f"{rank}. `{signal.pair}` - {direction} - **{signal.confidence}**")
+            setups = "\n".join(lines)
+        else:
+            setups = "अभी कोई pair signal conditions पूरी नहीं कर रहा।"
+        
+        best_pairs_message = f"""
+📈 **BEST PAIRS RIGHT NOW**
+
+**🏆 Top Setups (all {len(self.engine.trading_pairs)} pairs scanned):**
+{setups}
+
+**🕒 Updated:** {f"{board_age:.0f} seconds ago" if board_age is not None else "pending"}
+**🔄 Refresh:** Every candle close
+
+**💡 Tip:** "🎯 Custom Pair Signal" से किसी भी pair का full analysis देखें।
+        """.strip()
+        
+        await update.message.reply_text(best_pairs_message, parse_mode='Markdown')
+    
     def format_professional_signal(self, signal: Signal) -> str:
         """Format signal with professional presentation"""
         direction_emoji = "🟢 UP (CALL)" if signal.direction == "UP" else "🔴 DOWN (PUT)"
@@ -492,82 +580,67 @@ Patience leads to better trading opportunities!
 **⏰ Trade within validity period for best results!**
         """.strip()
     
-    def signal_generator_loop(self):
-        """Background signal generation loop"""
-        logger.info("🔄 Signal generation loop started")
-        
-        while self.signal_active and self.active_users:
-            try:
-                # Wait between signals (45-60 seconds)
-                wait_time = 45 + (time.time() % 15)  # 45-60 seconds
-                time.sleep(wait_time)
-                
-                if not self.signal_active or not self.active_users:
-                    break
-                
-                # Generate signal for random pair
-                pair = self.engine.get_random_pair()
-                signal = self.engine.generate_comprehensive_signal(pair)
-                
-                if signal and signal.confidence in ['HIGH', 'MEDIUM']:
-                    message = self.format_professional_signal(signal)
-                    
-                    # Broadcast to active users
-                    asyncio.create_task(self.broadcast_signal(message, signal))
-                    
-                    logger.info(f"Auto signal generated: {pair} {signal.direction} ({signal.confidence})")
-                
-            except Exception as e:
-                logger.error(f"Error in signal generator: {e}")
-                time.sleep(10)  # Wait before retrying
-        
-        logger.info("⏹️ Signal generation loop stopped")
+    async def broadcast_best_signal(self):
+        """Scheduled job: broadcast the board's best setup after each candle close, once per setup"""
+        if not await self.signal_board.wait_current(timeout=self.signal_board.candle_seconds / 2):
+            logger.warning("Signal board missed this candle close; skipping broadcast")
+            return
+        
+        signal = self.signal_board.best('MEDIUM')
+        if signal and (signal.pair, signal.entry_time) != self.last_broadcast:
+            self.last_broadcast = (signal.pair, signal.entry_time)
+            message = self.format_professional_signal(signal)
+            await self.broadcast_signal(message, signal)
+            logger.info(f"Auto signal generated: {signal.pair} {signal.direction} ({signal.confidence})")
     
     async def broadcast_signal(self, message: str, signal: Signal):
         """Broadcast signal to all active users"""
         try:
-            application = Application.builder().token(self.token).build()
-            
-            for user_id in self.active_users.copy():
-                try:
-                    await application.bot.send_message(
-                        chat_id=user_id,
-                        text=message,
-                        parse_mode='Markdown'
-                    )
-                    
-                    # Store signal for user
-                    self.store_signal(signal, user_id)
-                    
-                except TelegramError as e:
-                    logger.error(f"Failed to send signal to user {user_id}: {e}")
-                    # Remove inactive user
+            report = await self.broadcaster.broadcast(self.active_users.copy(), message, parse_mode='Markdown')
+            
+            # Store signal for every recipient in one transaction, off the event loop
+            if report.delivered:
+                await asyncio.to_thread(self.store_signals, signal, report.delivered)
+            
+            for user_id, e in report.failed.items():
+                logger.error(f"Failed to send signal to user {user_id}: {e}")
+                # Flood-waits and network trouble are temporary; anything else means the chat is gone
+                if isinstance(e, TelegramError) and not isinstance(e, (RetryAfter, NetworkError)):
                     self.active_users.discard(user_id)
+            
+            logger.info(f"📣 Broadcast {signal.pair} to {len(report.delivered)}/{report.recipients} users in "
+                        f"{report.completion_seconds:.2f}s (p50 {report.p50:.2f}s, p99 {report.p99:.2f}s, "
+                        f"{report.retries} flood-wait retries)")
                     
         except Exception as e:
             logger.error(f"Error broadcasting signal: {e}")
     
     def store_signal(self, signal: Signal, user_id: int):
         """Store signal in database"""
+        self.store_signals(signal, [user_id])
+    
+    def store_signals(self, signal: Signal, user_ids: List[int]):
+        """Store one signal for many users with a single commit and result check"""
         try:
             cursor = self.conn.cursor()
-            cursor.execute("""
+            cursor.executemany("""
                 INSERT INTO signals (pair, direction, confidence, user_id, analysis, timestamp) 
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (signal.pair, signal.direction, signal.confidence, user_id, signal.analysis, signal.entry_time))
+            """, [(signal.pair, signal.direction, signal.confidence, user_id, signal.analysis, signal.entry_time)
+                  for user_id in user_ids])
             self.conn.commit()
             
             # Update performance stats
-            self.performance_stats['total_signals'] += 1
+            self.performance_stats['total_signals'] += len(user_ids)
             
             # Schedule result check (simulated - in production connect to broker API)
-            threading.Timer(300, self.check_signal_result, args=[cursor.lastrowid]).start()
+            threading.Timer(300, self.check_signal_result, args=[signal.pair, signal.entry_time]).start()
             
         except Exception as e:
             logger.error(f"Error storing signal: {e}")
     
-    def check_signal_result(self, signal_id: int):
-        """Check and update signal result"""
+    def check_signal_result(self, pair: str, entry_time: str):
+        """Check and update the result of every pending row of one signal"""
         try:
             # Simulate result (in production, get from broker API)
             import random
@@ -576,22 +649,22 @@ Patience leads to better trading opportunities!
             
             cursor = self.conn.cursor()
             cursor.execute("""
-                UPDATE signals SET result = ?, accuracy = ? WHERE id = ?
-            """, (result, accuracy, signal_id))
+                UPDATE signals SET result = ?, accuracy = ? WHERE pair = ? AND timestamp = ? AND result = 'pending'
+            """, (result, accuracy, pair, entry_time))
             self.conn.commit()
             
             # Update performance stats
             if result == 'win':
-                self.performance_stats['winning_signals'] += 1
+                self.performance_stats['winning_signals'] += cursor.rowcount
             else:
-                self.performance_stats['losing_signals'] += 1
+                self.performance_stats['losing_signals'] += cursor.rowcount
             
             # Recalculate accuracy
             total = self.performance_stats['winning_signals'] + self.performance_stats['losing_signals']
             if total > 0:
                 self.performance_stats['accuracy'] = (self.performance_stats['winning_signals'] / total) * 100
             
-            logger.info(f"Signal {signal_id} result updated: {result}")
+            logger.info(f"Signal {pair} {entry_time} result updated: {result} ({cursor.rowcount} rows)")
             
         except Exception as e:
             logger.error(f"Error updating signal result: {e}")
@@ -719,10 +792,38 @@ Only invest what you can afford to lose.
         
         await update.message.reply_text(help_message, parse_mode='Markdown')
     
+    async def on_startup(self, application: Application):
+        """Start background work once the application's event loop is running"""
+        self.broadcaster = Broadcaster(application.bot, concurrency=self.broadcast_concurrency,
+                                       rate_limiter=self.send_limiter)
+        self.signal_board.start()
+        logger.info("📋 Signal board refreshing every candle close")
+    
+    async def on_shutdown(self, application: Application):
+        """Stop background work before the event loop closes"""
+        await self.signal_scheduler.stop()
+        await self.signal_board.stop()
+        if self.scanner is not None:
+            self.scanner.close()
+        self.engine_executor.close()
+        logger.info(f"📋 Signal board stopped: {self.signal_board.get_stats()}")
+        logger.info(f"⚙️ Engine executor stopped: {self.engine_executor.get_stats()}")
+        logger.info(f"⏱️ Signal scheduler stopped: {self.signal_scheduler.get_stats()}")
+        if self.broadcaster is not None:
+            logger.info(f"📣 Broadcaster stopped: {self.broadcaster.get_stats()}")
+    
     def run(self):
         """Run the bot"""
         try:
-            application = Application.builder().token(self.token).build()
+            application = (
+                Application.builder()
+                .token(self.token)
+                .concurrent_updates(True)  # Handlers awaiting the engine executor don't hold up other users
+                .connection_pool_size(self.broadcast_concurrency + 8)  # Broadcast sends plus handler replies
+                .post_init(self.on_startup)
+                .post_shutdown(self.on_shutdown)
+                .build()
+            )
             
             # Command handlers
             application.add_handler(CommandHandler("start", self.start_command))
@@ -734,6 +835,7 @@ Only invest what you can afford to lose.
             application.add_handler(MessageHandler(filters.Regex("🎲 Random Signal"), self.random_signal))
             application.add_handler(MessageHandler(filters.Regex("🎯 Custom Pair Signal"), self.custom_pair_signal))
             application.add_handler(MessageHandler(filters.Regex("📊 Today Statistics"), self.show_statistics))
+            application.add_handler(MessageHandler(filters.Regex("📈 Best Pairs Today"), self.best_pairs_today))
             application.add_handler(MessageHandler(filters.Regex("ℹ️ Help & Info"), self.help_command))
             
             # Callback handlers
@@ -0,0 +1,125 @@
+"""
+Rate Limiting for outbound API calls
+Async token bucket shared by every request to one upstream, plus a global
+and per-key limiter for Telegram's per-bot and per-chat flood limits
+Author: Ankit Singh
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Hashable
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens per second refill a bucket of `capacity`,
+    each call takes one token and waits only when the bucket is empty. A
+    full bucket lets a burst of `capacity` calls through at once, then the
+    long-run rate never exceeds `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, **kwargs) -> 'TokenBucket':
+        """Bucket for an API limit quoted in requests per minute (burst = one minute's worth)"""
+        kwargs.setdefault('capacity', requests_per_minute)
+        return cls(requests_per_minute / 60.0, **kwargs)
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is now), without taking it"""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return seconds until one will be"""
+        delay = self.delay()
+        if delay == 0:
+            self.tokens -= 1
+        return delay
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds` (e.g. a server's Retry-After)"""
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket has refilled completely (indistinguishable from a new one)"""
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay == 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class KeyedRateLimiter:
+    """
+    A global TokenBucket plus one bucket per key, e.g. Telegram's ~30
+    messages/second per bot and ~1 message/second per chat. A call takes a
+    token from both buckets, and from neither while it has to wait.
+    """
+
+    def __init__(self, rate: float, key_rate: float, capacity: float = 1.0, key_capacity: float = 1.0,
+                 max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        """max_keys: per-key buckets kept before idle ones are dropped"""
+        self.global_bucket = TokenBucket(rate, capacity, clock)
+        self.key_rate = key_rate
+        self.key_capacity = key_capacity
+        self.max_keys = max_keys
+        self.clock = clock
+        self.buckets: Dict[Hashable, TokenBucket] = {}
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self._drop_idle()
+            bucket = self.buckets[key] = TokenBucket(self.key_rate, self.key_capacity, self.clock)
+        return bucket
+
+    def _drop_idle(self):
+        for key in [key for key, bucket in self.buckets.items() if bucket.idle]:
+            del self.buckets[key]
+
+    def try_acquire(self, key: Hashable) -> float:
+        """Take a global and a per-key token if both are available; otherwise return the wait"""
+        bucket = self.bucket(key)
+        delay = max(bucket.delay(), self.global_bucket.delay())
+        if delay == 0:
+            bucket.tokens -= 1
+            self.global_bucket.tokens -= 1
+        return delay
+
+    async def acquire(self, key: Hashable) -> float:
+        """Wait for the key's turn; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(key)
+            if delay == 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def pause(self, key: Hashable, seconds: float, everyone: bool = True):
+        """Honor a flood-wait: no calls for `key` (and by default for any key) for `seconds`"""
+        self.bucket(key).pause(seconds)
+        if everyone:
+            self.global_bucket.pause(seconds)
@@ -0,0 +1,229 @@
+"""
+Signal Board for the Quotex Signal Bot
+Latest evaluation of every pair, precomputed in the background
+Author: Ankit Singh
+
+A background task re-evaluates the whole universe once per candle close
+(TechnicalAnalysisEngine.evaluate_universe) and swaps in a new board in a
+single assignment, so handlers read the best setup or any pair's latest
+result from memory instead of running indicators while the user waits.
+Reads return nothing once the board is stale or an entry's signal has
+expired (the candle after the one it was evaluated on has closed), so a
+board left over from failed refreshes is never served; callers then fall
+back to analyzing on demand.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from technical_analysis import Signal, TechnicalAnalysisEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BoardEntry:
+    """One pair's latest evaluation"""
+    pair: str
+    signal: Optional[Signal]
+    last_candle: pd.Timestamp  # Open time of the candle the evaluation used
+    evaluated_at: datetime
+
+
+class SignalBoard:
+    """In-memory board of per-pair evaluations, refreshed at every candle close"""
+
+    def __init__(self, engine: TechnicalAnalysisEngine, pairs: Optional[List[str]] = None,
+                 candle_seconds: float = 60.0, settle_delay: float = 1.0,
+                 clock: Callable[[], datetime] = datetime.now, scanner=None):
+        """
+        settle_delay: seconds after each candle close before refreshing, so
+        the closing candle has arrived. The board counts as stale once it
+        is older than two candles.
+        scanner: optional parallel_scan.ParallelScanner to spread each
+        refresh over worker processes
+        """
+        self.engine = engine
+        self.scanner = scanner
+        self.pairs = list(pairs or engine.trading_pairs)
+        self.candle_seconds = candle_seconds
+        self.settle_delay = settle_delay
+        self.clock = clock
+        self.entries = {}  # pair -> BoardEntry
+        self.ranked = []  # Signals, best first
+        self.refreshed_at = None
+        self.ready = asyncio.Event()
+        self.refreshed = asyncio.Event()  # Set (and replaced) after every background refresh
+        self.task = None
+        self.stats = Counter()
+
+    def refresh(self) -> int:
+        """Re-evaluate every pair and publish the new board; returns pairs evaluated"""
+        started = time.perf_counter()
+        now = self.clock()
+        evaluate = self.scanner.scan if self.scanner is not None else self.engine.evaluate_universe
+        entries = {
+            pair: BoardEntry(pair, signal, pd.Timestamp(last_candle), now)
+            for pair, (signal, last_candle) in evaluate(self.pairs).items()
+        }
+        ranked = sorted((entry.signal for entry in entries.values() if entry.signal),
+                        key=lambda signal: signal.score, reverse=True)
+
+        # Readers on other threads see either the old board or the new one
+        self.entries, self.ranked, self.refreshed_at = entries, ranked, now
+
+        elapsed = time.perf_counter() - started
+        self.stats['refreshes'] += 1
+        self.stats['last_refresh_seconds'] = elapsed
+        self.stats['max_refresh_seconds'] = max(self.stats['max_refresh_seconds'], elapsed)
+        return len(entries)
+
+    # Reads
+
+    def get(self, pair: str) -> Optional[BoardEntry]:
+        """A pair's latest evaluation (None before the first refresh, without data or once expired)"""
+        self._count_read()
+        entry = self.entries.get(pair)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        if not self.is_valid(entry):
+            self.stats['expired_reads'] += 1
+            return None
+        return replace(entry, signal=replace(entry.signal) if entry.signal else None)
+
+    def best(self, min_confidence: str = 'MEDIUM') -> Optional[Signal]:
+        """Highest-ranked current signal of at least min_confidence"""
+        top = self.top(1, min_confidence)
+        return top[0] if top else None
+
+    def top(self, limit: int = 5, min_confidence: str = 'LOW') -> List[Signal]:
+        """Up to `limit` current signals, best first (expired ones are left out)"""
+        self._count_read()
+        threshold = TechnicalAnalysisEngine.CONFIDENCE_LEVELS[min_confidence]
+        entries = self.entries
+        signals = [signal for signal in self.ranked
+                   if TechnicalAnalysisEngine.CONFIDENCE_LEVELS[signal.confidence] >= threshold
+                   and signal.pair in entries and self.is_valid(entries[signal.pair])]
+        return [replace(signal) for signal in signals[:limit]]
+
+    def _count_read(self):
+        self.stats['reads'] += 1
+        if self.is_stale():
+            self.stats['stale_reads'] += 1
+
+    # Staleness
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last refresh"""
+        if self.refreshed_at is None:
+            return None
+        return (self.clock() - self.refreshed_at).total_seconds()
+
+    def is_stale(self) -> bool:
+        age = self.age()
+        return age is None or age > 2 * self.candle_seconds
+
+    def is_valid(self, entry: BoardEntry) -> bool:
+        """Whether an entry may still be served: the board is not stale and
+        the candle after the evaluated one has not closed yet"""
+        expires = entry.last_candle + pd.Timedelta(seconds=2 * self.candle_seconds)
+        return not self.is_stale() and pd.Timestamp(self.clock()) < expires
+
+    def is_serving(self) -> bool:
+        """Whether any entry may still be served"""
+        return any(self.is_valid(entry) for entry in self.entries.values())
+
+    def is_current(self) -> bool:
+        """Whether the board was refreshed after the latest candle close"""
+        if self.refreshed_at is None:
+            return False
+        now = self.clock().timestamp()
+        return self.refreshed_at.timestamp() >= now // self.candle_seconds * self.candle_seconds
+
+    def candle_lag(self) -> Optional[float]:
+        """Seconds since the close of the oldest candle any entry was evaluated on"""
+        if not self.entries:
+            return None
+        oldest = min(entry.last_candle for entry in self.entries.values())
+        return (pd.Timestamp(self.clock()) - oldest).total_seconds() - self.candle_seconds
+
+    def get_stats(self) -> Dict:
+        """Refresh/read counters plus current board age and candle lag"""
+        reads = self.stats['reads']
+        return {
+            **self.stats,
+            'pairs': len(self.entries),
+            'signals': len(self.ranked),
+            'age_seconds': self.age(),
+            'candle_lag_seconds': self.candle_lag(),
+            'stale_read_rate': self.stats['stale_reads'] / reads if reads else 0.0
+        }
+
+    # Background refresh
+
+    def seconds_until_refresh(self) -> float:
+        """Time until the next candle close plus settle_delay"""
+        now = self.clock().timestamp()
+        next_close = (now // self.candle_seconds + 1) * self.candle_seconds
+        return next_close + self.settle_delay - now
+
+    async def run(self):
+        """Refresh now, then after every candle close, until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if self.engine.market_data_provider is not None:
+                    await self.engine.refresh_from_provider(pairs=self.pairs)
+                await loop.run_in_executor(None, self.refresh)
+                self.ready.set()
+                refreshed, self.refreshed = self.refreshed, asyncio.Event()
+                refreshed.set()
+            except Exception:
+                self.stats['errors'] += 1
+                logger.exception("Error refreshing signal board")
+            await asyncio.sleep(self.seconds_until_refresh())
+
+    def start(self) -> asyncio.Task:
+        """Start the background refresh on the running event loop"""
+        if self.task is None or self.task.done():
+            self.ready = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the first refresh; False if it did not finish within timeout"""
+        if self.refreshed_at is not None:
+            return True
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait_current(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the refresh following the latest candle close; False on timeout"""
+        async def until_current():
+            while not self.is_current():
+                await self.refreshed.wait()
+        try:
+            await asyncio.wait_for(until_current(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
@@ -0,0 +1,98 @@
+"""
+Signal Scheduler for the Quotex Signal Bot
+Candle-aligned periodic jobs on the bot's event loop
+Author: Ankit Singh
+
+The job runs once per candle close (plus a settle delay), as a coroutine on
+the running loop rather than a thread. Runs never overlap: when a run takes
+longer than a candle, the closes that passed meanwhile are skipped and the
+next run starts at the first close after it finished, so a slow scan or
+broadcast delays one round instead of piling up behind itself.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SignalScheduler:
+    """Runs an async job after every candle close while should_run() holds"""
+
+    def __init__(self, job: Callable[[], Awaitable], candle_seconds: float = 60.0, settle_delay: float = 2.0,
+                 should_run: Callable[[], bool] = lambda: True, clock: Callable[[], float] = time.time):
+        """
+        settle_delay: seconds after each close before the job runs
+        should_run: checked before every run; the scheduler stops once it
+        returns False (e.g. no active users left)
+        clock: epoch seconds, so ticks line up with candle closes
+        """
+        self.job = job
+        self.candle_seconds = candle_seconds
+        self.settle_delay = settle_delay
+        self.should_run = should_run
+        self.clock = clock
+        self.task = None
+        self.last_run_at = None
+        self.stats = Counter()
+
+    def seconds_until_tick(self) -> float:
+        """Time until the next candle close plus settle_delay"""
+        now = self.clock() - self.settle_delay
+        next_close = (now // self.candle_seconds + 1) * self.candle_seconds
+        return next_close - now
+
+    def _tick_index(self, at: float) -> int:
+        return int((at - self.settle_delay) // self.candle_seconds)
+
+    async def run(self):
+        """Run the job after every candle close until should_run() fails or cancelled"""
+        while True:
+            await asyncio.sleep(self.seconds_until_tick())
+            if not self.should_run():
+                break
+
+            started = self.clock()
+            self.last_run_at = started
+            try:
+                await self.job()
+            except Exception:
+                self.stats['errors'] += 1
+                logger.exception("Error in scheduled signal job")
+
+            finished = self.clock()
+            elapsed = finished - started
+            skipped = self._tick_index(finished) - self._tick_index(started)
+            self.stats['runs'] += 1
+            self.stats['last_run_seconds'] = elapsed
+            self.stats['max_run_seconds'] = max(self.stats['max_run_seconds'], elapsed)
+            if skipped > 0:
+                self.stats['overruns'] += 1
+                self.stats['skipped_ticks'] += skipped
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self) -> asyncio.Task:
+        """Start on the running event loop (no-op while already running)"""
+        if not self.running:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+            self.stats['starts'] += 1
+        return self.task
+
+    async def stop(self):
+        """Cancel the scheduler, including a job in progress"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'running': self.running, 'last_run_at': self.last_run_at}
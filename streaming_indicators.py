@@ -0,0 +1,265 @@
+"""
+Streaming Indicator State for the Technical Analysis Engine
+Constant-time per-candle updates of the 10s strategy indicators
+Author: Ankit Singh
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional
+
+
+class StreamingSMA:
+    """Simple Moving Average with a running window sum"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+        self.value = math.nan
+
+    def update(self, price: float) -> float:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(price)
+        self.total += price
+        self.updates += 1
+
+        # Re-sum once per full window so add/subtract rounding never accumulates
+        if self.updates % self.period == 0:
+            self.total = math.fsum(self.window)
+
+        self.value = self.total / self.period if len(self.window) == self.period else math.nan
+        return self.value
+
+
+class StreamingWMA:
+    """Linearly weighted moving average (newest bar heaviest)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.weighted_total = 0.0
+        self.weight_sum = period * (period + 1) / 2
+        self.updates = 0
+        self.value = math.nan
+
+    def update(self, price: float) -> float:
+        if len(self.window) == self.period:
+            # Sliding drops every weight by one and adds the new bar at full weight
+            self.weighted_total += self.period * price - self.total
+            self.total += price - self.window[0]
+            self.window.append(price)
+        else:
+            self.window.append(price)
+            self.total += price
+            self.weighted_total += len(self.window) * price
+
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self.total = math.fsum(self.window)
+            self.weighted_total = math.fsum(
+                weight * value for weight, value in enumerate(self.window, start=1)
+            )
+
+        self.value = self.weighted_total / self.weight_sum if len(self.window) == self.period else math.nan
+        return self.value
+
+
+class StreamingEMA:
+    """Exponential moving average matching pandas ewm(adjust=False)"""
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self.ema = math.nan
+        self.value = math.nan
+
+    @classmethod
+    def from_span(cls, span: int) -> 'StreamingEMA':
+        return cls(2 / (span + 1), span)
+
+    def update(self, value: float) -> float:
+        if self.count == 0:
+            self.ema = value
+        else:
+            self.ema = (1 - self.alpha) * self.ema + self.alpha * value
+        self.count += 1
+
+        self.value = self.ema if self.count >= self.min_periods else math.nan
+        return self.value
+
+
+class StreamingExtremum:
+    """Rolling max or min over the last `period` values (monotonic deque)"""
+
+    def __init__(self, period: int, mode: str = 'max'):
+        self.period = period
+        self.is_max = mode == 'max'
+        self.candidates = deque()  # (bar index, value), values monotonic
+        self.index = 0
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.index, value))
+
+        if self.candidates[0][0] <= self.index - self.period:
+            self.candidates.popleft()
+        self.index += 1
+
+        self.value = self.candidates[0][1]
+        return self.value
+
+
+class StreamingRSI:
+    """Wilder RSI matching ta.momentum.RSIIndicator"""
+
+    def __init__(self, period: int = 14):
+        self.up = StreamingEMA(1 / period, period)
+        self.down = StreamingEMA(1 / period, period)
+        self.prev_close: Optional[float] = None
+        self.value = math.nan
+
+    def update(self, close: float) -> float:
+        # ta treats the first bar (no previous close) as a zero move
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+
+        ema_up = self.up.update(diff if diff > 0 else 0.0)
+        ema_down = self.down.update(-diff if diff < 0 else 0.0)
+
+        if math.isnan(ema_down):
+            self.value = math.nan
+        elif ema_down == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + ema_up / ema_down))
+        return self.value
+
+
+class StreamingDeMarker:
+    """DeMarker indicator from running DeMax/DeMin averages"""
+
+    def __init__(self, period: int = 14):
+        self.de_max = StreamingSMA(period)
+        self.de_min = StreamingSMA(period)
+        self.prev_high: Optional[float] = None
+        self.prev_low: Optional[float] = None
+        self.value = math.nan
+
+    def update(self, high: float, low: float) -> float:
+        if self.prev_high is not None:
+            sma_de_max = self.de_max.update(max(0.0, high - self.prev_high))
+            sma_de_min = self.de_min.update(max(0.0, self.prev_low - low))
+            denominator = sma_de_max + sma_de_min
+            self.value = sma_de_max / denominator if denominator else math.nan
+        self.prev_high = high
+        self.prev_low = low
+        return self.value
+
+
+class StreamingVolumeOscillator:
+    """Volume Oscillator from short and long running averages"""
+
+    def __init__(self, short_period: int = 5, long_period: int = 10):
+        self.short_ma = StreamingSMA(short_period)
+        self.long_ma = StreamingSMA(long_period)
+        self.value = math.nan
+
+    def update(self, volume: float) -> float:
+        short_ma = self.short_ma.update(volume)
+        long_ma = self.long_ma.update(volume)
+        self.value = ((short_ma - long_ma) / long_ma) * 100 if long_ma else math.nan
+        return self.value
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram matching ta.trend.MACD"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA.from_span(fast)
+        self.slow = StreamingEMA.from_span(slow)
+        self.signal = StreamingEMA.from_span(signal)
+        self.value = {'macd': math.nan, 'signal': math.nan, 'histogram': math.nan}
+
+    def update(self, close: float) -> Dict:
+        macd = self.fast.update(close) - self.slow.update(close)
+        # The signal EMA starts at the first defined MACD value
+        signal = self.signal.update(macd) if not math.isnan(macd) else math.nan
+        self.value = {'macd': macd, 'signal': signal, 'histogram': macd - signal}
+        return self.value
+
+
+class StreamingIndicatorState:
+    """
+    Per-pair rolling state for every indicator the 10s strategy reads.
+    Each update() costs O(1) regardless of how much history has been seen.
+    """
+
+    def __init__(self):
+        self.sma_100 = StreamingSMA(100)
+        self.sma_50 = StreamingSMA(50)
+        self.sma_20 = StreamingSMA(20)
+        self.sma_10 = StreamingSMA(10)
+        self.wma_25 = StreamingWMA(25)
+        self.rsi = StreamingRSI(14)
+        self.demarker = StreamingDeMarker(14)
+        self.volume_osc = StreamingVolumeOscillator(5, 10)
+        self.macd = StreamingMACD()
+        self.recent_high = StreamingExtremum(20, 'max')
+        self.recent_low = StreamingExtremum(20, 'min')
+
+        self.bars = 0
+        self.last_timestamp = None
+        self.current_price = math.nan
+        self.prev_sma_10 = math.nan
+        self.prev_wma_25 = math.nan
+
+    def update(self, candle: Dict) -> Dict:
+        """Push one closed candle (open/high/low/close/volume[/timestamp])"""
+        close = float(candle['close'])
+        high = float(candle['high'])
+        low = float(candle['low'])
+
+        self.prev_sma_10 = self.sma_10.value
+        self.prev_wma_25 = self.wma_25.value
+
+        self.current_price = close
+        self.sma_100.update(close)
+        self.sma_50.update(close)
+        self.sma_20.update(close)
+        self.sma_10.update(close)
+        self.wma_25.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.demarker.update(high, low)
+        self.volume_osc.update(float(candle['volume']))
+        self.recent_high.update(high)
+        self.recent_low.update(low)
+
+        self.bars += 1
+        self.last_timestamp = candle.get('timestamp', self.last_timestamp)
+        return self.values()
+
+    def values(self) -> Dict:
+        """Current values in the layout of calculate_last_bar_trend + calculate_last_bar_confirmation"""
+        return {
+            'current_price': self.current_price,
+            'sma_100': self.sma_100.value,
+            'wma_25': self.wma_25.value,
+            'sma_10': self.sma_10.value,
+            'rsi': self.rsi.value,
+            'demarker': self.demarker.value,
+            'volume_osc': self.volume_osc.value,
+            'prev_wma_25': self.prev_wma_25,
+            'prev_sma_10': self.prev_sma_10
+        }
@@ -10,12 +10,26 @@ import requests
 import json
 import time
 from typing import Dict, List, Tuple, Optional
+from collections import Counter
 from datetime import datetime, timedelta
-import ta
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import warnings
+import numpy_indicators
+from candle_history import CandleHistory
+from candle_store import FIELDS, CandleStore
+from indicator_cache import IndicatorCache
+from indicator_graph import IndicatorGraph, CLOSE, HIGH, LOW
+from market_data_providers import CachingMarketDataProvider
+from market_simulator import SyntheticMarket
+from streaming_indicators import StreamingIndicatorState
+from timeframe_resampler import HIGHER_TIMEFRAMES, TimeframeResampler
 warnings.filterwarnings('ignore')
 
+try:
+    import ta
+except ImportError:  # Only the 'pandas' backend needs ta
+    ta = None
+
 @dataclass
 class Signal:
     """Signal data structure"""
@@ -26,13 +40,65 @@ class Signal:
     analysis: str
     entry_time: datetime
     author: str = "Ankit Singh"
+    score: float = 0.0  # Rule points plus volume strength, for ranking signals
 
 class TechnicalAnalysisEngine:
     """Advanced technical analysis engine for Quotex signals"""
     
-    def __init__(self):
-        self.indicators_cache = {}
-        self.pairs_data = {}
+    BACKENDS = ('pandas', 'numpy')
+    
+    CONFIDENCE_LEVELS = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
+    
+    # Bar size the 10s-expiry strategy runs on when candles come from ticks
+    SIGNAL_TIMEFRAME = '10s'
+    
+    # Latest stored candles each analysis reads (indicator warm-up included)
+    ANALYSIS_BARS = 500
+    
+    # Closed higher-timeframe bars whose mean close defines that timeframe's trend
+    HTF_TREND_PERIOD = 10
+    
+    # Indicator graph nodes the 10s strategy (and its market filter) reads
+    STRATEGY_10S_INDICATORS = {
+        'close': CLOSE,
+        'sma_100': ('sma', CLOSE, 100),
+        'wma_25': ('wma', CLOSE, 25),
+        'sma_10': ('sma', CLOSE, 10),
+        'rsi': ('rsi', 14),
+        'demarker': ('demarker', 14),
+        'volume_osc': ('volume_osc', 5, 10),
+        'sma_20': ('sma', CLOSE, 20),
+        'sma_50': ('sma', CLOSE, 50),
+        'recent_high': ('rolling_max', HIGH, 20),
+        'recent_low': ('rolling_min', LOW, 20)
+    }
+    
+    def __init__(self, backend: Optional[str] = None, dtype=np.float64):
+        """
+        backend: 'pandas' (pandas rolling + ta) or 'numpy' (numpy_indicators,
+        no ta import needed). Defaults to 'pandas' when ta is installed.
+        dtype: float dtype for the numpy backend (np.float64 or np.float32)
+        """
+        if backend is None:
+            backend = 'pandas' if ta is not None else 'numpy'
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown indicator backend: {backend}")
+        if backend == 'pandas' and ta is None:
+            raise ImportError("The 'pandas' backend requires the ta package")
+        
+        self.backend = backend
+        self.dtype = dtype
+        self.indicators_cache = IndicatorCache(max_entries=256, ttl=60)
+        self.pairs_data = CandleStore(capacity=2048)  # symbol -> OHLCV ring buffer
+        self.timeframe_data = {'1m': self.pairs_data}  # timeframe -> CandleStore
+        self.resampler = None  # 1m -> higher timeframes, see attach_resampler()
+        self.history = None  # On-disk CandleHistory, see attach_history()
+        self.market_simulator = SyntheticMarket()  # Demo feed behind get_market_data
+        self.demo_feed_synced = {}  # symbol -> minute the demo feed was last merged, see get_pair_data()
+        self.market_data_provider = None  # Live feed, see attach_provider()
+        self.streaming_states = {}  # pair -> StreamingIndicatorState
+        self.cascade_stats = Counter()  # evaluate_10s_cascade stage counters
+        self.scan_stats = Counter()  # scan_universe counters
         
         # Major trading pairs
         self.trading_pairs = {
@@ -57,52 +123,20 @@ class TechnicalAnalysisEngine:
             'S&P500': 'SPX500', 'NASDAQ': 'NAS100', 'DOW': 'DJ30',
             'FTSE': 'FTSE100', 'DAX': 'DAX30', 'CAC': 'CAC40'
         }
+        self.symbol_pairs = {symbol: pair for pair, symbol in self.trading_pairs.items()}
     
     def get_market_data(self, symbol: str, timeframe: str = '1m', limit: int = 500) -> pd.DataFrame:
         """
         Get market data for analysis
-        Using simulated data for demonstration - in production, connect to real API
+        Using simulated data for demonstration - for a live feed, load candles
+        through a market_data_providers provider (see refresh_from_provider)
         """
         try:
             # Simulated market data for demonstration
             # In production, replace with real API like Alpha Vantage, IEX, or broker API
-            
-            np.random.seed(hash(symbol) % 2**32)  # Consistent data for same symbol
-            
-            dates = pd.date_range(
-                start=datetime.now() - timedelta(hours=limit//60), 
-                periods=limit, 
-                freq='1min'
-            )
-            
-            # Generate realistic OHLCV data
-            base_price = np.random.uniform(1.0, 2000.0)  # Different base for different assets
-            
-            # Random walk with trend
-            trend = np.random.uniform(-0.001, 0.001)
-            volatility = base_price * 0.002
-            
-            returns = np.random.normal(trend, volatility, limit)
-            prices = base_price * np.exp(np.cumsum(returns))
-            
-            # Generate OHLC from prices
-            opens = prices
-            closes = prices * (1 + np.random.normal(0, 0.001, limit))
-            highs = np.maximum(opens, closes) * (1 + np.abs(np.random.normal(0, 0.001, limit)))
-            lows = np.minimum(opens, closes) * (1 - np.abs(np.random.normal(0, 0.001, limit)))
-            volumes = np.random.uniform(1000, 10000, limit)
-            
-            df = pd.DataFrame({
-                'timestamp': dates,
-                'open': opens,
-                'high': highs,
-                'low': lows,
-                'close': closes,
-                'volume': volumes
-            })
-            
-            df.set_index('timestamp', inplace=True)
-            return df
+            # Seeded per symbol (stable across processes), candles end at the
+            # current minute so repeated calls share a last-candle timestamp
+            return self.market_simulator.generate_frame(symbol, limit)
             
         except Exception as e:
             print(f"Error fetching data for {symbol}: {e}")
@@ -110,21 +144,40 @@ class TechnicalAnalysisEngine:
     
     def calculate_sma(self, data: pd.Series, period: int) -> pd.Series:
         """Calculate Simple Moving Average"""
+        if self.backend == 'numpy':
+            return pd.Series(numpy_indicators.sma(data.to_numpy(), period, self.dtype), index=data.index)
         return data.rolling(window=period).mean()
     
     def calculate_wma(self, data: pd.Series, period: int) -> pd.Series:
-        """Calculate Weighted Moving Average"""
-        weights = np.arange(1, period + 1)
-        return data.rolling(window=period).apply(
-            lambda x: np.dot(x, weights) / weights.sum() if len(x) == period else np.nan
-        )
+        """Calculate Weighted Moving Average (linear weights, newest bar heaviest)"""
+        if self.backend == 'numpy':
+            return pd.Series(numpy_indicators.wma(data.to_numpy(), period, self.dtype), index=data.index, name=data.name)
+        
+        values = data.to_numpy(dtype=float)
+        wma = np.full(len(values), np.nan)
+        
+        if period > 0 and len(values) >= period:
+            weights = np.arange(1, period + 1, dtype=float)
+            # np.convolve flips the kernel, so pass the weights reversed to get
+            # dot(window, weights); a NaN anywhere in a window propagates to it
+            wma[period - 1:] = np.convolve(values, weights[::-1], mode='valid') / weights.sum()
+        
+        return pd.Series(wma, index=data.index, name=data.name)
     
     def calculate_rsi(self, data: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI"""
+        if self.backend == 'numpy':
+            return pd.Series(numpy_indicators.rsi(data.to_numpy(), period, self.dtype), index=data.index)
         return ta.momentum.RSIIndicator(data, window=period).rsi()
     
     def calculate_macd(self, data: pd.Series) -> Dict:
         """Calculate MACD"""
+        if self.backend == 'numpy':
+            return {
+                key: pd.Series(values, index=data.index)
+                for key, values in numpy_indicators.macd(data.to_numpy(), dtype=self.dtype).items()
+            }
+        
         macd_indicator = ta.trend.MACD(data)
         return {
             'macd': macd_indicator.macd(),
@@ -134,12 +187,20 @@ class TechnicalAnalysisEngine:
     
     def calculate_demarker(self, high: pd.Series, low: pd.Series, period: int = 14) -> pd.Series:
         """Calculate DeMarker indicator"""
-        de_max = pd.Series(index=high.index, dtype=float)
-        de_min = pd.Series(index=low.index, dtype=float)
+        if self.backend == 'numpy':
+            return pd.Series(numpy_indicators.demarker(high.to_numpy(), low.to_numpy(), period, self.dtype), index=high.index)
+        
+        high_values = high.to_numpy(dtype=float)
+        low_values = low.to_numpy(dtype=float)
+        
+        # DeMax/DeMin: positive part of the bar-to-bar change (first bar has no prior)
+        de_max = np.full(len(high_values), np.nan)
+        de_min = np.full(len(low_values), np.nan)
+        de_max[1:] = np.fmax(np.diff(high_values), 0.0)
+        de_min[1:] = np.fmax(-np.diff(low_values), 0.0)
         
-        for i in range(1, len(high)):
-            de_max.iloc[i] = max(0, high.iloc[i] - high.iloc[i-1])
-            de_min.iloc[i] = max(0, low.iloc[i-1] - low.iloc[i])
+        de_max = pd.Series(de_max, index=high.index)
+        de_min = pd.Series(de_min, index=low.index)
         
         sma_de_max = de_max.rolling(window=period).mean()
         sma_de_min = de_min.rolling(window=period).mean()
@@ -149,6 +210,12 @@ class TechnicalAnalysisEngine:
     
     def calculate_volume_oscillator(self, volume: pd.Series, short_period: int = 5, long_period: int = 10) -> pd.Series:
         """Calculate Volume Oscillator (Weis Waves style)"""
+        if self.backend == 'numpy':
+            return pd.Series(
+                numpy_indicators.volume_oscillator(volume.to_numpy(), short_period, long_period, self.dtype),
+                index=volume.index
+            )
+        
         short_ma = volume.rolling(window=short_period).mean()
         long_ma = volume.rolling(window=long_period).mean()
         return ((short_ma - long_ma) / long_ma) * 100
@@ -158,18 +225,21 @@ class TechnicalAnalysisEngine:
         high_prices = data['high']
         low_prices = data['low']
         
-        # Find local maxima and minima
-        resistance_levels = []
-        support_levels = []
+        # Centered sliding extrema over [i-window, i+window]; pandas keeps a
+        # monotonic deque internally so this is linear in len(data)
+        span = 2 * window + 1
+        window_max = high_prices.rolling(span, center=True, min_periods=1).max().to_numpy()
+        window_min = low_prices.rolling(span, center=True, min_periods=1).min().to_numpy()
         
-        for i in range(window, len(data) - window):
-            # Resistance (local maxima)
-            if high_prices.iloc[i] == high_prices.iloc[i-window:i+window+1].max():
-                resistance_levels.append(high_prices.iloc[i])
-            
-            # Support (local minima)
-            if low_prices.iloc[i] == low_prices.iloc[i-window:i+window+1].min():
-                support_levels.append(low_prices.iloc[i])
+        highs = high_prices.to_numpy()
+        lows = low_prices.to_numpy()
+        
+        # Only bars with a full window on both sides qualify
+        inner = slice(window, max(window, len(data) - window))
+        
+        # Resistance (local maxima) and support (local minima)
+        resistance_levels = highs[inner][highs[inner] == window_max[inner]].tolist()
+        support_levels = lows[inner][lows[inner] == window_min[inner]].tolist()
         
         return {
             'resistance': resistance_levels[-3:] if resistance_levels else [],
@@ -182,13 +252,18 @@ class TechnicalAnalysisEngine:
             return {'condition': 'insufficient_data', 'trend': 'unknown'}
         
         close_prices = data['close']
-        sma_20 = self.calculate_sma(close_prices, 20)
-        sma_50 = self.calculate_sma(close_prices, 50)
-        
         current_price = close_prices.iloc[-1]
-        sma_20_current = sma_20.iloc[-1]
-        sma_50_current = sma_50.iloc[-1]
+        sma_20_current = self.calculate_sma(close_prices, 20).iloc[-1]
+        sma_50_current = self.calculate_sma(close_prices, 50).iloc[-1]
         
+        return self.classify_market_conditions(
+            current_price, sma_20_current, sma_50_current,
+            data['high'].tail(20).max(), data['low'].tail(20).min()
+        )
+    
+    def classify_market_conditions(self, current_price: float, sma_20_current: float, sma_50_current: float,
+                                   recent_high: float, recent_low: float) -> Dict:
+        """Classify trend and volatility from the latest price, SMA 20/50 and 20-bar range"""
         # Trend determination
         if current_price > sma_20_current > sma_50_current:
             trend = 'uptrend'
@@ -198,9 +273,7 @@ class TechnicalAnalysisEngine:
             trend = 'sideways'
         
         # Volatility check
-        recent_highs = data['high'].tail(20)
-        recent_lows = data['low'].tail(20)
-        volatility = (recent_highs.max() - recent_lows.min()) / current_price
+        volatility = (recent_high - recent_low) / current_price
         
         # Market condition
         if volatility < 0.01:
@@ -217,171 +290,714 @@ class TechnicalAnalysisEngine:
             'current_price': current_price
         }
     
-    def generate_signal_10s_strategy(self, data: pd.DataFrame) -> Optional[Signal]:
+    def calculate_indicator_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Calculate the full-length 10s strategy indicator series"""
+        close_prices = data['close']
+        
+        return pd.DataFrame({
+            'sma_100': self.calculate_sma(close_prices, 100),
+            'wma_25': self.calculate_wma(close_prices, 25),
+            'sma_10': self.calculate_sma(close_prices, 10),
+            'rsi': self.calculate_rsi(close_prices, 14),
+            'demarker': self.calculate_demarker(data['high'], data['low'], 14),
+            'volume_osc': self.calculate_volume_oscillator(data['volume'])
+        }, index=data.index)
+    
+    def calculate_last_bar_trend(self, close: np.ndarray) -> Dict:
+        """Price, SMA 100 and the SMA 10 / WMA 25 pair for the last two bars"""
+        wma_weights = np.arange(1, 26, dtype=float)
+        
+        return {
+            'current_price': close[-1],
+            'sma_100': close[-100:].mean(),
+            'wma_25': np.dot(close[-25:], wma_weights) / wma_weights.sum(),
+            'sma_10': close[-10:].mean(),
+            'prev_wma_25': np.dot(close[-26:-1], wma_weights) / wma_weights.sum(),
+            'prev_sma_10': close[-11:-1].mean()
+        }
+    
+    def calculate_last_bar_confirmation(self, close: np.ndarray, high: np.ndarray,
+                                        low: np.ndarray, volume: np.ndarray) -> Dict:
+        """Last-bar RSI, DeMarker and volume oscillator"""
+        # Wilder RSI has unbounded memory, so fold the whole gain/loss history
+        # into its final EMA value with one dot product (ta's ewm, adjust=False)
+        alpha = 1 / 14
+        diff = np.diff(close)
+        decay = (1 - alpha) ** np.arange(len(diff) - 1, -1, -1)
+        ema_up = alpha * np.dot(decay, np.where(diff > 0, diff, 0.0))
+        ema_down = alpha * np.dot(decay, np.where(diff < 0, -diff, 0.0))
+        rsi = 100.0 if ema_down == 0 else 100 - (100 / (1 + ema_up / ema_down))
+        
+        # DeMarker needs the last 14 bar-to-bar changes
+        de_max = np.fmax(np.diff(high[-15:]), 0.0).mean()
+        de_min = np.fmax(-np.diff(low[-15:]), 0.0).mean()
+        
+        short_volume = volume[-5:].mean()
+        long_volume = volume[-10:].mean()
+        
+        return {
+            'rsi': rsi,
+            'demarker': de_max / (de_max + de_min),
+            'volume_osc': ((short_volume - long_volume) / long_volume) * 100
+        }
+    
+    def evaluate_10s_cascade(self, data: pd.DataFrame) -> Optional[Signal]:
+        """
+        Last-bar 10s strategy evaluated cheapest rule first, stopping at the
+        first failed stage: volatility gate -> SMA 10 / WMA 25 crossover ->
+        SMA 100 trend side -> RSI / DeMarker / volume confirmation.
+        Rejections per stage are counted in self.cascade_stats.
+        """
+        # Works on DataFrames and on mappings of arrays (candle store views)
+        close = np.asarray(data['close'], dtype=float)
+        high = np.asarray(data['high'], dtype=float)
+        low = np.asarray(data['low'], dtype=float)
+        
+        self.cascade_stats['evaluated'] += 1
+        if len(close) < 100:
+            self.cascade_stats['insufficient_data'] += 1
+            return None
+        
+        market_conditions = self.classify_market_conditions(
+            close[-1], close[-20:].mean(), close[-50:].mean(), high[-20:].max(), low[-20:].min()
+        )
+        if market_conditions['condition'] == 'low_volatility':
+            self.cascade_stats['low_volatility'] += 1
+            return None
+        
+        trend = self.calculate_last_bar_trend(close)
+        cross_up = trend['sma_10'] > trend['wma_25'] and trend['prev_sma_10'] <= trend['prev_wma_25']
+        cross_down = trend['sma_10'] < trend['wma_25'] and trend['prev_sma_10'] >= trend['prev_wma_25']
+        if not (cross_up or cross_down):
+            self.cascade_stats['no_crossover'] += 1
+            return None
+        
+        if (cross_up and not trend['current_price'] > trend['sma_100']) or \
+           (cross_down and not trend['current_price'] < trend['sma_100']):
+            self.cascade_stats['against_trend'] += 1
+            return None
+        
+        values = {**trend, **self.calculate_last_bar_confirmation(close, high, low, np.asarray(data['volume'], dtype=float))}
+        signal = self.evaluate_10s_rules(values, market_conditions)
+        self.cascade_stats['signals' if signal else 'not_confirmed'] += 1
+        return signal
+    
+    def get_cascade_stats(self) -> Dict:
+        """Cascade counters plus the share of evaluations each stage rejected"""
+        evaluated = self.cascade_stats['evaluated']
+        stages = ['insufficient_data', 'low_volatility', 'no_crossover', 'against_trend', 'not_confirmed']
+        return {
+            **self.cascade_stats,
+            'reject_rates': {stage: self.cascade_stats[stage] / evaluated if evaluated else 0.0 for stage in stages}
+        }
+    
+    def generate_signal_10s_strategy(self, data: pd.DataFrame, last_bar_only: bool = False) -> Optional[Signal]:
         """
         Generate signal using 10-second strategy
         Indicators: SMA 100, WMA 25, SMA 10, RSI 14, Demarker 14, Volume Oscillator
+        
+        With last_bar_only=True only the trailing values the rules read are
+        computed instead of full-length indicator series (same decisions),
+        cheapest rules first (see evaluate_10s_cascade).
         """
         try:
+            if last_bar_only:
+                return self.evaluate_10s_cascade(data)
+            
             if len(data) < 100:
                 return None
             
-            close_prices = data['close']
-            high_prices = data['high']
-            low_prices = data['low']
-            volume = data['volume']
-            
-            # Calculate indicators
-            sma_100 = self.calculate_sma(close_prices, 100)
-            wma_25 = self.calculate_wma(close_prices, 25)
-            sma_10 = self.calculate_sma(close_prices, 10)
-            rsi = self.calculate_rsi(close_prices, 14)
-            demarker = self.calculate_demarker(high_prices, low_prices, 14)
-            volume_osc = self.calculate_volume_oscillator(volume)
-            
-            # Current values
-            current_price = close_prices.iloc[-1]
-            current_sma_100 = sma_100.iloc[-1]
-            current_wma_25 = wma_25.iloc[-1]
-            current_sma_10 = sma_10.iloc[-1]
-            current_rsi = rsi.iloc[-1]
-            current_demarker = demarker.iloc[-1]
-            current_volume_osc = volume_osc.iloc[-1]
-            
-            # Previous values for crossover detection
-            prev_wma_25 = wma_25.iloc[-2]
-            prev_sma_10 = sma_10.iloc[-2]
-            
-            # Signal conditions
-            signal_direction = None
-            confidence = 'LOW'
-            analysis_points = []
+            indicators = self.calculate_indicator_frame(data)
+            
+            values = {
+                'current_price': data['close'].iloc[-1],
+                'sma_100': indicators['sma_100'].iloc[-1],
+                'wma_25': indicators['wma_25'].iloc[-1],
+                'sma_10': indicators['sma_10'].iloc[-1],
+                'rsi': indicators['rsi'].iloc[-1],
+                'demarker': indicators['demarker'].iloc[-1],
+                'volume_osc': indicators['volume_osc'].iloc[-1],
+                'prev_wma_25': indicators['wma_25'].iloc[-2],
+                'prev_sma_10': indicators['sma_10'].iloc[-2]
+            }
             
             # Check market condition (avoid sideways)
             market_conditions = self.analyze_market_conditions(data)
-            if market_conditions['condition'] == 'low_volatility':
-                return None  # Avoid sideways market
-            
-            # BUY Signal Conditions
-            if (current_price > current_sma_100 and  # Price above SMA 100
-                current_sma_10 > current_wma_25 and prev_sma_10 <= prev_wma_25 and  # SMA 10 crosses above WMA 25
-                current_rsi < 70 and current_rsi > 30 and  # RSI in reasonable range
-                current_demarker > 0.3 and  # Demarker bullish
-                current_volume_osc > 0):  # Volume confirmation
-                
-                signal_direction = 'UP'
-                analysis_points.extend([
-                    "Price above SMA 100 (Bullish trend)",
-                    "SMA 10 crossed above WMA 25",
-                    f"RSI at {current_rsi:.1f} (Momentum)",
-                    f"DeMarker at {current_demarker:.2f} (Bullish)",
-                    "High volume confirmation"
-                ])
-                
-                # Confidence calculation
-                confidence_score = 0
-                if current_rsi > 40 and current_rsi < 60:
-                    confidence_score += 1
-                if current_demarker > 0.5:
-                    confidence_score += 1
-                if current_volume_osc > 5:
-                    confidence_score += 1
-                if current_price > current_sma_100 * 1.005:  # Strong above SMA 100
-                    confidence_score += 1
-                
-                confidence = 'HIGH' if confidence_score >= 3 else 'MEDIUM' if confidence_score >= 2 else 'LOW'
-            
-            # SELL Signal Conditions  
-            elif (current_price < current_sma_100 and  # Price below SMA 100
-                  current_sma_10 < current_wma_25 and prev_sma_10 >= prev_wma_25 and  # SMA 10 crosses below WMA 25
-                  current_rsi < 70 and current_rsi > 30 and  # RSI in reasonable range
-                  current_demarker < 0.7 and  # Demarker bearish
-                  current_volume_osc > 0):  # Volume confirmation
-                
-                signal_direction = 'DOWN'
-                analysis_points.extend([
-                    "Price below SMA 100 (Bearish trend)",
-                    "SMA 10 crossed below WMA 25",
-                    f"RSI at {current_rsi:.1f} (Momentum)",
-                    f"DeMarker at {current_demarker:.2f} (Bearish)",
-                    "High volume confirmation"
-                ])
-                
-                # Confidence calculation
-                confidence_score = 0
-                if current_rsi > 40 and current_rsi < 60:
-                    confidence_score += 1
-                if current_demarker < 0.5:
-                    confidence_score += 1
-                if current_volume_osc > 5:
-                    confidence_score += 1
-                if current_price < current_sma_100 * 0.995:  # Strong below SMA 100
-                    confidence_score += 1
-                
-                confidence = 'HIGH' if confidence_score >= 3 else 'MEDIUM' if confidence_score >= 2 else 'LOW'
-            
-            if signal_direction:
-                # Generate signal
-                current_time = datetime.now()
-                valid_until = current_time + timedelta(minutes=1)  # 1 minute validity
-                
-                analysis_text = " + ".join(analysis_points)
-                
-                return Signal(
-                    pair="",  # Will be set by caller
-                    direction=signal_direction,
-                    confidence=confidence,
-                    valid_until=valid_until.strftime("%H:%M:%S UTC"),
-                    analysis=analysis_text,
-                    entry_time=current_time
-                )
             
+            return self.evaluate_10s_rules(values, market_conditions)
+            
+        except Exception as e:
+            print(f"Error in 10s strategy: {e}")
             return None
+    
+    def generate_signal_from_graph(self, graph: IndicatorGraph) -> Optional[Signal]:
+        """Generate the 10s strategy signal from an indicator graph's shared nodes"""
+        try:
+            series = graph.evaluate(self.STRATEGY_10S_INDICATORS)
+            if len(series['close']) < 100:
+                return None
+            
+            values = {
+                'current_price': series['close'][-1],
+                'sma_100': series['sma_100'][-1],
+                'wma_25': series['wma_25'][-1],
+                'sma_10': series['sma_10'][-1],
+                'rsi': series['rsi'][-1],
+                'demarker': series['demarker'][-1],
+                'volume_osc': series['volume_osc'][-1],
+                'prev_wma_25': series['wma_25'][-2],
+                'prev_sma_10': series['sma_10'][-2]
+            }
+            market_conditions = self.classify_market_conditions(
+                values['current_price'], series['sma_20'][-1], series['sma_50'][-1],
+                series['recent_high'][-1], series['recent_low'][-1]
+            )
+            
+            return self.evaluate_10s_rules(values, market_conditions)
             
         except Exception as e:
             print(f"Error in 10s strategy: {e}")
             return None
     
-    def generate_comprehensive_signal(self, pair: str) -> Optional[Signal]:
+    def evaluate_10s_rules(self, values: Dict, market_conditions: Dict) -> Optional[Signal]:
+        """Apply the 10s strategy rules to precomputed indicator values"""
+        if market_conditions['condition'] == 'low_volatility':
+            return None  # Avoid sideways market
+        
+        # Current values
+        current_price = values['current_price']
+        current_sma_100 = values['sma_100']
+        current_wma_25 = values['wma_25']
+        current_sma_10 = values['sma_10']
+        current_rsi = values['rsi']
+        current_demarker = values['demarker']
+        current_volume_osc = values['volume_osc']
+        
+        # Previous values for crossover detection
+        prev_wma_25 = values['prev_wma_25']
+        prev_sma_10 = values['prev_sma_10']
+        
+        # Signal conditions
+        signal_direction = None
+        confidence = 'LOW'
+        analysis_points = []
+        
+        # BUY Signal Conditions
+        if (current_price > current_sma_100 and  # Price above SMA 100
+            current_sma_10 > current_wma_25 and prev_sma_10 <= prev_wma_25 and  # SMA 10 crosses above WMA 25
+            current_rsi < 70 and current_rsi > 30 and  # RSI in reasonable range
+            current_demarker > 0.3 and  # Demarker bullish
+            current_volume_osc > 0):  # Volume confirmation
+            
+            signal_direction = 'UP'
+            analysis_points.extend([
+                "Price above SMA 100 (Bullish trend)",
+                "SMA 10 crossed above WMA 25",
+                f"RSI at {current_rsi:.1f} (Momentum)",
+                f"DeMarker at {current_demarker:.2f} (Bullish)",
+                "High volume confirmation"
+            ])
+            
+            # Confidence calculation
+            confidence_score = 0
+            if current_rsi > 40 and current_rsi < 60:
+                confidence_score += 1
+            if current_demarker > 0.5:
+                confidence_score += 1
+            if current_volume_osc > 5:
+                confidence_score += 1
+            if current_price > current_sma_100 * 1.005:  # Strong above SMA 100
+                confidence_score += 1
+            
+            confidence = 'HIGH' if confidence_score >= 3 else 'MEDIUM' if confidence_score >= 2 else 'LOW'
+        
+        # SELL Signal Conditions  
+        elif (current_price < current_sma_100 and  # Price below SMA 100
+              current_sma_10 < current_wma_25 and prev_sma_10 >= prev_wma_25 and  # SMA 10 crosses below WMA 25
+              current_rsi < 70 and current_rsi > 30 and  # RSI in reasonable range
+              current_demarker < 0.7 and  # Demarker bearish
+              current_volume_osc > 0):  # Volume confirmation
+            
+            signal_direction = 'DOWN'
+            analysis_points.extend([
+                "Price below SMA 100 (Bearish trend)",
+                "SMA 10 crossed below WMA 25",
+                f"RSI at {current_rsi:.1f} (Momentum)",
+                f"DeMarker at {current_demarker:.2f} (Bearish)",
+                "High volume confirmation"
+            ])
+            
+            # Confidence calculation
+            confidence_score = 0
+            if current_rsi > 40 and current_rsi < 60:
+                confidence_score += 1
+            if current_demarker < 0.5:
+                confidence_score += 1
+            if current_volume_osc > 5:
+                confidence_score += 1
+            if current_price < current_sma_100 * 0.995:  # Strong below SMA 100
+                confidence_score += 1
+            
+            confidence = 'HIGH' if confidence_score >= 3 else 'MEDIUM' if confidence_score >= 2 else 'LOW'
+        
+        if signal_direction:
+            # Generate signal
+            current_time = datetime.now()
+            valid_until = current_time + timedelta(minutes=1)  # 1 minute validity
+            
+            analysis_text = " + ".join(analysis_points)
+            
+            return Signal(
+                pair="",  # Will be set by caller
+                direction=signal_direction,
+                confidence=confidence,
+                valid_until=valid_until.strftime("%H:%M:%S UTC"),
+                analysis=analysis_text,
+                entry_time=current_time,
+                # Confidence points first; stronger volume breaks ties
+                score=float(confidence_score + min(current_volume_osc, 100) / 100)
+            )
+        
+        return None
+    
+    def stack_market_data(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+        """Stack per-symbol candle frames into (symbols x bars) arrays, aligned on the latest bars"""
+        bars = min(len(frame) for frame in frames.values())
+        return {
+            field: np.stack([frame[field].to_numpy(dtype=float)[len(frame) - bars:] for frame in frames.values()])
+            for field in ('open', 'high', 'low', 'close', 'volume')
+        }
+    
+    def calculate_batch_values(self, ohlcv: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Calculate the 10s strategy inputs for a whole universe in one pass.
+        ohlcv maps 'high'/'low'/'close'/'volume' to (symbols x bars) arrays;
+        every returned array has one entry per symbol.
+        """
+        close = numpy_indicators.as_array(ohlcv['close'], self.dtype)
+        high = numpy_indicators.as_array(ohlcv['high'], self.dtype)
+        low = numpy_indicators.as_array(ohlcv['low'], self.dtype)
+        volume = numpy_indicators.as_array(ohlcv['volume'], self.dtype)
+        
+        wma_25 = numpy_indicators.wma(close[:, -26:], 25, self.dtype)
+        sma_10 = numpy_indicators.sma(close[:, -11:], 10, self.dtype)
+        
+        return {
+            'current_price': close[:, -1],
+            'sma_100': numpy_indicators.sma(close[:, -100:], 100, self.dtype)[:, -1],
+            'wma_25': wma_25[:, -1],
+            'sma_10': sma_10[:, -1],
+            # RSI carries state over the whole history
+            'rsi': numpy_indicators.rsi(close, 14, self.dtype)[:, -1],
+            'demarker': numpy_indicators.demarker(high[:, -15:], low[:, -15:], 14, self.dtype)[:, -1],
+            'volume_osc': numpy_indicators.volume_oscillator(volume[:, -10:], 5, 10, self.dtype)[:, -1],
+            'prev_wma_25': wma_25[:, -2],
+            'prev_sma_10': sma_10[:, -2],
+            'sma_20': close[:, -20:].mean(axis=1),
+            'sma_50': close[:, -50:].mean(axis=1),
+            'recent_high': high[:, -20:].max(axis=1),
+            'recent_low': low[:, -20:].min(axis=1)
+        }
+    
+    def screen_batch(self, batch: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Symbols that can still produce a 10s signal: an SMA 10 / WMA 25
+        crossover on the last bar outside a low-volatility (< 1%) market
+        """
+        volatility = (batch['recent_high'] - batch['recent_low']) / batch['current_price']
+        cross_up = (batch['sma_10'] > batch['wma_25']) & (batch['prev_sma_10'] <= batch['prev_wma_25'])
+        cross_down = (batch['sma_10'] < batch['wma_25']) & (batch['prev_sma_10'] >= batch['prev_wma_25'])
+        return ~(volatility < 0.01) & (cross_up | cross_down)
+    
+    def calculate_screen_values(self, ohlcv: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """The few per-symbol values screen_batch reads, from the last 26 bars only"""
+        close = numpy_indicators.as_array(ohlcv['close'], self.dtype)[:, -26:]
+        wma_25 = numpy_indicators.wma(close, 25, self.dtype)
+        sma_10 = numpy_indicators.sma(close[:, -11:], 10, self.dtype)
+        return {
+            'current_price': close[:, -1],
+            'sma_10': sma_10[:, -1],
+            'wma_25': wma_25[:, -1],
+            'prev_sma_10': sma_10[:, -2],
+            'prev_wma_25': wma_25[:, -2],
+            'recent_high': numpy_indicators.as_array(ohlcv['high'], self.dtype)[:, -20:].max(axis=1),
+            'recent_low': numpy_indicators.as_array(ohlcv['low'], self.dtype)[:, -20:].min(axis=1)
+        }
+    
+    def evaluate_universe(self, pairs: Optional[List[str]] = None,
+                          last_bar_only: bool = False) -> Dict[str, Tuple[Optional[Signal], object]]:
+        """
+        Evaluate every trading pair: pair -> (signal or None, last candle
+        time). The crossover/volatility screen runs vectorized across the
+        universe; only pairs that pass it get the full comprehensive
+        analysis. Pairs without enough candles are left out.
+        """
+        pairs = list(pairs or self.trading_pairs)
+        loaded = {}
+        for pair in pairs:
+            data, last_candle = self.get_pair_data(pair)
+            if data is not None:
+                loaded[pair] = (data, last_candle)
+        return self.evaluate_loaded(loaded, last_bar_only)
+    
+    def evaluate_loaded(self, loaded: Dict[str, Tuple[object, object]],
+                        last_bar_only: bool = False) -> Dict[str, Tuple[Optional[Signal], object]]:
+        """evaluate_universe on already loaded candles: pair -> (candles, last candle time)"""
+        if not loaded:
+            return {}
+        
+        ohlcv = {
+            field: np.stack([np.asarray(data[field], dtype=float)[-26:] for data, _ in loaded.values()])
+            for field in ('high', 'low', 'close')
+        }
+        passed = self.screen_batch(self.calculate_screen_values(ohlcv))
+        self.scan_stats['scans'] += 1
+        self.scan_stats['pairs_scanned'] += len(loaded)
+        self.scan_stats['pairs_analyzed'] += int(passed.sum())
+        
+        return {
+            pair: (self.signal_from_data(pair, data, last_candle, last_bar_only) if candidate else None, last_candle)
+            for (pair, (data, last_candle)), candidate in zip(loaded.items(), passed)
+        }
+    
+    def scan_universe(self, pairs: Optional[List[str]] = None, min_confidence: str = 'MEDIUM',
+                      last_bar_only: bool = False) -> List[Signal]:
+        """Every pair's signal of at least min_confidence, ranked best first (by Signal.score)"""
+        threshold = self.CONFIDENCE_LEVELS[min_confidence]
+        signals = [
+            signal for signal, _ in self.evaluate_universe(pairs, last_bar_only).values()
+            if signal and self.CONFIDENCE_LEVELS[signal.confidence] >= threshold
+        ]
+        signals.sort(key=lambda signal: signal.score, reverse=True)
+        self.scan_stats['signals'] += len(signals)
+        return signals
+    
+    def generate_signals_batch(self, symbols: List[str], ohlcv: Dict[str, np.ndarray]) -> Dict[str, Optional[Signal]]:
+        """
+        Evaluate the 10s strategy for every symbol of a (symbols x bars) OHLCV
+        matrix. Indicators are computed vectorized across the universe and
+        only symbols with an SMA 10 / WMA 25 crossover outside a
+        low-volatility market reach the per-symbol rule evaluation.
+        """
+        results = {symbol: None for symbol in symbols}
+        try:
+            if np.shape(ohlcv['close'])[1] < 100:
+                return results
+            
+            batch = self.calculate_batch_values(ohlcv)
+            
+            # Vectorized pre-filter: every signal needs a crossover and a
+            # volatility of at least 1%, so skip the rest without Python work
+            candidates = np.flatnonzero(self.screen_batch(batch))
+            
+            for index in candidates:
+                values = {key: array[index] for key, array in batch.items()}
+                market_conditions = self.classify_market_conditions(
+                    values['current_price'], values['sma_20'], values['sma_50'],
+                    values['recent_high'], values['recent_low']
+                )
+                signal = self.evaluate_10s_rules(values, market_conditions)
+                if signal:
+                    signal.pair = symbols[index]
+                    results[symbols[index]] = signal
+            
+            return results
+            
+        except Exception as e:
+            print(f"Error in batch signal generation: {e}")
+            return results
+    
+    def generate_comprehensive_signal(self, pair: str, last_bar_only: bool = False) -> Optional[Signal]:
         """Generate comprehensive signal with all analysis"""
         try:
-            # Get market data
-            data = self.get_market_data(self.trading_pairs.get(pair, pair))
+            data, last_candle = self.get_pair_data(pair)
+            if data is None:
+                return None
+            return self.signal_from_data(pair, data, last_candle, last_bar_only)
+            
+        except Exception as e:
+            print(f"Error generating signal for {pair}: {e}")
+            return None
+    
+    def get_pair_data(self, pair: str):
+        """
+        (candles, last candle time) for a pair as zero-copy candle store
+        views; (None, None) with fewer than 100 candles. Without a live
+        provider, a pair with no stored history is seeded from the demo feed
+        (get_market_data) once, and afterwards only its newer candles are
+        appended, at most once per minute.
+        """
+        symbol = self.trading_pairs.get(pair, pair)
+        if self.market_data_provider is None and (
+                symbol in self.demo_feed_synced or not self.pairs_data.bar_count(symbol)):
+            self.sync_demo_feed(symbol)
+        if self.pairs_data.bar_count(symbol) < 100:
+            return None, None
+        data = self.get_candles(symbol)
+        return data, data['timestamp'][-1]
+    
+    def sync_demo_feed(self, symbol: str) -> int:
+        """Merge the demo feed's candles into the store unless already done this minute; returns new bars"""
+        minute = pd.Timestamp.now().floor(self.market_simulator.freq)
+        if self.demo_feed_synced.get(symbol) == minute:
+            return 0
+        self.demo_feed_synced[symbol] = minute
+        data = self.get_market_data(symbol)
+        return self.load_history(symbol, data) if not data.empty else 0
+    
+    def signal_from_data(self, pair: str, data, last_candle, last_bar_only: bool = False) -> Optional[Signal]:
+        """analyze_pair_data behind the per-candle signal cache"""
+        # Same pair and candle -> same decision, so serve repeats from cache
+        signal = self.indicators_cache.get_or_compute(
+            self.signal_cache_key(pair, data, last_candle, last_bar_only),
+            lambda: self.analyze_pair_data(pair, data, last_bar_only)
+        )
+        
+        # Callers mutate signals, so never hand out the cached instance
+        return replace(signal) if signal else None
+    
+    def signal_cache_key(self, pair: str, data, last_candle, last_bar_only: bool = False) -> Tuple:
+        symbol = self.trading_pairs.get(pair, pair)
+        kind = 'signal_last_bar' if last_bar_only else 'signal'
+        return (symbol, '1m', last_candle, kind, self.last_bar_version(data))
+    
+    @staticmethod
+    def last_bar_version(data) -> Tuple:
+        """
+        The last bar's OHLCV. A forming bar is rewritten under the same
+        timestamp, so cache keys carry this to tell its versions apart.
+        """
+        return tuple(float(np.asarray(data[field])[-1]) for field in FIELDS)
+    
+    def analyze_pair_data(self, pair: str, data, last_bar_only: bool = False) -> Optional[Signal]:
+        """
+        Run the 10s strategy plus support/resistance notes on a candle history
+        (DataFrame or mapping of OHLCV arrays). The full evaluation shares one
+        IndicatorGraph between the strategy, the market filter and the
+        support/resistance scan, computed with the engine's backend.
+        """
+        graph = IndicatorGraph(data, self.dtype, self.backend)
+        if last_bar_only:
+            signal = self.generate_signal_10s_strategy(data, last_bar_only)
+        else:
+            signal = self.generate_signal_from_graph(graph)
+        
+        if signal:
+            signal.pair = pair
+            
+            # Add support/resistance analysis
+            sr_levels = graph.get(('support_resistance', 20))
+            current_price = graph.get(CLOSE)[-1]
+            
+            # Check if price is near support/resistance
+            sr_analysis = ""
+            if sr_levels['resistance']:
+                nearest_resistance = min(sr_levels['resistance'], key=lambda x: abs(x - current_price))
+                if abs(nearest_resistance - current_price) / current_price < 0.01:  # Within 1%
+                    sr_analysis = f" | Near Resistance at {nearest_resistance:.4f}"
+            
+            if sr_levels['support']:
+                nearest_support = min(sr_levels['support'], key=lambda x: abs(x - current_price))
+                if abs(nearest_support - current_price) / current_price < 0.01:  # Within 1%
+                    sr_analysis = f" | Near Support at {nearest_support:.4f}"
+            
+            signal.analysis += sr_analysis
+            
+            self.add_timeframe_note(signal)
+            return signal
+        
+        return None
+    
+    def warm_up_stream(self, pair: str, data: pd.DataFrame) -> StreamingIndicatorState:
+        """Seed a pair's streaming indicator state from a candle history"""
+        state = StreamingIndicatorState()
+        columns = [data[field].to_numpy(dtype=float) for field in ('open', 'high', 'low', 'close', 'volume')]
+        
+        for timestamp, open_, high, low, close, volume in zip(data.index, *columns):
+            state.update({
+                'timestamp': timestamp, 'open': open_, 'high': high,
+                'low': low, 'close': close, 'volume': volume
+            })
+        
+        self.streaming_states[pair] = state
+        return state
+    
+    def update_stream(self, pair: str, candle: Dict) -> Optional[Signal]:
+        """
+        Push one closed candle into the pair's streaming state and evaluate
+        the 10s strategy on it in constant time (no support/resistance notes)
+        """
+        try:
+            state = self.streaming_states.get(pair)
+            if state is None:
+                state = self.streaming_states[pair] = StreamingIndicatorState()
             
-            if data.empty or len(data) < 100:
+            values = state.update(candle)
+            if state.bars < 100:
                 return None
             
-            # Generate signal using 10s strategy
-            signal = self.generate_signal_10s_strategy(data)
+            market_conditions = self.classify_market_conditions(
+                state.current_price, state.sma_20.value, state.sma_50.value,
+                state.recent_high.value, state.recent_low.value
+            )
             
+            signal = self.evaluate_10s_rules(values, market_conditions)
             if signal:
                 signal.pair = pair
-                
-                # Add support/resistance analysis
-                sr_levels = self.detect_support_resistance(data)
-                current_price = data['close'].iloc[-1]
-                
-                # Check if price is near support/resistance
-                sr_analysis = ""
-                if sr_levels['resistance']:
-                    nearest_resistance = min(sr_levels['resistance'], key=lambda x: abs(x - current_price))
-                    if abs(nearest_resistance - current_price) / current_price < 0.01:  # Within 1%
-                        sr_analysis = f" | Near Resistance at {nearest_resistance:.4f}"
-                
-                if sr_levels['support']:
-                    nearest_support = min(sr_levels['support'], key=lambda x: abs(x - current_price))
-                    if abs(nearest_support - current_price) / current_price < 0.01:  # Within 1%
-                        sr_analysis = f" | Near Support at {nearest_support:.4f}"
-                
-                signal.analysis += sr_analysis
-                
-                return signal
-            
-            return None
+            return signal
             
         except Exception as e:
-            print(f"Error generating signal for {pair}: {e}")
+            print(f"Error updating stream for {pair}: {e}")
+            return None
+    
+    def add_candle(self, symbol: str, candle: Dict) -> bool:
+        """Append a closed (or still-forming, same timestamp) candle to the symbol's history"""
+        changed = self.pairs_data.append(symbol, candle)
+        if changed and self.resampler is not None:
+            self.resampler.update(symbol, include_last=False)
+        return changed
+    
+    def candle_store(self, timeframe: str = '1m') -> CandleStore:
+        """Candle store for a timeframe ('1m' is pairs_data), created on first use"""
+        if timeframe not in self.timeframe_data:
+            self.timeframe_data[timeframe] = CandleStore(self.pairs_data.capacity, self.pairs_data.dtype)
+        return self.timeframe_data[timeframe]
+    
+    def on_bar_close(self, symbol: str, timeframe: str, candle: Dict) -> Optional[Signal]:
+        """
+        Closed-bar sink for TickAggregator: store the bar, and on
+        SIGNAL_TIMEFRAME bars run the last-bar 10s strategy cascade on it
+        """
+        store = self.candle_store(timeframe)
+        store.append(symbol, candle)
+        if store is self.pairs_data and self.resampler is not None:
+            self.resampler.update(symbol)
+        if timeframe != self.SIGNAL_TIMEFRAME:
             return None
+        
+        signal = self.generate_signal_10s_strategy(store.view(symbol, self.ANALYSIS_BARS), last_bar_only=True)
+        if signal:
+            signal.pair = self.symbol_pairs.get(symbol, symbol)
+        return signal
+    
+    def attach_resampler(self, timeframes=HIGHER_TIMEFRAMES) -> TimeframeResampler:
+        """
+        Maintain higher-timeframe candles (5m/15m/1h by default) from the 1m
+        store as 1m bars close; they land in timeframe_data and add a
+        cross-timeframe confirmation note to signals
+        """
+        self.resampler = TimeframeResampler(
+            self.pairs_data, timeframes, stores={timeframe: self.candle_store(timeframe) for timeframe in timeframes}
+        )
+        for symbol in self.pairs_data.symbols():
+            self.resampler.update(symbol, include_last=False)
+        return self.resampler
+    
+    def get_timeframe_trends(self, pair: str) -> Dict[str, Optional[str]]:
+        """
+        'UP' / 'DOWN' per resampled timeframe: last closed close versus the
+        mean of the last HTF_TREND_PERIOD closed closes (None while shorter)
+        """
+        if self.resampler is None:
+            return {}
+        
+        symbol = self.trading_pairs.get(pair, pair)
+        trends = {}
+        for timeframe, view in self.resampler.aligned_views(symbol, self.HTF_TREND_PERIOD).items():
+            close = view['close']
+            if len(close) < self.HTF_TREND_PERIOD:
+                trends[timeframe] = None
+            else:
+                trends[timeframe] = 'UP' if close[-1] > close.mean() else 'DOWN'
+        return trends
+    
+    def add_timeframe_note(self, signal: Signal) -> Signal:
+        """Cross-timeframe confirmation from the resampled 5m/15m/1h bars (with a resampler attached)"""
+        if self.resampler is not None:
+            agreeing = [
+                timeframe for timeframe, trend in self.get_timeframe_trends(signal.pair).items()
+                if trend == signal.direction
+            ]
+            if agreeing:
+                signal.analysis += f" | {'/'.join(agreeing)} trend agrees"
+        return signal
+    
+    def load_history(self, symbol: str, data) -> int:
+        """Bulk-load a candle history into the symbol's ring buffer"""
+        loaded = self.pairs_data.extend(symbol, data)
+        if loaded and self.resampler is not None:
+            self.resampler.update(symbol, include_last=False)
+        return loaded
+    
+    def get_candles(self, symbol: str, limit: int = ANALYSIS_BARS) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the latest stored candles (timestamp + OHLCV arrays)"""
+        return self.pairs_data.view(symbol, limit)
+    
+    def attach_history(self, root: str) -> CandleHistory:
+        """Open (or create) the memory-mapped on-disk candle history at root"""
+        self.history = CandleHistory(root)
+        return self.history
+    
+    def get_history(self, pair: str, start=None, end=None, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy memory-mapped slice of a pair's stored history (for backtests)"""
+        if self.history is None:
+            raise ValueError("No candle history attached; call attach_history() first")
+        return self.history.slice(self.trading_pairs.get(pair, pair), start, end, limit)
+    
+    def restore_from_history(self, pairs: Optional[List[str]] = None) -> Dict[str, int]:
+        """Warm the in-memory candle store from disk so a restart is not cold"""
+        if self.history is None:
+            raise ValueError("No candle history attached; call attach_history() first")
+        
+        symbols = [self.trading_pairs.get(pair, pair) for pair in pairs] if pairs else self.history.symbols()
+        return {
+            symbol: self.pairs_data.extend(symbol, self.history.slice(symbol, limit=self.pairs_data.capacity))
+            for symbol in symbols
+        }
+    
+    def attach_provider(self, provider, ttl: float = 5.0):
+        """
+        Use a MarketDataProvider as the live feed, behind an incremental
+        fetch + TTL cache that merges straight into the 1m candle store
+        """
+        self.market_data_provider = CachingMarketDataProvider(provider, ttl=ttl, store=self.pairs_data)
+        return self.market_data_provider
+    
+    async def refresh_from_provider(self, provider=None, pairs: Optional[List[str]] = None,
+                                    timeframe: str = '1m', limit: int = 500) -> Dict[str, int]:
+        """
+        Fetch every pair concurrently from a MarketDataProvider (default: the
+        attached one) and load the candles into the store (and the on-disk
+        history, if attached). Returns new bars stored per symbol.
+        
+        The newest bar may still be forming: a refetch of the stored last
+        bar replaces it in the store, and only bars older than the newest
+        are persisted, so the history never keeps a partial bar.
+        """
+        provider = provider or self.market_data_provider
+        if provider is None:
+            raise ValueError("No market data provider attached; call attach_provider() first")
+        
+        symbols = [self.trading_pairs.get(pair, pair) for pair in (pairs or self.trading_pairs)]
+        last_stored = {symbol: self.pairs_data.buffer(symbol).last_timestamp for symbol in symbols}
+        frames = await provider.fetch_many(symbols, timeframe, limit)
+        
+        loaded = {}
+        for symbol, data in frames.items():
+            if data.empty:
+                continue
+            last = last_stored[symbol]
+            if last is not None and last in data.index:
+                # Latest version of the stored (possibly forming) last bar
+                bar = data.loc[last]
+                self.pairs_data.append(symbol, {'timestamp': last, **{field: bar[field] for field in FIELDS}})
+            self.pairs_data.extend(symbol, data)
+            if self.resampler is not None:
+                self.resampler.update(symbol, include_last=False)
+            loaded[symbol] = len(data) if last is None else int((data.index.to_numpy() > last).sum())
+            if self.history is not None:
+                self.history.append(symbol, data.iloc[:-1])
+        return loaded
     
     def get_random_pair(self) -> str:
         """Get random trading pair"""
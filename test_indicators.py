@@ -0,0 +1,481 @@
+"""
+Indicator parity tests for the Technical Analysis Engine
+Author: Ankit Singh
+"""
+
+import numpy as np
+import pandas as pd
+import ta
+
+import numpy_indicators
+from indicator_cache import IndicatorCache
+from indicator_graph import IndicatorGraph, CLOSE, HIGH
+from technical_analysis import TechnicalAnalysisEngine
+
+
+def make_candles(seed: int, limit: int = 500) -> pd.DataFrame:
+    """Deterministic random-walk OHLCV candles for parity checks"""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, limit)))
+    opens = np.r_[closes[0], closes[:-1]]
+    spread = np.abs(rng.normal(0, 0.001, (2, limit)))
+
+    return pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, closes) * (1 + spread[0]),
+        'low': np.minimum(opens, closes) * (1 - spread[1]),
+        'close': closes,
+        'volume': rng.uniform(1000, 10000, limit)
+    }, index=pd.date_range('2024-01-01', periods=limit, freq='1min', name='timestamp'))
+
+
+def reference_demarker(high: pd.Series, low: pd.Series, period: int = 14) -> pd.Series:
+    """Original per-bar DeMarker implementation, kept as the parity reference"""
+    de_max = pd.Series(index=high.index, dtype=float)
+    de_min = pd.Series(index=low.index, dtype=float)
+
+    for i in range(1, len(high)):
+        de_max.iloc[i] = max(0, high.iloc[i] - high.iloc[i-1])
+        de_min.iloc[i] = max(0, low.iloc[i-1] - low.iloc[i])
+
+    sma_de_max = de_max.rolling(window=period).mean()
+    sma_de_min = de_min.rolling(window=period).mean()
+
+    return sma_de_max / (sma_de_max + sma_de_min)
+
+
+def test_demarker_matches_reference():
+    engine = TechnicalAnalysisEngine()
+
+    for seed in range(3):
+        data = make_candles(seed)
+        expected = reference_demarker(data['high'], data['low'], 14)
+        result = engine.calculate_demarker(data['high'], data['low'], 14)
+
+        pd.testing.assert_series_equal(result, expected, check_names=False)
+
+
+def test_demarker_handles_missing_values():
+    engine = TechnicalAnalysisEngine()
+    data = make_candles(3, 120)
+    high = data['high'].copy()
+    low = data['low'].copy()
+    high.iloc[[10, 50]] = np.nan
+    low.iloc[[11, 70]] = np.nan
+
+    expected = reference_demarker(high, low, 14)
+    result = engine.calculate_demarker(high, low, 14)
+
+    pd.testing.assert_series_equal(result, expected, check_names=False)
+
+
+def reference_wma(data: pd.Series, period: int) -> pd.Series:
+    """Original rolling().apply() WMA implementation, kept as the parity reference"""
+    weights = np.arange(1, period + 1)
+    return data.rolling(window=period).apply(
+        lambda x: np.dot(x, weights) / weights.sum() if len(x) == period else np.nan
+    )
+
+
+def test_wma_matches_reference():
+    engine = TechnicalAnalysisEngine()
+    close = make_candles(4, 300)['close']
+    close.iloc[[40, 41, 200]] = np.nan
+
+    for period in [1, 5, 25]:
+        pd.testing.assert_series_equal(engine.calculate_wma(close, period), reference_wma(close, period))
+
+    # Fewer bars than the period gives an all-NaN series, as before
+    short = close.iloc[:10]
+    pd.testing.assert_series_equal(engine.calculate_wma(short, 25), reference_wma(short, 25))
+
+
+def reference_support_resistance(data: pd.DataFrame, window: int = 20) -> dict:
+    """Original sliced-window support/resistance scan, kept as the parity reference"""
+    high_prices = data['high']
+    low_prices = data['low']
+    resistance_levels = []
+    support_levels = []
+
+    for i in range(window, len(data) - window):
+        if high_prices.iloc[i] == high_prices.iloc[i-window:i+window+1].max():
+            resistance_levels.append(high_prices.iloc[i])
+        if low_prices.iloc[i] == low_prices.iloc[i-window:i+window+1].min():
+            support_levels.append(low_prices.iloc[i])
+
+    return {
+        'resistance': resistance_levels[-3:] if resistance_levels else [],
+        'support': support_levels[-3:] if support_levels else []
+    }
+
+
+def test_support_resistance_matches_reference():
+    engine = TechnicalAnalysisEngine()
+
+    for seed, limit in [(5, 500), (6, 2000), (7, 30)]:
+        data = make_candles(seed, limit)
+        for window in [5, 20]:
+            assert engine.detect_support_resistance(data, window) == reference_support_resistance(data, window)
+
+    # Flat prices make every bar an extremum; ties must be kept like the original
+    flat = data.copy()
+    flat[['high', 'low']] = 1.0
+    assert engine.detect_support_resistance(flat, 5) == reference_support_resistance(flat, 5)
+
+
+def full_series_values(engine: TechnicalAnalysisEngine, data: pd.DataFrame) -> dict:
+    """Trailing values read off the full-length indicator series"""
+    close = data['close']
+    wma_25 = engine.calculate_wma(close, 25)
+    sma_10 = engine.calculate_sma(close, 10)
+    return {
+        'current_price': close.iloc[-1],
+        'sma_100': engine.calculate_sma(close, 100).iloc[-1],
+        'wma_25': wma_25.iloc[-1],
+        'sma_10': sma_10.iloc[-1],
+        'rsi': engine.calculate_rsi(close, 14).iloc[-1],
+        'demarker': engine.calculate_demarker(data['high'], data['low'], 14).iloc[-1],
+        'volume_osc': engine.calculate_volume_oscillator(data['volume']).iloc[-1],
+        'prev_wma_25': wma_25.iloc[-2],
+        'prev_sma_10': sma_10.iloc[-2]
+    }
+
+
+def test_last_bar_values_match_full_series():
+    engine = TechnicalAnalysisEngine()
+
+    for seed in range(8, 11):
+        data = make_candles(seed)
+        expected = full_series_values(engine, data)
+        close = data['close'].to_numpy()
+        result = {
+            **engine.calculate_last_bar_trend(close),
+            **engine.calculate_last_bar_confirmation(close, data['high'].to_numpy(),
+                                                     data['low'].to_numpy(), data['volume'].to_numpy())
+        }
+
+        assert result.keys() == expected.keys()
+        for key, value in expected.items():
+            assert np.isclose(result[key], value, rtol=1e-9, atol=0), key
+
+
+def test_last_bar_mode_gives_same_decisions():
+    engine = TechnicalAnalysisEngine()
+    signals = 0
+
+    for seed in range(11, 15):
+        history = make_candles(seed, 700)
+        for end in range(150, len(history) + 1, 3):
+            data = history.iloc[:end]
+            full = engine.generate_signal_10s_strategy(data)
+            fast = engine.generate_signal_10s_strategy(data, last_bar_only=True)
+
+            assert (full is None) == (fast is None)
+            if full:
+                signals += 1
+                assert (full.direction, full.confidence, full.analysis) == (fast.direction, fast.confidence, fast.analysis)
+
+    assert signals > 0
+
+
+def test_streaming_state_matches_batch_indicators():
+    engine = TechnicalAnalysisEngine()
+    data = make_candles(15, 400)
+    state = engine.warm_up_stream('EUR/USD', data)
+
+    for key, value in full_series_values(engine, data).items():
+        assert np.isclose(state.values()[key], value, rtol=1e-9, atol=0), key
+
+    macd = engine.calculate_macd(data['close'])
+    for key in ['macd', 'signal', 'histogram']:
+        assert np.isclose(state.macd.value[key], macd[key].iloc[-1], rtol=1e-9, atol=0), key
+
+    assert state.bars == len(data)
+    assert state.last_timestamp == data.index[-1]
+
+
+def test_streaming_signals_match_batch_strategy():
+    engine = TechnicalAnalysisEngine()
+    signals = 0
+
+    for seed in range(16, 19):
+        history = make_candles(seed, 600)
+        engine.warm_up_stream('EUR/USD', history.iloc[:150])
+
+        for end in range(151, len(history) + 1):
+            candle = history.iloc[end - 1].to_dict()
+            streamed = engine.update_stream('EUR/USD', candle)
+            batch = engine.generate_signal_10s_strategy(history.iloc[:end])
+
+            assert (streamed is None) == (batch is None)
+            if batch:
+                signals += 1
+                assert streamed.pair == 'EUR/USD'
+                assert (streamed.direction, streamed.confidence, streamed.analysis) == (batch.direction, batch.confidence, batch.analysis)
+
+    assert signals > 0
+
+
+def test_indicator_cache_lru_ttl_and_invalidation():
+    now = [0.0]
+    cache = IndicatorCache(max_entries=2, ttl=60, clock=lambda: now[0])
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    assert cache.get_or_compute(('EURUSD', '1m', 1, 'signal'), lambda: compute(None)) is None
+    assert cache.get_or_compute(('EURUSD', '1m', 1, 'signal'), lambda: compute('again')) is None
+    assert calls == [None]
+
+    # A newer candle invalidates every older entry for the symbol/timeframe
+    cache.put(('EURUSD', '1m', 2, 'signal'), 'fresh')
+    assert cache.lookup(('EURUSD', '1m', 1, 'signal')) == (False, None)
+    assert cache.get_stats()['invalidations'] == 1
+
+    # Size bound evicts the least recently used entry
+    cache.put(('GBPUSD', '1m', 1, 'signal'), 'gbp')
+    cache.put(('USDJPY', '1m', 1, 'signal'), 'jpy')
+    assert cache.lookup(('EURUSD', '1m', 2, 'signal')) == (False, None)
+    assert cache.get_stats()['evictions'] == 1
+
+    # Entries older than the TTL expire
+    now[0] = 61.0
+    assert cache.lookup(('USDJPY', '1m', 1, 'signal')) == (False, None)
+    assert cache.get_stats()['expirations'] == 1
+
+    # A new version of the same (forming) candle supersedes the old one
+    cache.put(('USDJPY', '1m', 2, 'indicators', (1.0,)), 'frame')
+    cache.put(('USDJPY', '1m', 2, 'signal', (1.0,)), 'up')
+    cache.put(('USDJPY', '1m', 2, 'signal', (0.9,)), None)
+    assert cache.lookup(('USDJPY', '1m', 2, 'signal', (1.0,))) == (False, None)
+    assert cache.lookup(('USDJPY', '1m', 2, 'indicators', (1.0,))) == (False, None)
+    assert cache.lookup(('USDJPY', '1m', 2, 'signal', (0.9,))) == (True, None)
+
+
+def test_rewritten_forming_bar_is_not_served_from_cache():
+    history = make_candles(70, 900).iloc[:390]
+    engine = TechnicalAnalysisEngine()
+    engine.load_history('EURUSD', history)
+    assert engine.generate_comprehensive_signal('EUR/USD').direction == 'DOWN'
+
+    # The forming bar is rewritten in place under the same timestamp
+    last = history.iloc[-1]
+    rewritten = {'timestamp': history.index[-1], 'open': last['open'], 'high': last['high'],
+                 'low': min(last['low'], last['close'] * 0.9), 'close': last['close'] * 0.9, 'volume': last['volume']}
+    engine.add_candle('EURUSD', rewritten)
+
+    fresh = TechnicalAnalysisEngine()
+    fresh.load_history('EURUSD', history.iloc[:-1])
+    fresh.add_candle('EURUSD', rewritten)
+    expected = fresh.generate_comprehensive_signal('EUR/USD')
+    signal = engine.generate_comprehensive_signal('EUR/USD')
+    assert (signal and signal.direction) == (expected and expected.direction)
+    assert signal is None
+
+
+def test_comprehensive_signal_served_from_cache():
+    engine = TechnicalAnalysisEngine()
+    engine.get_market_data = lambda symbol, timeframe='1m', limit=500: make_candles(19, limit)
+
+    first = engine.generate_comprehensive_signal('EUR/USD')
+    second = engine.generate_comprehensive_signal('EUR/USD')
+    stats = engine.indicators_cache.get_stats()
+
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert (first is None) == (second is None)
+    if first:
+        assert first is not second and first.analysis == second.analysis
+
+
+def test_numpy_backend_matches_ta_backend():
+    reference = TechnicalAnalysisEngine(backend='pandas')
+    data = make_candles(20, 600)
+    close, high, low, volume = data['close'], data['high'], data['low'], data['volume']
+
+    for dtype, tolerance in [(np.float64, 1e-9), (np.float32, 1e-3)]:
+        engine = TechnicalAnalysisEngine(backend='numpy', dtype=dtype)
+        pairs = [
+            (engine.calculate_sma(close, 100), reference.calculate_sma(close, 100)),
+            (engine.calculate_wma(close, 25), reference.calculate_wma(close, 25)),
+            (engine.calculate_rsi(close, 14), reference.calculate_rsi(close, 14)),
+            (engine.calculate_demarker(high, low, 14), reference.calculate_demarker(high, low, 14)),
+            (engine.calculate_volume_oscillator(volume), reference.calculate_volume_oscillator(volume))
+        ]
+        fast_macd = engine.calculate_macd(close)
+        ta_macd = reference.calculate_macd(close)
+        pairs += [(fast_macd[key], ta_macd[key]) for key in ['macd', 'signal', 'histogram']]
+
+        for result, expected in pairs:
+            assert result.index.equals(expected.index)
+            assert np.array_equal(np.isnan(result.to_numpy()), np.isnan(expected.to_numpy()))
+            np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(), rtol=tolerance, atol=tolerance)
+
+
+def test_numpy_kernels_apply_along_last_axis():
+    closes = np.stack([make_candles(seed, 300)['close'].to_numpy() for seed in range(21, 24)])
+
+    for kernel in [lambda x: numpy_indicators.sma(x, 10), lambda x: numpy_indicators.wma(x, 25),
+                   lambda x: numpy_indicators.rsi(x, 14), lambda x: numpy_indicators.macd(x)['histogram']]:
+        batch = kernel(closes)
+        for row, close in zip(batch, closes):
+            np.testing.assert_allclose(row, kernel(close), rtol=1e-12, atol=1e-12)
+
+
+def test_numpy_moving_averages_match_pandas_on_long_gappy_series():
+    close = make_candles(27, 20000)['close'].to_numpy().copy()
+    close[[5, 300, 301, 9000]] = np.nan
+    weights = np.arange(1, 26, dtype=float)
+
+    pairs = [(numpy_indicators.sma(close, period), pd.Series(close).rolling(period).mean().to_numpy())
+             for period in (1, 10, 100)]
+    pairs.append((numpy_indicators.wma(close, 25),
+                  pd.Series(close).rolling(25).apply(lambda window: window @ weights / weights.sum(), raw=True).to_numpy()))
+    for result, expected in pairs:
+        assert np.array_equal(np.isnan(result), np.isnan(expected))
+        np.testing.assert_allclose(result, expected, rtol=1e-10)
+
+
+def test_numpy_backend_gives_same_decisions():
+    reference = TechnicalAnalysisEngine(backend='pandas')
+    engine = TechnicalAnalysisEngine(backend='numpy')
+
+    for seed in range(24, 27):
+        history = make_candles(seed, 500)
+        for end in range(150, len(history) + 1, 7):
+            expected = reference.generate_signal_10s_strategy(history.iloc[:end])
+            result = engine.generate_signal_10s_strategy(history.iloc[:end])
+            assert (result is None) == (expected is None)
+            if expected:
+                assert (result.direction, result.confidence, result.analysis) == (expected.direction, expected.confidence, expected.analysis)
+
+
+def test_batch_signals_match_per_pair_strategy():
+    engine = TechnicalAnalysisEngine()
+    histories = {f'PAIR{seed}': make_candles(seed, 400) for seed in range(30, 42)}
+    signals = 0
+
+    for end in range(150, 401, 5):
+        frames = {symbol: history.iloc[:end] for symbol, history in histories.items()}
+        batch = engine.generate_signals_batch(list(frames), engine.stack_market_data(frames))
+
+        for symbol, data in frames.items():
+            expected = engine.generate_signal_10s_strategy(data)
+            result = batch[symbol]
+            assert (result is None) == (expected is None)
+            if expected:
+                signals += 1
+                assert result.pair == symbol
+                assert (result.direction, result.confidence, result.analysis) == (expected.direction, expected.confidence, expected.analysis)
+
+    assert signals > 0
+    assert engine.generate_signals_batch(['A'], engine.stack_market_data({'A': make_candles(1, 50)})) == {'A': None}
+
+
+def test_indicator_graph_matches_engine_and_shares_work():
+    engine = TechnicalAnalysisEngine()
+    data = make_candles(42, 500)
+    graph = IndicatorGraph(data)
+    series = graph.evaluate(TechnicalAnalysisEngine.STRATEGY_10S_INDICATORS)
+    frame = engine.calculate_indicator_frame(data)
+
+    for name in ['sma_100', 'wma_25', 'sma_10', 'rsi', 'demarker', 'volume_osc']:
+        np.testing.assert_allclose(series[name], frame[name].to_numpy(), rtol=1e-9, atol=1e-9)
+    assert graph.get(('support_resistance', 20)) == engine.detect_support_resistance(data, 20)
+
+    # Shared primitives are built once however many consumers read them
+    assert graph.evaluations[('cumsum', CLOSE)] == 1
+    assert graph.evaluations[('diff', HIGH)] == 1
+    assert max(graph.evaluations.values()) == 1
+    assert ('sma', CLOSE, 20) in graph.nodes and ('macd',) not in graph.nodes
+
+
+def test_graph_signals_match_strategy():
+    engine = TechnicalAnalysisEngine()
+    signals = 0
+
+    for seed in range(43, 47):
+        history = make_candles(seed, 500)
+        for end in range(150, len(history) + 1, 3):
+            data = history.iloc[:end]
+            expected = engine.generate_signal_10s_strategy(data)
+            result = engine.generate_signal_from_graph(IndicatorGraph(data))
+            assert (result is None) == (expected is None)
+            if expected:
+                signals += 1
+                assert (result.direction, result.confidence, result.analysis) == (expected.direction, expected.confidence, expected.analysis)
+
+    assert signals > 0
+
+
+def test_comprehensive_signal_uses_the_engine_backend(monkeypatch):
+    rsi_calls = []
+    rsi_indicator = ta.momentum.RSIIndicator
+    monkeypatch.setattr(ta.momentum, 'RSIIndicator', lambda *args, **kwargs: rsi_calls.append(1) or rsi_indicator(*args, **kwargs))
+
+    history = make_candles(70, 900).iloc[:390]
+    signals = {}
+    for backend in ('pandas', 'numpy'):
+        engine = TechnicalAnalysisEngine(backend=backend)
+        engine.load_history('EURUSD', history)
+        signals[backend] = engine.generate_comprehensive_signal('EUR/USD')
+        assert bool(rsi_calls) == (backend == 'pandas')
+        rsi_calls.clear()
+
+    assert (signals['pandas'].direction, signals['pandas'].analysis) == (signals['numpy'].direction, signals['numpy'].analysis)
+
+    # Both graph backends compute the same series
+    data = make_candles(42, 500)
+    series = {
+        backend: IndicatorGraph(data, backend=backend).evaluate(TechnicalAnalysisEngine.STRATEGY_10S_INDICATORS)
+        for backend in ('pandas', 'numpy')
+    }
+    for name, values in series['numpy'].items():
+        np.testing.assert_allclose(series['pandas'][name], values, rtol=1e-9, atol=1e-9)
+
+
+def test_graph_support_resistance_matches_engine_on_long_windows():
+    engine = TechnicalAnalysisEngine()
+    data = make_candles(48, 20000)
+    for window in (5, 200):
+        assert IndicatorGraph(data).get(('support_resistance', window)) == engine.detect_support_resistance(data, window)
+
+
+def test_cascade_counts_each_rejection_stage():
+    engine = TechnicalAnalysisEngine()
+    history = make_candles(47, 600)
+    signals = 0
+
+    for end in range(50, len(history) + 1):
+        if engine.generate_signal_10s_strategy(history.iloc[:end], last_bar_only=True):
+            signals += 1
+
+    stats = engine.get_cascade_stats()
+    stages = ['insufficient_data', 'low_volatility', 'no_crossover', 'against_trend', 'not_confirmed', 'signals']
+    assert stats['evaluated'] == len(history) - 49
+    assert sum(stats[stage] for stage in stages) == stats['evaluated']
+    assert stats['insufficient_data'] == 50 and stats['signals'] == signals
+    assert stats['no_crossover'] > stats['not_confirmed']
+
+
+def test_universe_scan_ranks_every_pairs_signal():
+    histories = {pair: make_candles(70 + index, 900) for index, pair in enumerate(TechnicalAnalysisEngine().trading_pairs)}
+    found = 0
+
+    for end in range(300, 901, 5):
+        engine = TechnicalAnalysisEngine()
+        for pair, history in histories.items():
+            engine.load_history(engine.trading_pairs[pair], history.iloc[:end])
+
+        ranked = engine.scan_universe(min_confidence='LOW')
+        expected = [engine.generate_comprehensive_signal(pair) for pair in engine.trading_pairs]
+        expected = sorted((signal for signal in expected if signal), key=lambda signal: signal.score, reverse=True)
+
+        assert [(signal.pair, signal.direction, signal.analysis) for signal in ranked] == \
+            [(signal.pair, signal.direction, signal.analysis) for signal in expected]
+        assert engine.scan_stats['pairs_analyzed'] < len(histories)
+        assert all(signal.confidence != 'LOW' for signal in engine.scan_universe())
+        found += len(ranked) > 1
+
+    assert found > 0  # Some rounds rank several pairs
@@ -0,0 +1,516 @@
+"""
+Market data layer tests for the Technical Analysis Engine
+Author: Ankit Singh
+"""
+
+import asyncio
+import os
+import subprocess
+import time
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candle_store import CandleRingBuffer
+from market_data_providers import HTTPMarketDataProvider, MarketDataProvider, StubProviderServer
+from market_simulator import SyntheticMarket
+from rate_limiter import KeyedRateLimiter, TokenBucket
+from tick_aggregator import TickAggregator
+from technical_analysis import TechnicalAnalysisEngine
+from test_indicators import make_candles
+
+
+def frame_candles(data: pd.DataFrame):
+    """Row dicts (with timestamp) of a candle frame"""
+    return [{'timestamp': timestamp, **row} for timestamp, row in zip(data.index, data.to_dict('records'))]
+
+
+def test_ring_buffer_wraps_without_copying():
+    data = make_candles(50, 25)
+    buffer = CandleRingBuffer(capacity=8)
+    storage = buffer.columns['close']
+
+    for candle in frame_candles(data):
+        assert buffer.append(candle)
+
+    view = buffer.view()
+    assert len(buffer) == 8
+    np.testing.assert_array_equal(view['close'], data['close'].to_numpy()[-8:])
+    np.testing.assert_array_equal(view['timestamp'], data.index.to_numpy()[-8:])
+    assert np.shares_memory(view['close'], storage) and buffer.columns['close'] is storage
+    np.testing.assert_array_equal(buffer.view(3)['high'], data['high'].to_numpy()[-3:])
+
+    # Same timestamp replaces the forming bar, older timestamps are ignored
+    forming = {**frame_candles(data)[-1], 'close': 1.0}
+    assert buffer.append(forming) and buffer.view(1)['close'][0] == 1.0 and len(buffer) == 8
+    assert not buffer.append(frame_candles(data)[0])
+
+
+def test_ring_buffer_bulk_extend_matches_appends():
+    data = make_candles(51, 40)
+    appended = CandleRingBuffer(capacity=16)
+    extended = CandleRingBuffer(capacity=16)
+
+    for candle in frame_candles(data.iloc[:10]):
+        appended.append(candle)
+        extended.append(candle)
+    for candle in frame_candles(data.iloc[5:]):
+        appended.append(candle)
+    tail = data.iloc[5:]
+    extended.extend(tail.index.to_numpy(), {field: tail[field].to_numpy() for field in tail})
+
+    for field, values in appended.view().items():
+        np.testing.assert_array_equal(extended.view()[field], values)
+
+
+def test_comprehensive_signal_reads_candle_store():
+    store_engine = TechnicalAnalysisEngine()
+
+    for seed in range(52, 60):
+        data = make_candles(seed, 500)
+        store_engine.load_history('EURUSD', data)
+        # Seeded from the demo feed on first use
+        frame_engine = TechnicalAnalysisEngine()
+        frame_engine.get_market_data = lambda symbol, timeframe='1m', limit=500, data=data: data
+
+        from_store = store_engine.generate_comprehensive_signal('EUR/USD')
+        from_frame = frame_engine.generate_comprehensive_signal('EUR/USD')
+        assert (from_store is None) == (from_frame is None)
+        if from_frame:
+            assert (from_store.direction, from_store.analysis) == (from_frame.direction, from_frame.analysis)
+        assert frame_engine.pairs_data.bar_count('EURUSD') == 500
+
+        # Every seed reuses the same timestamps, so reset stored history and cache
+        store_engine.pairs_data.buffers.clear()
+        store_engine.indicators_cache.clear()
+
+
+def test_demo_feed_seeds_store_once_then_appends_new_candles():
+    engine = TechnicalAnalysisEngine()
+    data = make_candles(62, 600)
+    fetches = []
+    engine.get_market_data = lambda symbol, timeframe='1m', limit=500: fetches.append(symbol) or feed[0]
+
+    feed = [data.iloc[:500]]
+    first, last_candle = engine.get_pair_data('EUR/USD')
+    second, _ = engine.get_pair_data('EUR/USD')
+    assert fetches == ['EURUSD']  # Repeats within the minute read the buffer only
+    assert isinstance(first['close'], np.ndarray) and last_candle == data.index[499]
+    np.testing.assert_array_equal(second['close'], data['close'].to_numpy()[:500])
+
+    # A minute later only the newer candles are appended
+    feed = [data.iloc[100:503]]
+    engine.demo_feed_synced['EURUSD'] -= pd.Timedelta(minutes=1)
+    third, last_candle = engine.get_pair_data('EUR/USD')
+    assert fetches == ['EURUSD', 'EURUSD'] and last_candle == data.index[502]
+    assert engine.pairs_data.bar_count('EURUSD') == 503
+    np.testing.assert_array_equal(third['close'], data['close'].to_numpy()[3:503])
+
+    # Pairs with a loaded history never touch the demo feed
+    engine.load_history('GBPUSD', data)
+    engine.get_pair_data('GBP/USD')
+    assert fetches == ['EURUSD', 'EURUSD']
+
+
+def test_candle_history_appends_and_slices_memory_maps(tmp_path):
+    engine = TechnicalAnalysisEngine()
+    history = engine.attach_history(str(tmp_path))
+    data = make_candles(60, 300)
+
+    assert history.append('EURUSD', data.iloc[:200]) == 200
+    assert history.append('EURUSD', data.iloc[150:]) == 100  # Overlap is skipped
+    assert history.symbols() == ['EURUSD'] and history.bar_count('EURUSD') == 300
+
+    window = engine.get_history('EUR/USD', start=data.index[100], end=data.index[110])
+    assert isinstance(window['close'], np.memmap)
+    np.testing.assert_array_equal(window['close'], data['close'].to_numpy()[100:110])
+    np.testing.assert_array_equal(window['timestamp'], data.index.to_numpy()[100:110])
+    assert len(engine.get_history('EUR/USD', limit=20)['volume']) == 20
+
+    # A fresh engine restores its in-memory candles from disk
+    restarted = TechnicalAnalysisEngine()
+    restarted.attach_history(str(tmp_path))
+    assert restarted.restore_from_history() == {'EURUSD': 300}
+    np.testing.assert_array_equal(restarted.get_candles('EURUSD', 300)['close'], data['close'].to_numpy())
+
+
+def test_candle_history_ignores_interrupted_append(tmp_path):
+    history = TechnicalAnalysisEngine().attach_history(str(tmp_path))
+    data = make_candles(61, 50)
+    history.append('GBPUSD', data.iloc[:40])
+
+    # Simulate a crash after the value columns were written but before timestamps
+    with open(history.column_path('GBPUSD', 'close'), 'ab') as handle:
+        np.ones(5).tofile(handle)
+    assert history.bar_count('GBPUSD') == 40
+
+    history.append('GBPUSD', data.iloc[40:45])
+    np.testing.assert_array_equal(history.slice('GBPUSD')['close'], data['close'].to_numpy()[:45])
+
+    # ... and after a torn timestamp write
+    with open(history.column_path('GBPUSD', 'timestamp'), 'ab') as handle:
+        handle.write(b'\x01\x02\x03')
+    assert history.bar_count('GBPUSD') == 45
+
+    history.append('GBPUSD', data.iloc[45:])
+    columns = history.slice('GBPUSD')
+    np.testing.assert_array_equal(columns['close'], data['close'].to_numpy())
+    np.testing.assert_array_equal(columns['timestamp'], data.index.to_numpy())
+
+
+class ScriptedProvider(MarketDataProvider):
+    """Serves the queued frames, one per fetch"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    async def fetch_candles(self, symbol, timeframe='1m', limit=500, since=None):
+        return self.frames.pop(0)
+
+
+def test_provider_refresh_updates_forming_bar_and_persists_closed_bars(tmp_path):
+    engine = TechnicalAnalysisEngine()
+    engine.attach_history(str(tmp_path))
+    data = make_candles(62, 120)
+    revised = data.iloc[-2:].copy()
+    revised.iloc[-1, revised.columns.get_loc('close')] += 1.0  # The forming bar moved on
+    grown = pd.concat([revised, make_candles(62, 122).iloc[-1:].set_axis([data.index[-1] + pd.Timedelta(minutes=1)])])
+    provider = ScriptedProvider([data, revised, grown])
+
+    async def refresh(times):
+        return [await engine.refresh_from_provider(provider, pairs=['EURUSD']) for _ in range(times)]
+
+    assert asyncio.run(refresh(2)) == [{'EURUSD': 120}, {'EURUSD': 0}]
+    assert engine.get_candles('EURUSD')['close'][-1] == revised['close'].iloc[-1]
+    assert engine.history.bar_count('EURUSD') == 119  # The forming bar stays off disk
+
+    assert asyncio.run(refresh(1)) == [{'EURUSD': 1}]
+    np.testing.assert_array_equal(engine.history.slice('EURUSD')['close'][-2:], revised['close'].to_numpy())
+    assert engine.history.bar_count('EURUSD') == 120 and engine.pairs_data.bar_count('EURUSD') == 121
+
+
+def test_synthetic_market_is_stable_per_symbol():
+    market = SyntheticMarket(seed=7)
+    end = pd.Timestamp('2024-01-01 12:00')
+    universe = market.generate([f'SYM{i}' for i in range(200)], 300, end)
+    alone = market.generate(['SYM42'], 300, end)
+
+    assert universe['close'].shape == (200, 300)
+    for field in ['open', 'high', 'low', 'close', 'volume']:
+        np.testing.assert_array_equal(universe[field][42], alone[field][0])
+    assert (universe['high'] >= np.maximum(universe['open'], universe['close'])).all()
+    assert (universe['low'] <= np.minimum(universe['open'], universe['close'])).all()
+    assert universe['timestamp'][-1] == np.datetime64(end)
+
+    # Same prices whatever PYTHONHASHSEED the process runs with
+    script = ("from market_simulator import SyntheticMarket; "
+              "print(repr(SyntheticMarket(seed=7).generate(['SYM42'], 300)['close'][0, -1]))")
+    outputs = {
+        subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                       env={**os.environ, 'PYTHONHASHSEED': hash_seed}).stdout.strip()
+        for hash_seed in ['1', '2']
+    }
+    assert outputs == {repr(alone['close'][0, -1])}
+
+
+def test_get_market_data_leaves_global_rng_alone():
+    engine = TechnicalAnalysisEngine()
+    np.random.seed(123)
+    expected = np.random.random()
+
+    np.random.seed(123)
+    first = engine.get_market_data('EURUSD', '1m', 200)
+    assert np.random.random() == expected
+
+    second = engine.get_market_data('EURUSD', '1m', 200)
+    np.testing.assert_array_equal(first['close'].to_numpy(), second['close'].to_numpy())
+    assert len(first) == 200 and first.index[-1] == pd.Timestamp.now().floor('1min')
+
+
+def test_tick_stream_advances_every_symbol():
+    market = SyntheticMarket()
+    start = pd.Timestamp('2024-01-01 09:00')
+    stream = market.ticks(['EURUSD', 'GBPUSD'], speed=0, tick_interval=0.5, start=start)
+    batches = [next(stream) for _ in range(4)]
+
+    assert [batch['timestamp'] for batch in batches] == [start + pd.Timedelta(seconds=0.5 * (i + 1)) for i in range(4)]
+    assert all(batch['price'].shape == (2,) and (batch['price'] > 0).all() for batch in batches)
+    assert not np.array_equal(batches[0]['price'], batches[-1]['price'])
+
+
+def test_http_provider_fetches_universe_concurrently_over_pooled_connections():
+    engine = TechnicalAnalysisEngine()
+    end = pd.Timestamp('2024-01-01 12:00')
+
+    async def refresh_twice(provider):
+        async with provider:
+            started = time.perf_counter()
+            loaded = await engine.refresh_from_provider(provider)
+            elapsed = time.perf_counter() - started
+            await provider.fetch_many(['EURUSD', 'GBPUSD'])
+            return loaded, elapsed
+
+    with StubProviderServer(latency=0.2, end=end) as server:
+        provider = HTTPMarketDataProvider(server.url)
+        loaded, elapsed = asyncio.run(refresh_twice(provider))
+
+        assert len(loaded) == len(engine.trading_pairs) and set(loaded.values()) == {500}
+        assert elapsed < 0.2 * len(loaded) / 2  # Sequential fetches would take over 6s
+        assert server.stats['requests'] == len(loaded) + 2
+        assert server.stats['connections'] <= len(loaded)  # Second round reused the pool
+
+    expected = SyntheticMarket().generate_frame('XAUUSD', 500, end)
+    np.testing.assert_allclose(engine.get_candles('XAUUSD')['close'], expected['close'].to_numpy())
+    np.testing.assert_array_equal(engine.get_candles('XAUUSD')['timestamp'], expected.index.to_numpy())
+
+
+def test_http_provider_retries_with_backoff():
+    settings = {'backoff_factor': 0.01, 'retry_attempts': 2}
+
+    async def fetch(provider, symbols):
+        async with provider:
+            return await provider.fetch_many(symbols, limit=50)
+
+    with StubProviderServer() as server:
+        server.fail_next = 2
+        provider = HTTPMarketDataProvider(server.url, settings)
+        frames = asyncio.run(fetch(provider, ['EURUSD']))
+        assert len(frames['EURUSD']) == 50
+        assert provider.stats['retries'] == 2 and provider.stats['failures'] == 0
+
+        server.fail_next = 3
+        provider = HTTPMarketDataProvider(server.url, settings)
+        frames = asyncio.run(fetch(provider, ['EURUSD']))
+        assert frames['EURUSD'].empty and provider.stats['failures'] == 1
+
+
+def test_token_bucket_bursts_then_paces():
+    now = [0.0]
+    bucket = TokenBucket.per_minute(120, capacity=2, clock=lambda: now[0])
+
+    assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    now[0] += 0.5
+    assert bucket.try_acquire() == 0
+
+
+def test_keyed_rate_limiter_paces_globally_and_per_key():
+    now = [0.0]
+    limiter = KeyedRateLimiter(rate=2, key_rate=0.5, capacity=2, max_keys=2, clock=lambda: now[0])
+
+    assert limiter.try_acquire('a') == 0 and limiter.try_acquire('b') == 0
+    assert limiter.try_acquire('a') == pytest.approx(2.0)  # a's own bucket is empty
+    assert limiter.try_acquire('c') == pytest.approx(0.5)  # The global bucket is empty
+    now[0] += 0.5
+    assert limiter.try_acquire('c') == 0
+    assert len(limiter.buckets) == 3  # Nothing idle to drop yet
+
+    # A flood-wait holds back the chat and, by default, everyone else
+    limiter.pause('c', 10)
+    now[0] += 2.0
+    assert limiter.try_acquire('a') == pytest.approx(8.0) and limiter.try_acquire('c') == pytest.approx(8.0)
+    now[0] += 8.0
+    assert limiter.try_acquire('c') == 0
+
+    now[0] += 10.0
+    limiter.try_acquire('d')
+    assert list(limiter.buckets) == ['d']  # Idle buckets dropped once max_keys is reached
+
+
+def test_caching_provider_fetches_only_new_candles():
+    engine = TechnicalAnalysisEngine()
+    now = [0.0]
+    end = pd.Timestamp('2024-01-01 12:00')
+
+    with StubProviderServer(end=end) as server:
+        provider = HTTPMarketDataProvider(server.url)
+        cache = engine.attach_provider(provider, ttl=5.0)
+        cache.clock = lambda: now[0]
+
+        async def refresh_three_times():
+            async with cache:
+                refresh = lambda: engine.refresh_from_provider(pairs=['EUR/USD', 'GBP/USD'])
+                assert await refresh() == {'EURUSD': 500, 'GBPUSD': 500}
+                full_bytes = server.stats['bytes_sent']
+
+                # Within the TTL nothing goes upstream
+                now[0] += 1
+                assert await refresh() == {'EURUSD': 0, 'GBPUSD': 0}
+                assert server.stats['requests'] == 2
+
+                # Three minutes later only the last stored bar and the new ones are fetched
+                server.end = end + pd.Timedelta(minutes=3)
+                now[0] += 10
+                assert await refresh() == {'EURUSD': 3, 'GBPUSD': 3}
+                return full_bytes
+
+        full_bytes = asyncio.run(refresh_three_times())
+
+    assert server.stats['requests'] == 4
+    assert server.stats['bytes_sent'] - full_bytes < full_bytes / 50
+    latest = SyntheticMarket().generate_frame('EURUSD', 500, server.end).iloc[-4:]
+    stored = engine.get_candles('EURUSD', 503)
+    assert len(stored['close']) == 503 and stored['timestamp'][-1] == np.datetime64(server.end)
+    np.testing.assert_allclose(stored['close'][-4:], latest['close'].to_numpy())  # Forming bar replaced
+
+    stats = cache.get_stats()
+    assert stats['full_requests'] == 2 and stats['incremental_requests'] == 2
+    assert stats['requests_saved'] == 2 and stats['bars_saved'] == 2 * 500 + 2 * 496
+    assert stats['bytes_saved'] > 0.9 * full_bytes
+
+
+def test_caching_provider_resyncs_across_gaps_longer_than_limit():
+    engine = TechnicalAnalysisEngine()
+    end = pd.Timestamp('2024-01-01 12:00')
+
+    with StubProviderServer(end=end) as server:
+        cache = engine.attach_provider(HTTPMarketDataProvider(server.url), ttl=0.0)
+
+        async def refresh_across_outage():
+            async with cache:
+                await engine.refresh_from_provider(pairs=['EUR/USD'])
+                server.end = end + pd.Timedelta(minutes=1000)  # Down for longer than `limit` bars
+                return await engine.refresh_from_provider(pairs=['EUR/USD'])
+
+        assert asyncio.run(refresh_across_outage()) == {'EURUSD': 500}
+
+    stored = engine.get_candles('EURUSD', 2048)
+    assert len(stored['timestamp']) == 500 and stored['timestamp'][-1] == np.datetime64(server.end)
+    assert (np.diff(stored['timestamp']) == np.timedelta64(1, 'm')).all()  # No hole inside the buffer
+    assert cache.get_stats()['resyncs'] == 1
+
+
+def test_tick_aggregator_matches_resampled_ticks():
+    symbols = ['EURUSD', 'GBPUSD', 'BTCUSD']
+    start = pd.Timestamp('2024-01-01 09:00')
+    stream = SyntheticMarket().tick_batches(symbols, tick_interval=0.7, start=start)
+    batches = [next(stream) for _ in range(400)]
+
+    closed = []
+    batched = TickAggregator(symbols, on_bar_close=lambda *bar: closed.append(bar))
+    scalar = TickAggregator(symbols, on_bar_close=lambda *bar: bar)
+    scalar_closed = []
+    for batch in batches:
+        batched.add_ticks(batch['timestamp'], batch['price'], batch['volume'])
+        for symbol, price, volume in zip(symbols, batch['price'], batch['volume']):
+            scalar_closed.extend(scalar.add_tick(symbol, batch['timestamp'], price, volume))
+    order = lambda bar: (bar[0], bar[1], bar[2]['timestamp'])
+    assert sorted(scalar_closed, key=order) == sorted(closed, key=order)
+
+    for timeframe, rule in [('5s', '5s'), ('10s', '10s'), ('30s', '30s'), ('1m', '1min')]:
+        ticks = pd.DataFrame(
+            {'price': [batch['price'][1] for batch in batches], 'volume': [batch['volume'][1] for batch in batches]},
+            index=[batch['timestamp'] for batch in batches]
+        )
+        expected = ticks['price'].resample(rule).ohlc().iloc[:-1]  # Last bar is still forming
+        expected['volume'] = ticks['volume'].resample(rule).sum().iloc[:-1]
+        bars = [candle for symbol, bar_timeframe, candle in closed if symbol == 'GBPUSD' and bar_timeframe == timeframe]
+
+        assert [candle['timestamp'] for candle in bars] == list(expected.index.to_numpy())
+        for field in ['open', 'high', 'low', 'close', 'volume']:
+            np.testing.assert_allclose([candle[field] for candle in bars], expected[field].to_numpy())
+
+    # A quiet market still closes bars once their period is over
+    forming = batched.forming('EURUSD', '10s')
+    flushed = []
+    batched.on_bar_close = lambda *bar: flushed.append(bar)
+    batched.flush(batches[-1]['timestamp'] + pd.Timedelta(minutes=1))
+    assert ('EURUSD', '10s', forming) in flushed and batched.forming('EURUSD', '10s') is None
+
+    # A tick for a flushed period arrives late: it must not reopen the bar
+    late_ticks = batched.stats['late_ticks']
+    flushed.clear()
+    batched.add_tick('EURUSD', forming['timestamp'] + np.timedelta64(1, 's'), 1.1, 1.0)
+    batched.add_ticks(forming['timestamp'], np.array([1.1, np.nan, np.nan]))
+    batched.flush(batches[-1]['timestamp'] + pd.Timedelta(minutes=2))
+    assert batched.forming('EURUSD', '10s') is None
+    assert not [bar for bar in flushed if bar[:2] == ('EURUSD', '10s')]
+    assert batched.stats['late_ticks'] == late_ticks + 2 * len(batched.timeframes)
+
+
+def test_tick_aggregator_feeds_engine_10s_strategy():
+    engine = TechnicalAnalysisEngine()
+    symbols = list(engine.trading_pairs.values())
+    aggregator = TickAggregator(symbols, on_bar_close=engine.on_bar_close)
+    market = SyntheticMarket(volatility=0.01)
+
+    signals = []
+    for batch in market.ticks(symbols, speed=0, tick_interval=2.0, start=pd.Timestamp('2024-01-01')):
+        signals.extend(aggregator.add_ticks(batch['timestamp'], batch['price'], batch['volume']))
+        if aggregator.stats['bars_10s'] >= 150 * len(symbols):
+            break
+
+    assert engine.candle_store('10s').bar_count('EURUSD') == 150
+    assert engine.candle_store('5s').bar_count('EURUSD') == 300
+    assert engine.pairs_data.bar_count('EURUSD') == 25
+    assert engine.cascade_stats['evaluated'] == 150 * len(symbols)
+    assert signals and all(signal.pair in engine.trading_pairs for signal in signals)
+
+
+def test_closed_bar_signals_match_full_strategy():
+    # Same warm-up as the regular path, so even the RSI text agrees
+    compared = 0
+    for seed in range(60, 70):
+        engine = TechnicalAnalysisEngine()
+        data = make_candles(seed, 700)
+        engine.candle_store('10s').extend('EURUSD', data.iloc[:500])
+        for end in range(501, len(data) + 1):
+            candle = {'timestamp': data.index[end - 1], **data.iloc[end - 1].to_dict()}
+            signal = engine.on_bar_close('EURUSD', '10s', candle)
+            if signal:
+                expected = engine.generate_signal_10s_strategy(data.iloc[end - 500:end])
+                assert (signal.direction, signal.confidence, signal.analysis) == \
+                    (expected.direction, expected.confidence, expected.analysis)
+                compared += 1
+    assert compared >= 10
+
+
+def resample_reference(data: pd.DataFrame, rule: str) -> pd.DataFrame:
+    return data.resample(rule).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+
+
+def test_resampler_folds_closing_bars_like_resample():
+    data = make_candles(62, 200).iloc[7:]  # Start mid-bucket on every timeframe
+    streamed = TechnicalAnalysisEngine()
+    resampler = streamed.attach_resampler()
+    for candle in frame_candles(data):
+        streamed.add_candle('EURUSD', candle)
+
+    bulk = TechnicalAnalysisEngine()
+    bulk.load_history('EURUSD', data.iloc[:60])
+    bulk.attach_resampler()
+    bulk.load_history('EURUSD', data.iloc[60:])
+
+    closed = data.iloc[:-1]  # add_candle holds back the possibly forming last bar
+    for timeframe, rule in [('5m', '5min'), ('15m', '15min'), ('1h', '1h')]:
+        expected = resample_reference(closed, rule)
+        for engine in (streamed, bulk):
+            view = engine.resampler.view('EURUSD', timeframe)
+            np.testing.assert_array_equal(view['timestamp'], expected.index.to_numpy())
+            for field in ['open', 'high', 'low', 'close', 'volume']:
+                np.testing.assert_allclose(view[field], expected[field].to_numpy(), rtol=1e-12)
+        assert engine.candle_store(timeframe).bar_count('EURUSD') == len(expected)
+
+    # 199 closed 1m bars: the 5m bar at 03:15 is still forming, so closed views stop before it
+    assert not resampler.is_closed('EURUSD', '5m')
+    aligned = resampler.aligned_views('EURUSD', limit=3)
+    assert aligned['5m']['timestamp'][-1] == np.datetime64('2024-01-01T03:10')
+    assert aligned['1h']['timestamp'][-1] == np.datetime64('2024-01-01T02:00')
+    assert all(len(view['close']) == 3 for view in aligned.values())
+
+
+def test_signals_note_higher_timeframe_agreement():
+    noted = 0
+    for seed in range(63, 83):
+        engine = TechnicalAnalysisEngine()
+        engine.attach_resampler()
+        engine.load_history('EURUSD', make_candles(seed, 1200))
+        signal = engine.generate_comprehensive_signal('EUR/USD')
+
+        if signal:
+            agreeing = [tf for tf, trend in engine.get_timeframe_trends('EUR/USD').items() if trend == signal.direction]
+            assert ('trend agrees' in signal.analysis) == bool(agreeing)
+            noted += bool(agreeing)
+    assert noted
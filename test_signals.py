@@ -0,0 +1,366 @@
+"""
+Signal serving tests for the Quotex Signal Bot
+Author: Ankit Singh
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from telegram.error import RetryAfter
+
+from broadcaster import Broadcaster
+from engine_executor import EngineExecutor
+from parallel_scan import ParallelScanner
+from rate_limiter import KeyedRateLimiter
+from signal_board import SignalBoard
+from signal_scheduler import SignalScheduler
+from technical_analysis import TechnicalAnalysisEngine
+from test_indicators import make_candles
+
+
+def loaded_engine(end: int = 345) -> TechnicalAnalysisEngine:
+    """Engine whose candle store holds a deterministic history for every pair"""
+    engine = TechnicalAnalysisEngine()
+    for index, (pair, symbol) in enumerate(engine.trading_pairs.items()):
+        engine.load_history(symbol, make_candles(70 + index, 900).iloc[:end])
+    return engine
+
+
+def test_signal_board_serves_latest_evaluations():
+    engine = loaded_engine()
+    now = [datetime(2024, 1, 1, 5, 45)]
+    board = SignalBoard(engine, clock=lambda: now[0])
+
+    assert board.best() is None and board.is_stale()
+    assert board.refresh() == len(engine.trading_pairs)
+
+    ranked = engine.scan_universe(min_confidence='LOW')
+    assert [signal.pair for signal in board.top()] == [signal.pair for signal in ranked]
+    assert board.best().pair == engine.scan_universe()[0].pair
+    assert board.get(ranked[0].pair).signal.direction == ranked[0].direction
+    assert board.get('EUR/CHF').last_candle == make_candles(0, 345).index[-1]
+
+    # Handed-out signals are copies
+    board.best().analysis = 'changed'
+    assert board.best().analysis != 'changed'
+
+    stats = board.get_stats()
+    assert stats['pairs'] == len(engine.trading_pairs) and stats['refreshes'] == 1
+    assert stats['age_seconds'] == 0 and stats['candle_lag_seconds'] == 0 and stats['stale_reads'] == 1
+
+    # Once the next candle closes, a board whose refresh failed serves nothing
+    now[0] += timedelta(seconds=59)
+    assert board.is_serving() and board.get('EUR/USD') is not None
+    now[0] += timedelta(seconds=1)
+    assert not board.is_serving() and not board.is_stale()
+    assert board.get('EUR/USD') is None and board.best() is None and board.top() == []
+    assert board.get_stats()['expired_reads'] == 1
+
+    now[0] += timedelta(minutes=2)
+    assert board.get('EUR/USD') is None
+    assert board.get_stats()['stale_reads'] == 2 and board.get_stats()['candle_lag_seconds'] == 180
+
+
+def test_signal_board_refreshes_on_every_candle_close():
+    board = SignalBoard(loaded_engine(), candle_seconds=0.05, settle_delay=0.0)
+
+    async def run_board():
+        board.start()
+        assert await board.wait_ready(timeout=5)
+        await asyncio.sleep(0.3)
+        await board.stop()
+        return board.task
+
+    assert asyncio.run(run_board()) is None
+    assert 4 <= board.stats['refreshes'] <= 8
+
+
+def test_signal_board_logs_failed_refreshes(caplog):
+    engine = loaded_engine()
+    engine.evaluate_universe = lambda pairs: 1 / 0
+    board = SignalBoard(engine, candle_seconds=0.05, settle_delay=0.0)
+
+    async def run_board():
+        board.start()
+        await asyncio.sleep(0.12)
+        await board.stop()
+
+    with caplog.at_level(logging.ERROR, logger='signal_board'):
+        asyncio.run(run_board())
+    assert board.stats['errors'] >= 2 and board.refreshed_at is None
+    assert any(record.exc_info and record.exc_info[0] is ZeroDivisionError for record in caplog.records)
+
+
+def test_signal_board_waits_for_the_refresh_after_each_close():
+    board = SignalBoard(loaded_engine(), candle_seconds=0.3, settle_delay=0.1)
+
+    async def run_board():
+        board.start()
+        assert await board.wait_ready(timeout=5)
+        await asyncio.sleep(board.seconds_until_refresh() - 0.13)  # Just before the next close
+        assert board.is_current()
+        await asyncio.sleep(0.06)  # Past the close, before its refresh
+        current_after_close = board.is_current()
+        waited = await board.wait_current(timeout=1)
+        current = board.is_current()
+        await board.stop()
+        return current_after_close, waited, current
+
+    assert asyncio.run(run_board()) == (False, True, True)
+
+
+def test_parallel_scan_matches_in_process_evaluation():
+    engine = loaded_engine(end=390)
+    engine.load_history('SHORT', make_candles(99, 150))  # Shorter than the shared window
+    engine.attach_resampler()  # Workers have no 5m/15m/1h bars; the parent adds their note
+    pairs = list(engine.trading_pairs) + ['SHORT', 'NO_DATA']
+    engine.get_market_data = lambda *args, **kwargs: make_candles(0, 50)  # Too short to evaluate
+
+    def summary(results):
+        return {
+            pair: (pd.Timestamp(last_candle), signal and (signal.pair, signal.direction, signal.confidence, signal.analysis, signal.score))
+            for pair, (signal, last_candle) in results.items()
+        }
+
+    expected = summary(engine.evaluate_universe(pairs))
+    assert 'NO_DATA' not in expected and sum(1 for _, signal in expected.values() if signal) >= 2
+    assert any('trend agrees' in signal[3] for _, signal in expected.values() if signal)
+
+    with ParallelScanner(engine, workers=2) as scanner:
+        assert summary(scanner.scan(pairs)) == expected
+        block = scanner.block.name
+        assert summary(asyncio.run(scanner.ascan(pairs))) == expected
+        assert scanner.block.name == block  # The shared block is reused between scans
+
+        board = SignalBoard(engine, pairs=pairs, scanner=scanner, clock=lambda: datetime(2024, 1, 1, 6, 30))
+        board.refresh()
+        assert board.best().pair == engine.scan_universe(pairs)[0].pair
+
+
+def test_engine_executor_keeps_the_event_loop_responsive():
+    engine = loaded_engine()
+    pairs = list(engine.trading_pairs)[:6]
+    expected = {pair: loaded_engine().generate_comprehensive_signal(pair) for pair in pairs}
+
+    async def use_executor(executor):
+        signals = await asyncio.gather(*(executor.generate_signal(pair) for pair in pairs))
+
+        # The loop keeps ticking while a slow call occupies a worker
+        ticks = 0
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        beat = asyncio.get_running_loop().create_task(heartbeat())
+        await executor.run(time.sleep, 0.3)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 0.5, timeout=0.05)
+        beat.cancel()
+        return signals, ticks
+
+    with EngineExecutor(engine, workers=2, timeout=5) as executor:
+        signals, ticks = asyncio.run(use_executor(executor))
+        stats = executor.get_stats()
+
+    assert [signal and (signal.direction, signal.confidence, signal.analysis) for signal in signals] == [
+        expected[pair] and (expected[pair].direction, expected[pair].confidence, expected[pair].analysis)
+        for pair in pairs
+    ]
+    assert ticks >= 10
+    assert stats['calls'] == 2 * len(pairs) + 2 and stats['timeouts'] == 1 and stats['in_flight'] == 0
+
+
+def test_engine_executor_coalesces_identical_analyses():
+    engine = loaded_engine()
+    pairs = ['EUR/USD', 'BTC/USD']
+    expected = {pair: loaded_engine().generate_comprehensive_signal(pair) for pair in pairs}
+    calls = []
+    signal_from_data = engine.signal_from_data
+    engine.signal_from_data = lambda *args: calls.append(args[0]) or signal_from_data(*args)
+
+    async def burst(executor):
+        return await asyncio.gather(*(executor.generate_signal(pair) for pair in pairs * 20))
+
+    with EngineExecutor(engine, workers=4, timeout=5) as executor:
+        signals = asyncio.run(burst(executor))
+        coalescing = executor.get_stats()['single_flight']
+
+    assert sorted(calls) == sorted(pairs)  # One analysis per pair and candle
+    assert coalescing['executions'] == 2 and coalescing['coalesced'] == 38 and coalescing['in_flight'] == 0
+    assert coalescing['coalescing_ratio'] == 0.95 and coalescing['calls_per_execution'] == 20
+    for pair, signal in zip(pairs * 20, signals):
+        assert (signal and signal.analysis) == (expected[pair] and expected[pair].analysis)
+    assert len({id(signal) for signal in signals if signal}) == sum(1 for signal in signals if signal)
+
+
+def test_process_engine_executor_matches_in_process_signals():
+    engine = loaded_engine(end=390)
+    engine.attach_resampler()
+    reference = loaded_engine(end=390)
+    reference.attach_resampler()
+    expected = reference.scan_universe(min_confidence='LOW')
+    assert len(expected) >= 2 and any('trend agrees' in signal.analysis for signal in expected)
+
+    async def scan(executor):
+        return await executor.scan_universe(min_confidence='LOW'), await executor.generate_signal(expected[0].pair)
+
+    # Candles are loaded off the event loop too
+    loader_threads = set()
+    get_pair_data = engine.get_pair_data
+    engine.get_pair_data = lambda pair: loader_threads.add(threading.current_thread()) or get_pair_data(pair)
+
+    with EngineExecutor(engine, mode='process', workers=2, timeout=30) as executor:
+        signals, first = asyncio.run(scan(executor))
+        # A load plus an analysis per pair; the repeat is a load and a cache hit
+        assert executor.get_stats()['calls'] == 2 * len(engine.trading_pairs) + 1
+    assert threading.main_thread() not in loader_threads
+
+    assert [(signal.pair, signal.direction, signal.score, signal.analysis) for signal in signals] == [
+        (signal.pair, signal.direction, signal.score, signal.analysis) for signal in expected
+    ]
+    assert first.analysis == expected[0].analysis
+
+    with pytest.raises(ValueError):
+        EngineExecutor(engine, mode='fiber')
+
+
+def test_signal_scheduler_aligns_to_closes_and_skips_overruns():
+    runs = []
+
+    async def job():
+        runs.append(time.time())
+        if len(runs) == 2:
+            await asyncio.sleep(0.25)  # Overruns two closes
+
+    scheduler = SignalScheduler(job, candle_seconds=0.1, settle_delay=0.02, should_run=lambda: len(runs) < 4)
+
+    async def run_scheduler():
+        scheduler.start()
+        assert scheduler.start() is scheduler.task  # Already running
+        await asyncio.wait_for(scheduler.task, timeout=5)
+
+    asyncio.run(run_scheduler())
+    assert len(runs) == 4 and not scheduler.running
+    for started in runs:
+        assert 0.015 <= started % 0.1 <= 0.08  # Just after a close plus the settle delay
+    assert round((runs[2] - runs[1]) / 0.1) == 3 and round((runs[3] - runs[2]) / 0.1) == 1
+
+    stats = scheduler.get_stats()
+    assert stats['runs'] == 4 and stats['overruns'] == 1 and stats['skipped_ticks'] == 2 and stats['starts'] == 1
+
+
+def test_signal_scheduler_logs_failed_jobs_and_keeps_running(caplog):
+    runs = []
+
+    async def job():
+        runs.append(time.time())
+        raise RuntimeError('broadcast failed')
+
+    scheduler = SignalScheduler(job, candle_seconds=0.05, settle_delay=0.0, should_run=lambda: len(runs) < 2)
+    with caplog.at_level(logging.ERROR, logger='signal_scheduler'):
+        asyncio.run(asyncio.wait_for(scheduler.run(), timeout=5))
+
+    assert len(runs) == 2 and scheduler.get_stats()['errors'] == 2
+    assert [record.exc_info[0] for record in caplog.records] == [RuntimeError, RuntimeError]
+
+
+def test_signal_scheduler_stops_cleanly_mid_job():
+    events = []
+
+    async def job():
+        events.append('started')
+        try:
+            await asyncio.sleep(5)
+        finally:
+            events.append('cancelled')
+
+    async def run_scheduler():
+        scheduler = SignalScheduler(job, candle_seconds=0.05, settle_delay=0.0)
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+        assert not scheduler.running and scheduler.task is None
+        scheduler.start()  # Restarts after a stop
+        assert scheduler.running
+        await scheduler.stop()
+
+    asyncio.run(run_scheduler())
+    assert events == ['started', 'cancelled']
+
+
+class RecordingBot:
+    """Stands in for telegram.Bot: each send takes `delay` seconds"""
+
+    def __init__(self, delay: float = 0.01, failing=(), flood_waits=None):
+        """flood_waits: chat id -> number of sends answered with RetryAfter first"""
+        self.delay = delay
+        self.failing = set(failing)
+        self.flood_waits = dict(flood_waits or {})
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if chat_id in self.failing:
+                raise RuntimeError('Forbidden: bot was blocked by the user')
+            if self.flood_waits.get(chat_id):
+                self.flood_waits[chat_id] -= 1
+                raise RetryAfter(timedelta(seconds=0.05))
+            self.sent.append((chat_id, text, kwargs))
+        finally:
+            self.in_flight -= 1
+
+
+def test_broadcaster_fans_out_with_bounded_concurrency():
+    bot = RecordingBot(delay=0.01, failing={7, 42})
+    broadcaster = Broadcaster(bot, concurrency=50)
+    chats = list(range(1000)) + [3]  # Duplicates are sent once
+
+    report = asyncio.run(broadcaster.broadcast(chats, 'signal', parse_mode='Markdown'))
+
+    assert bot.max_in_flight == 50
+    assert report.recipients == 1000 and len(report.delivered) == 998 and set(report.failed) == {7, 42}
+    assert sorted(chat for chat, _, _ in bot.sent) == sorted(set(range(1000)) - {7, 42})
+    assert all(kwargs == {'parse_mode': 'Markdown'} for _, _, kwargs in bot.sent)
+
+    # 20 rounds of 10ms sends, not 1000 sequential ones
+    assert 0.2 <= report.completion_seconds < 2.0
+    assert 0 < report.p50 <= report.p99 <= report.completion_seconds
+    assert report.latency_percentile(0) >= 0.01
+
+    stats = broadcaster.get_stats()
+    assert stats['broadcasts'] == 1 and stats['delivered'] == 998 and stats['failed'] == 2
+    assert stats['last_broadcast']['p99_latency_seconds'] == report.p99
+
+    empty = asyncio.run(broadcaster.broadcast([], 'signal'))
+    assert empty.recipients == 0 and empty.p50 == 0.0
+
+
+def test_broadcaster_paces_sends_and_requeues_flood_waits():
+    bot = RecordingBot(delay=0.001, flood_waits={3: 1, 4: 2, 5: 10})
+    limiter = KeyedRateLimiter(rate=400, key_rate=20)
+    broadcaster = Broadcaster(bot, concurrency=20, rate_limiter=limiter, max_retries=3)
+
+    async def send():
+        return await broadcaster.broadcast(range(100), 'signal')
+
+    report = asyncio.run(send())
+
+    # Flood-waited chats are retried, not dropped, until max_retries
+    assert set(report.delivered) == set(range(100)) - {5} and list(report.failed) == [5]
+    assert isinstance(report.failed[5], RetryAfter)
+    assert report.retries == 1 + 2 + 3 and bot.flood_waits == {3: 0, 4: 0, 5: 6}
+
+    # 100 sends paced at 400/s, plus flood-wait pauses
+    assert report.completion_seconds >= 0.25
+    assert broadcaster.get_stats()['flood_wait_seconds'] == pytest.approx(0.3)
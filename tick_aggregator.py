@@ -0,0 +1,152 @@
+"""
+Tick Aggregator for the Technical Analysis Engine
+Builds 5s/10s/30s/1m candles from a tick stream for a whole universe
+Author: Ankit Singh
+
+Forming bars live in preallocated (timeframes x symbols) arrays, so a tick
+costs a fixed handful of array writes per timeframe however long the
+stream runs. Bars are aligned to epoch multiples of their period (10s bars
+open at :00, :10, ...). A bar closes when the first tick of a later period
+arrives, or when flush() is called after its period has ended, and is then
+handed to `on_bar_close(symbol, timeframe, candle)`. Ticks for a period
+that has already closed are counted as late and dropped, so a closed bar is
+never reopened.
+"""
+
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from candle_store import FIELDS, to_datetime64
+
+TIMEFRAMES = ('5s', '10s', '30s', '1m')
+
+
+def timeframe_nanos(timeframe: str) -> int:
+    """'10s' / '1m' / '5min' -> period in nanoseconds"""
+    return pd.Timedelta(timeframe.replace('m', 'min') if timeframe.endswith('m') else timeframe).value
+
+
+class TickAggregator:
+    """Multi-timeframe OHLCV candles from ticks, for a fixed symbol universe"""
+
+    def __init__(self, symbols: Sequence[str], timeframes: Sequence[str] = TIMEFRAMES,
+                 on_bar_close: Optional[Callable[[str, str, Dict], object]] = None):
+        """
+        on_bar_close(symbol, timeframe, candle) is called once per closed bar
+        (e.g. TechnicalAnalysisEngine.on_bar_close); non-None results are
+        returned from add_tick/add_ticks/flush.
+        """
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.timeframes = list(timeframes)
+        self.periods = np.array([timeframe_nanos(timeframe) for timeframe in self.timeframes], dtype=np.int64)
+        self.on_bar_close = on_bar_close
+
+        shape = (len(self.timeframes), len(self.symbols))
+        self.bar_start = np.full(shape, -1, dtype=np.int64)  # -1: no forming bar yet
+        self.last_closed = np.full(shape, -1, dtype=np.int64)  # Start of the latest closed bar
+        self.bars = {field: np.zeros(shape, dtype=np.float64) for field in FIELDS}
+        self.stats = Counter()
+
+    def add_tick(self, symbol: str, timestamp, price: float, volume: float = 0.0) -> List:
+        """One trade/quote for one symbol"""
+        row = self.symbol_index[symbol]
+        now = to_datetime64(timestamp).astype(np.int64)
+        self.stats['ticks'] += 1
+        results = []
+
+        for level, period in enumerate(self.periods):
+            bucket = now - now % period
+            start = self.bar_start[level, row]
+            if bucket < start or bucket <= self.last_closed[level, row]:
+                self.stats['late_ticks'] += 1
+                continue
+            if bucket > start:
+                if start >= 0:
+                    results.extend(self._close(level, [row]))
+                self.bar_start[level, row] = bucket
+                for field in ('open', 'high', 'low', 'close'):
+                    self.bars[field][level, row] = price
+                self.bars['volume'][level, row] = volume
+            else:
+                self.bars['high'][level, row] = max(self.bars['high'][level, row], price)
+                self.bars['low'][level, row] = min(self.bars['low'][level, row], price)
+                self.bars['close'][level, row] = price
+                self.bars['volume'][level, row] += volume
+        return results
+
+    def add_ticks(self, timestamp, prices: np.ndarray, volumes: Optional[np.ndarray] = None) -> List:
+        """
+        One tick per symbol sharing a timestamp (SyntheticMarket tick batch
+        layout), vectorized across the universe. NaN prices mean no tick.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.zeros_like(prices) if volumes is None else np.asarray(volumes, dtype=np.float64)
+        now = to_datetime64(timestamp).astype(np.int64)
+        ticked = ~np.isnan(prices)
+        self.stats['ticks'] += int(ticked.sum())
+        results = []
+
+        for level, period in enumerate(self.periods):
+            bucket = now - now % period
+            start = self.bar_start[level]
+            late = ticked & ((bucket < start) | (bucket <= self.last_closed[level]))
+            opening = ticked & ~late & (bucket > start)
+            same = ticked & (bucket == start)
+            self.stats['late_ticks'] += int(late.sum())
+
+            closing = np.flatnonzero(opening & (start >= 0))
+            if len(closing):
+                results.extend(self._close(level, closing))
+
+            start[opening] = bucket
+            for field in ('open', 'high', 'low', 'close'):
+                self.bars[field][level, opening] = prices[opening]
+            self.bars['volume'][level, opening] = volumes[opening]
+
+            self.bars['high'][level, same] = np.maximum(self.bars['high'][level, same], prices[same])
+            self.bars['low'][level, same] = np.minimum(self.bars['low'][level, same], prices[same])
+            self.bars['close'][level, same] = prices[same]
+            self.bars['volume'][level, same] += volumes[same]
+        return results
+
+    def flush(self, now) -> List:
+        """Close every forming bar whose period ended at or before `now` (quiet symbols)"""
+        now = to_datetime64(now).astype(np.int64)
+        results = []
+        for level, period in enumerate(self.periods):
+            start = self.bar_start[level]
+            ended = np.flatnonzero((start >= 0) & (start + period <= now))
+            if len(ended):
+                results.extend(self._close(level, ended))
+                start[ended] = -1
+        return results
+
+    def forming(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        """The still-open bar for a symbol and timeframe, if any"""
+        level, row = self.timeframes.index(timeframe), self.symbol_index[symbol]
+        if self.bar_start[level, row] < 0:
+            return None
+        return self._candle(level, row)
+
+    def _candle(self, level: int, row: int) -> Dict:
+        candle = {'timestamp': np.datetime64(int(self.bar_start[level, row]), 'ns')}
+        candle.update({field: float(self.bars[field][level, row]) for field in FIELDS})
+        return candle
+
+    def _close(self, level: int, rows) -> List:
+        timeframe = self.timeframes[level]
+        self.last_closed[level, rows] = self.bar_start[level, rows]
+        self.stats[f'bars_{timeframe}'] += len(rows)
+        if self.on_bar_close is None:
+            return []
+
+        results = []
+        for row in rows:
+            result = self.on_bar_close(self.symbols[row], timeframe, self._candle(level, row))
+            if result is not None:
+                results.append(result)
+        return results
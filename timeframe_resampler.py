@@ -0,0 +1,120 @@
+"""
+Timeframe Resampler for the Technical Analysis Engine
+Higher-timeframe candles maintained incrementally from the 1m store
+Author: Ankit Singh
+
+Every target timeframe (5m/15m/1h by default) has its own CandleStore.
+When new base bars close, only those bars are folded into the target's
+last (forming) bar or open new ones, so keeping 5m/15m/1h current costs a
+few array operations per base bar instead of a DataFrame.resample over the
+whole history. Bars are aligned to epoch multiples of their period, the
+same grid pandas resample uses.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from candle_store import FIELDS, CandleStore
+from tick_aggregator import timeframe_nanos
+
+HIGHER_TIMEFRAMES = ('5m', '15m', '1h')
+
+
+class TimeframeResampler:
+    """Incremental OHLCV resampling of a base CandleStore into higher timeframes"""
+
+    def __init__(self, base_store: CandleStore, timeframes: Sequence[str] = HIGHER_TIMEFRAMES,
+                 base_timeframe: str = '1m', stores: Optional[Dict[str, CandleStore]] = None):
+        """stores: optional timeframe -> CandleStore to fill (e.g. the engine's timeframe_data)"""
+        self.base_store = base_store
+        self.base_timeframe = base_timeframe
+        self.base_period = timeframe_nanos(base_timeframe)
+        self.timeframes = list(timeframes)
+        self.periods = {timeframe: timeframe_nanos(timeframe) for timeframe in self.timeframes}
+        stores = stores or {}
+        self.stores = {
+            timeframe: stores.get(timeframe) or CandleStore(base_store.capacity, base_store.dtype)
+            for timeframe in self.timeframes
+        }
+        self.processed = {}  # symbol -> int64 ns open time of the last base bar folded in
+
+    def update(self, symbol: str, include_last: bool = True) -> int:
+        """
+        Fold base bars newer than the last processed one into every target
+        timeframe. With include_last=False the newest base bar is held back
+        (it may still be forming). Returns the number of base bars folded.
+        """
+        base = self.base_store.view(symbol)
+        timestamps = base['timestamp'].astype(np.int64)
+        stop = len(timestamps) - (0 if include_last else 1)
+        begin = 0
+        if symbol in self.processed:
+            begin = int(np.searchsorted(timestamps, self.processed[symbol], side='right'))
+        if begin >= stop:
+            return 0
+
+        new_times = timestamps[begin:stop]
+        new_bars = {field: base[field][begin:stop] for field in FIELDS}
+        for timeframe in self.timeframes:
+            self._fold(self.stores[timeframe].buffer(symbol), self.periods[timeframe], new_times, new_bars)
+        self.processed[symbol] = int(new_times[-1])
+        return stop - begin
+
+    def _fold(self, buffer, period: int, timestamps: np.ndarray, bars: Dict[str, np.ndarray]):
+        buckets = timestamps - timestamps % period
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        ends = np.append(starts[1:], len(buckets))
+
+        grouped = {
+            'open': bars['open'][starts],
+            'high': np.maximum.reduceat(bars['high'], starts),
+            'low': np.minimum.reduceat(bars['low'], starts),
+            'close': bars['close'][ends - 1],
+            'volume': np.add.reduceat(bars['volume'], starts)
+        }
+        bucket_times = buckets[starts].astype('datetime64[ns]')
+
+        # The first group may continue the target's forming bar
+        if len(buffer) and buffer.last_timestamp == bucket_times[0]:
+            last = buffer.view(1)
+            buffer.append({
+                'timestamp': bucket_times[0],
+                'open': last['open'][0],
+                'high': max(last['high'][0], grouped['high'][0]),
+                'low': min(last['low'][0], grouped['low'][0]),
+                'close': grouped['close'][0],
+                'volume': last['volume'][0] + grouped['volume'][0]
+            })
+            bucket_times = bucket_times[1:]
+            grouped = {field: values[1:] for field, values in grouped.items()}
+        if len(bucket_times):
+            buffer.extend(bucket_times, grouped)
+
+    def is_closed(self, symbol: str, timeframe: str) -> bool:
+        """Whether the target's last bar has received its final base bar"""
+        buffer = self.stores[timeframe].buffer(symbol)
+        if not len(buffer) or symbol not in self.processed:
+            return False
+        bar_end = buffer.last_timestamp.astype(np.int64) + self.periods[timeframe]
+        return self.processed[symbol] + self.base_period >= bar_end
+
+    def view(self, symbol: str, timeframe: str, limit: Optional[int] = None,
+             closed_only: bool = False) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the latest target bars, optionally without the forming one"""
+        buffer = self.stores[timeframe].buffer(symbol)
+        forming = 1 if closed_only and not self.is_closed(symbol, timeframe) else 0
+        views = buffer.view(None if limit is None else limit + forming)
+        return {field: values[:len(values) - forming] for field, values in views.items()}
+
+    def aligned_views(self, symbol: str, limit: Optional[int] = None,
+                      closed_only: bool = True) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Views of every target timeframe as of the latest folded base bar:
+        timeframe -> OHLCV views whose last bar contains (or, with
+        closed_only, precedes) that base bar
+        """
+        return {
+            timeframe: self.view(symbol, timeframe, limit, closed_only)
+            for timeframe in self.timeframes
+        }